@@ -0,0 +1,1406 @@
+# Benchmarks - MegaSuper Vendas
+# Mede o desempenho das etapas otimizadas do pipeline de limpeza em dados sintéticos.
+# Uso: python benchmarks.py [nome_do_benchmark ...]
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import apriori, association_rules
+from mlxtend.preprocessing import TransactionEncoder
+
+from limpeza_dados import (
+    COLUNAS_CHAVE_DUPLICATAS,
+    CORRECOES_ESPECIFICAS,
+    CuboVendas,
+    DeduplicadorParticionado,
+    EsbocosVendas,
+    IndiceRecomendacao,
+    IndiceSimilaridade,
+    MAPEAMENTO_PRODUTOS,
+    NormalizadorProdutos,
+    analisar_regras_associacao,
+    aplicar_limpeza_por_linha,
+    carregar_saida,
+    carregar_dados,
+    codificar_transacoes,
+    distancia_edicao,
+    encontrar_produtos_similares,
+    gerar_relatorio_associacao,
+    limpar_colunas_numericas,
+    minerar_conjuntos_frequentes,
+    minerar_por_particao,
+    padronizar_data,
+    padronizar_datas,
+    padronizar_hora,
+    padronizar_horas,
+    padronizar_produto,
+    podar_regras,
+    recalcular_totais,
+    remover_duplicatas_entre_blocos,
+    salvar_dados_limpos,
+    salvar_regras,
+    tratar_duplicatas,
+    varrer_limiares,
+    tratar_ceps,
+    validar_cep,
+    validar_frete,
+    validar_quantidade,
+    validar_valor,
+    validar_valores_numericos,
+)
+
+
+def cronometrar(funcao, *args, **kwargs):
+    """
+    Executa uma função e mede o tempo de parede gasto.
+    
+    Args:
+        funcao (callable): Função a ser executada.
+        
+    Returns:
+        tuple: (resultado da função, tempo em segundos)
+    """
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def medir_pico_memoria(funcao, *args, **kwargs):
+    """
+    Executa uma função medindo o tempo e o pico de memória alocada (tracemalloc).
+    
+    Args:
+        funcao (callable): Função a ser executada.
+        
+    Returns:
+        tuple: (resultado da função, tempo em segundos, pico de memória em MB)
+    """
+    tracemalloc.start()
+    try:
+        resultado, tempo = cronometrar(funcao, *args, **kwargs)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, tempo, pico / 1024 ** 2
+
+
+def gerar_coluna_produtos(n_linhas, semente=42):
+    """
+    Gera uma coluna `produto` sintética com as sujeiras encontradas nos dados reais.
+    
+    Os valores são sorteados entre os nomes padrão, as variações e os erros de
+    digitação conhecidos, com ruído de caixa, espaços, pontuação e alguns
+    produtos desconhecidos.
+    
+    Args:
+        n_linhas (int): Número de linhas da coluna.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.Series: Coluna de produtos sujos.
+    """
+    rng = np.random.default_rng(semente)
+    vocabulario = list(MAPEAMENTO_PRODUTOS) + list(CORRECOES_ESPECIFICAS)
+    for variacoes in MAPEAMENTO_PRODUTOS.values():
+        vocabulario.extend(variacoes)
+    vocabulario.extend(f"produto desconhecido {i}" for i in range(200))
+    
+    ruidos = np.array(['{}', ' {} ', '{}  ', 'PRODUTO {}', '{}!', 'item {}'], dtype=object)
+    bases = np.array(vocabulario, dtype=object)[rng.integers(0, len(vocabulario), n_linhas)]
+    moldes = ruidos[rng.integers(0, len(ruidos), n_linhas)]
+    produtos = pd.Series([molde.format(base) for molde, base in zip(moldes, bases)], dtype=object)
+    maiusculas = rng.random(n_linhas) < 0.1
+    produtos[maiusculas] = produtos[maiusculas].str.upper()
+    produtos[rng.random(n_linhas) < 0.005] = np.nan
+    return produtos.rename('produto')
+
+
+def benchmark_padronizacao_produtos(n_linhas=1_000_000, semente=42):
+    """
+    Compara `padronizar_produto` aplicado linha a linha com `NormalizadorProdutos`.
+    
+    Args:
+        n_linhas (int): Tamanho da coluna sintética.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos medidos e aceleração obtida.
+    """
+    produtos = gerar_coluna_produtos(n_linhas, semente)
+    print(f"Coluna sintética: {n_linhas} linhas, {produtos.nunique()} valores distintos")
+    
+    referencia, tempo_referencia = cronometrar(produtos.apply, padronizar_produto)
+    normalizador = NormalizadorProdutos()
+    resultado, tempo_normalizador = cronometrar(normalizador.padronizar_serie, produtos)
+    
+    assert referencia.equals(resultado), "NormalizadorProdutos divergiu de padronizar_produto"
+    
+    aceleracao = tempo_referencia / tempo_normalizador
+    print(f"padronizar_produto (apply):           {tempo_referencia:.2f}s")
+    print(f"NormalizadorProdutos.padronizar_serie: {tempo_normalizador:.2f}s")
+    print(f"Aceleração: {aceleracao:.1f}x")
+    return {
+        'referencia': tempo_referencia,
+        'otimizado': tempo_normalizador,
+        'aceleracao': aceleracao,
+    }
+
+
+def gerar_colunas_data_hora(n_linhas, semente=42):
+    """
+    Gera colunas `data` e `hora` sintéticas nos formatos encontrados nos dados reais.
+    
+    Datas alternam entre DD/MM/AAAA e AAAA-MM-DD, com algumas inválidas;
+    horas alternam entre HH:MM:SS e HHMMSS, com algumas fora da faixa.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        tuple: (coluna de datas, coluna de horas)
+    """
+    rng = np.random.default_rng(semente)
+    dias = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, n_linhas), unit='D')
+    datas = np.where(rng.random(n_linhas) < 0.5, dias.strftime('%d/%m/%Y'), dias.strftime('%Y-%m-%d'))
+    datas = pd.Series(datas, dtype=object, name='data')
+    datas[rng.random(n_linhas) < 0.01] = '31/02/2023'
+    datas[rng.random(n_linhas) < 0.01] = np.nan
+    
+    segundos = rng.integers(0, 86400, n_linhas)
+    horas = pd.Series(
+        [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in segundos],
+        dtype=object, name='hora',
+    )
+    sem_separador = rng.random(n_linhas) < 0.2
+    horas[sem_separador] = horas[sem_separador].str.replace(':', '', regex=False).str.lstrip('0')
+    horas[rng.random(n_linhas) < 0.01] = '25:61:00'
+    horas[rng.random(n_linhas) < 0.01] = np.nan
+    return datas, horas
+
+
+def benchmark_data_hora(n_linhas=290_000, semente=42):
+    """
+    Compara `padronizar_data`/`padronizar_hora` aplicados linha a linha com
+    as versões vetorizadas `padronizar_datas`/`padronizar_horas`.
+    
+    Args:
+        n_linhas (int): Tamanho das colunas sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos medidos e aceleração de cada coluna.
+    """
+    datas, horas = gerar_colunas_data_hora(n_linhas, semente)
+    resultados = {}
+    for nome, coluna, escalar, vetorizada in [
+        ('data', datas, padronizar_data, padronizar_datas),
+        ('hora', horas, padronizar_hora, padronizar_horas),
+    ]:
+        referencia, tempo_referencia = cronometrar(coluna.apply, escalar)
+        resultado, tempo_vetorizado = cronometrar(vetorizada, coluna)
+        assert referencia.equals(resultado), f"{vetorizada.__name__} divergiu de {escalar.__name__}"
+        
+        aceleracao = tempo_referencia / tempo_vetorizado
+        print(f"{nome}: apply {tempo_referencia:.2f}s, vetorizado {tempo_vetorizado:.3f}s ({aceleracao:.1f}x)")
+        resultados[nome] = {
+            'referencia': tempo_referencia,
+            'otimizado': tempo_vetorizado,
+            'aceleracao': aceleracao,
+        }
+    return resultados
+
+
+def gerar_colunas_numericas(n_linhas, semente=42):
+    """
+    Gera as colunas `valor`, `quantidade`, `total` e `frete` com sujeiras típicas.
+    
+    Inclui valores com "R$", vírgula decimal, separador de milhar, textos
+    inválidos, ausentes e fora das faixas aceitas.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: DataFrame com as quatro colunas numéricas.
+    """
+    rng = np.random.default_rng(semente)
+    
+    def sujar(numeros):
+        coluna = pd.Series(numeros, dtype=object)
+        sorteio = rng.random(n_linhas)
+        com_moeda = sorteio < 0.05
+        coluna[com_moeda] = ['R$ ' + f"{numero:.2f}".replace('.', ',') for numero in numeros[com_moeda]]
+        coluna[(sorteio >= 0.05) & (sorteio < 0.06)] = '1.234,56'
+        coluna[(sorteio >= 0.06) & (sorteio < 0.07)] = 'abc'
+        coluna[(sorteio >= 0.07) & (sorteio < 0.08)] = np.nan
+        return coluna
+    
+    return pd.DataFrame({
+        'valor': sujar(np.round(rng.uniform(1, 12000, n_linhas), 2)),
+        'quantidade': sujar(rng.integers(0, 120, n_linhas).astype(float)),
+        'total': sujar(np.round(rng.uniform(1, 5000, n_linhas), 2)),
+        'frete': sujar(np.round(rng.uniform(0, 1200, n_linhas), 2)),
+    })
+
+
+def benchmark_colunas_numericas(n_linhas=290_000, semente=42):
+    """
+    Compara a cadeia `validar_valores_numericos` + `validar_valor`/
+    `validar_quantidade`/`validar_frete` com `limpar_colunas_numericas`.
+    
+    Args:
+        n_linhas (int): Número de linhas sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos medidos, aceleração e memória das colunas resultantes.
+    """
+    df = gerar_colunas_numericas(n_linhas, semente)
+    
+    def cadeia_original(dados):
+        dados = validar_valores_numericos(dados)
+        dados['valor'] = dados['valor'].apply(validar_valor)
+        dados['quantidade'] = dados['quantidade'].apply(validar_quantidade)
+        dados['frete'] = dados['frete'].apply(validar_frete)
+        return dados
+    
+    referencia, tempo_referencia = cronometrar(cadeia_original, df.copy())
+    resultado, tempo_vetorizado = cronometrar(limpar_colunas_numericas, df.copy())
+    pd.testing.assert_frame_equal(referencia, resultado, check_dtype=False)
+    
+    memoria_referencia = referencia.memory_usage(deep=True).sum() / 1024 ** 2
+    memoria_resultado = resultado.memory_usage(deep=True).sum() / 1024 ** 2
+    aceleracao = tempo_referencia / tempo_vetorizado
+    print(f"Cadeia original:          {tempo_referencia:.2f}s ({memoria_referencia:.1f} MB)")
+    print(f"limpar_colunas_numericas: {tempo_vetorizado:.2f}s ({memoria_resultado:.1f} MB)")
+    print(f"Aceleração: {aceleracao:.1f}x")
+    return {
+        'referencia': tempo_referencia,
+        'otimizado': tempo_vetorizado,
+        'aceleracao': aceleracao,
+        'memoria_referencia_mb': memoria_referencia,
+        'memoria_otimizado_mb': memoria_resultado,
+    }
+
+
+def gerar_colunas_cep(n_linhas, semente=42):
+    """
+    Gera as colunas `cidade`, `estado` e `cep` com CEPs ausentes e mal formatados.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: DataFrame com as três colunas.
+    """
+    rng = np.random.default_rng(semente)
+    estados = np.array(['sp', 'rj', 'mg', 'ba', 'pr', 'rs', 'pe', 'ce', 'df', 'go'], dtype=object)
+    numero_estado = rng.integers(0, len(estados), n_linhas)
+    numero_cidade = rng.integers(0, 30, n_linhas)
+    cidades = pd.Series([f"cidade {e}-{c}" for e, c in zip(numero_estado, numero_cidade)], dtype=object)
+    
+    digitos = numero_estado * 10_000_000 + numero_cidade * 100_000 + rng.integers(0, 20, n_linhas)
+    ceps = pd.Series([f"{d:08d}" for d in digitos], dtype=object)
+    sorteio = rng.random(n_linhas)
+    formatados = sorteio < 0.5
+    ceps[formatados] = ceps[formatados].str[:5] + '-' + ceps[formatados].str[5:]
+    ceps[(sorteio >= 0.5) & (sorteio < 0.52)] = '1234'
+    ceps[sorteio >= 0.85] = np.nan
+    return pd.DataFrame({'cidade': cidades, 'estado': estados[numero_estado], 'cep': ceps})
+
+
+def tratar_ceps_linha_a_linha(df):
+    """Implementação original: modas com `mode()` por grupo e preenchimento com `apply` por linha."""
+    df = df.copy()
+    moda = lambda x: x.mode()[0] if not x.mode().empty and not pd.isna(x.mode()[0]) else None
+    cep_por_cidade = df.groupby('cidade')['cep'].agg(moda)
+    cep_por_estado = df.groupby('estado')['cep'].agg(moda)
+    cep_geral = df['cep'].mode()[0] if not df['cep'].mode().empty else None
+    
+    def preencher_cep(row):
+        if pd.isna(row['cep']):
+            cep = cep_por_cidade.get(row['cidade'])
+            if cep is None:
+                cep = cep_por_estado.get(row['estado'])
+            return cep if cep is not None else cep_geral
+        return row['cep']
+    
+    df['cep'] = df.apply(preencher_cep, axis=1)
+    df['cep'] = df['cep'].apply(validar_cep)
+    return df
+
+
+def benchmark_ceps(n_linhas=290_000, semente=42):
+    """
+    Compara o tratamento de CEPs original (`apply` por linha) com `tratar_ceps`.
+    
+    Args:
+        n_linhas (int): Número de linhas sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos medidos e aceleração obtida.
+    """
+    df = gerar_colunas_cep(n_linhas, semente)
+    print(f"{n_linhas} linhas, {df['cep'].isna().sum()} CEPs ausentes")
+    
+    referencia, tempo_referencia = cronometrar(tratar_ceps_linha_a_linha, df)
+    resultado, tempo_vetorizado = cronometrar(tratar_ceps, df.copy())
+    assert referencia['cep'].equals(resultado['cep']), "tratar_ceps divergiu da implementação original"
+    
+    aceleracao = tempo_referencia / tempo_vetorizado
+    print(f"apply por linha: {tempo_referencia:.2f}s")
+    print(f"tratar_ceps:     {tempo_vetorizado:.2f}s")
+    print(f"Aceleração: {aceleracao:.1f}x")
+    return {
+        'referencia': tempo_referencia,
+        'otimizado': tempo_vetorizado,
+        'aceleracao': aceleracao,
+    }
+
+
+def gerar_compras(n_transacoes, n_produtos=60, semente=42):
+    """
+    Gera itens de compras sintéticos com popularidade desigual entre produtos,
+    alguns pares de produtos comprados juntos com frequência e produtos
+    repetidos dentro da mesma compra.
+    
+    Args:
+        n_transacoes (int): Número de compras.
+        n_produtos (int): Número de produtos distintos.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: Uma linha por item, com 'id_da_compra' e 'produto'.
+    """
+    rng = np.random.default_rng(semente)
+    produtos = np.array([f"produto {i:03d}" for i in range(n_produtos)], dtype=object)
+    pesos = rng.dirichlet(np.full(n_produtos, 0.5))
+    
+    tamanhos = rng.integers(1, 8, n_transacoes)
+    ids = np.repeat(np.arange(n_transacoes), tamanhos)
+    itens = rng.choice(n_produtos, size=len(ids), p=pesos)
+    
+    # Pares (antecedente, consequente): o consequente entra em 60% das compras com o antecedente
+    pares = rng.integers(0, n_produtos, size=(n_produtos // 5, 2))
+    ids_extras, itens_extras = [ids], [itens]
+    for antecedente, consequente in pares:
+        compras = np.unique(ids[itens == antecedente])
+        compras = compras[rng.random(len(compras)) < 0.6]
+        ids_extras.append(compras)
+        itens_extras.append(np.full(len(compras), consequente))
+    
+    return pd.DataFrame({
+        'id_da_compra': np.concatenate(ids_extras),
+        'produto': produtos[np.concatenate(itens_extras)],
+    })
+
+
+def codificar_transacoes_original(df):
+    """Codificação original: listas por compra, `set` por transação e matriz densa do TransactionEncoder."""
+    transacoes = df.groupby('id_da_compra')['produto'].apply(list).tolist()
+    transacoes = [list(set(transacao)) for transacao in transacoes]
+    te = TransactionEncoder()
+    te_ary = te.fit(transacoes).transform(transacoes)
+    return pd.DataFrame(te_ary, columns=te.columns_)
+
+
+def benchmark_codificacao(n_transacoes=500_000, semente=42):
+    """
+    Compara a codificação original (TransactionEncoder denso) com
+    `codificar_transacoes` (matriz CSR a partir de códigos categóricos).
+    
+    Args:
+        n_transacoes (int): Número de compras sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos, picos de memória, tamanho das matrizes e aceleração.
+    """
+    df = gerar_compras(n_transacoes, semente=semente)
+    print(f"{n_transacoes} compras, {len(df)} itens")
+    
+    referencia, tempo_referencia, pico_referencia = medir_pico_memoria(codificar_transacoes_original, df)
+    (matriz, produtos), tempo_esparso, pico_esparso = medir_pico_memoria(codificar_transacoes, df)
+    assert list(referencia.columns) == produtos
+    assert np.array_equal(referencia.to_numpy(), matriz.toarray()), "codificar_transacoes divergiu do TransactionEncoder"
+    
+    tamanho_referencia = referencia.memory_usage(index=False).sum() / 1024 ** 2
+    tamanho_esparso = (matriz.data.nbytes + matriz.indices.nbytes + matriz.indptr.nbytes) / 1024 ** 2
+    aceleracao = tempo_referencia / tempo_esparso
+    print(f"TransactionEncoder (denso): {tempo_referencia:.2f}s, pico {pico_referencia:.0f} MB, matriz {tamanho_referencia:.1f} MB")
+    print(f"codificar_transacoes (CSR): {tempo_esparso:.2f}s, pico {pico_esparso:.0f} MB, matriz {tamanho_esparso:.1f} MB")
+    print(f"Aceleração: {aceleracao:.1f}x")
+    return {
+        'referencia': tempo_referencia,
+        'otimizado': tempo_esparso,
+        'aceleracao': aceleracao,
+        'memoria_referencia_mb': pico_referencia,
+        'memoria_otimizado_mb': pico_esparso,
+    }
+
+
+def benchmark_mineracao(n_transacoes=200_000, suportes=(0.05, 0.02, 0.01), semente=42):
+    """
+    Compara tempo e pico de memória do caminho do mlxtend (TransactionEncoder
+    denso + Apriori) com `codificar_transacoes` + minerador Eclat sobre
+    bitsets, para vários valores de `min_support`.
+    
+    Args:
+        n_transacoes (int): Número de compras sintéticas.
+        suportes (tuple): Valores de `min_support` medidos.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Para cada suporte, tempos, picos de memória e aceleração.
+    """
+    df = gerar_compras(n_transacoes, semente=semente)
+    print(f"{n_transacoes} compras, {len(df)} itens")
+    
+    def caminho_mlxtend(min_support):
+        return apriori(codificar_transacoes_original(df), min_support=min_support, use_colnames=True)
+    
+    def caminho_eclat(min_support):
+        matriz, produtos = codificar_transacoes(df)
+        return minerar_conjuntos_frequentes(matriz, produtos, min_support, 'eclat')
+    
+    resultados = {}
+    for min_support in suportes:
+        referencia, tempo_apriori, memoria_apriori = medir_pico_memoria(caminho_mlxtend, min_support)
+        resultado, tempo_eclat, memoria_eclat = medir_pico_memoria(caminho_eclat, min_support)
+        pd.testing.assert_frame_equal(referencia, resultado)
+        
+        aceleracao = tempo_apriori / tempo_eclat
+        print(f"min_support={min_support}: {len(resultado)} conjuntos | "
+              f"apriori {tempo_apriori:.2f}s {memoria_apriori:.1f} MB | "
+              f"eclat {tempo_eclat:.2f}s {memoria_eclat:.1f} MB ({aceleracao:.1f}x)")
+        resultados[min_support] = {
+            'referencia': tempo_apriori,
+            'otimizado': tempo_eclat,
+            'aceleracao': aceleracao,
+            'memoria_referencia_mb': memoria_apriori,
+            'memoria_otimizado_mb': memoria_eclat,
+        }
+    return resultados
+
+
+def benchmark_varredura(n_transacoes=200_000, semente=42):
+    """
+    Compara uma varredura de limiares feita com uma mineração por combinação
+    (como rodar o script várias vezes) com `varrer_limiares`, que minera uma
+    única vez e filtra o resultado.
+    
+    Args:
+        n_transacoes (int): Número de compras sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos medidos e aceleração obtida.
+    """
+    df = gerar_compras(n_transacoes, semente=semente)
+    suportes = [0.05, 0.04, 0.03, 0.02, 0.01]
+    confiancas = [0.3, 0.6]
+    print(f"{n_transacoes} compras, {len(suportes) * len(confiancas)} combinações de limiares")
+    
+    def uma_mineracao_por_limiar():
+        regras = {}
+        for min_support in suportes:
+            for min_confidence in confiancas:
+                matriz, produtos = codificar_transacoes(df)
+                conjuntos = minerar_conjuntos_frequentes(matriz, produtos, min_support)
+                regras[(min_support, min_confidence)] = association_rules(
+                    conjuntos, metric="confidence", min_threshold=min_confidence
+                )
+        return regras
+    
+    referencia, tempo_referencia = cronometrar(uma_mineracao_por_limiar)
+    (resumo, resultado, _), tempo_varredura = cronometrar(varrer_limiares, df, suportes, confiancas)
+    for limiar, regras in referencia.items():
+        pd.testing.assert_frame_equal(regras, resultado[limiar])
+    
+    aceleracao = tempo_referencia / tempo_varredura
+    print(resumo.to_string(index=False))
+    print(f"Uma mineração por limiar: {tempo_referencia:.2f}s")
+    print(f"varrer_limiares:          {tempo_varredura:.2f}s")
+    print(f"Aceleração: {aceleracao:.1f}x")
+    return {
+        'referencia': tempo_referencia,
+        'otimizado': tempo_varredura,
+        'aceleracao': aceleracao,
+    }
+
+
+def gerar_dados_limpos(n_linhas, semente=42):
+    """
+    Gera um DataFrame com as 17 colunas dos dados de vendas já limpos.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: Dados limpos sintéticos.
+    """
+    rng = np.random.default_rng(semente)
+    
+    def sortear(valores):
+        return np.array(valores, dtype=object)[rng.integers(0, len(valores), n_linhas)]
+    
+    dias = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, n_linhas), unit='D')
+    segundos = rng.integers(0, 86400, n_linhas)
+    valor = np.round(rng.uniform(1, 500, n_linhas), 2)
+    quantidade = rng.integers(1, 11, n_linhas).astype(np.int8)
+    frete = np.round(rng.uniform(0, 50, n_linhas), 2)
+    ceps = rng.integers(1_000_000, 99_999_999, n_linhas)
+    return pd.DataFrame({
+        'id_da_compra': np.sort(rng.integers(1, n_linhas // 3, n_linhas)),
+        'data': dias.strftime('%Y-%m-%d').to_numpy(dtype=object),
+        'hora': np.array([f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in segundos], dtype=object),
+        'cliente': sortear([f"cliente {i}" for i in range(500)]),
+        'produto': sortear(list(MAPEAMENTO_PRODUTOS)),
+        'valor': valor,
+        'quantidade': quantidade,
+        'total': np.round(valor * quantidade + frete, 2),
+        'status': sortear(['entregue', 'pendente', 'cancelado']),
+        'cidade': sortear(['sao paulo', 'rio de janeiro', 'belo horizonte', 'curitiba', 'salvador', 'recife']),
+        'estado': sortear(['sp', 'rj', 'mg', 'pr', 'ba', 'pe']),
+        'pais': sortear(['brasil']),
+        'cep': np.array([f"{c // 1000:05d}-{c % 1000:03d}" for c in ceps], dtype=object),
+        'frete': frete,
+        'pagamento': sortear(['pix', 'cartao', 'boleto']),
+        'vendedor': sortear(['joao', 'maria', 'Não Especificado']),
+        'marca': sortear(['x', 'y', 'Não Especificado']),
+    })
+
+
+def benchmark_formatos_saida(n_linhas=290_000, semente=42):
+    """
+    Compara gravação, leitura e tamanho dos dados limpos em CSV, Parquet e Feather.
+    
+    Args:
+        n_linhas (int): Número de linhas sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Para cada formato, tempos de gravação e leitura e tamanho em MB.
+    """
+    df = gerar_dados_limpos(n_linhas, semente)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for formato in ('csv', 'parquet', 'feather'):
+            caminho, tempo_gravacao = cronometrar(salvar_dados_limpos, df, os.path.join(pasta, 'dados_limpos'), formato)
+            lido, tempo_leitura = cronometrar(carregar_saida, caminho)
+            assert len(lido) == len(df)
+            
+            tamanho = os.path.getsize(caminho) / 1024 ** 2
+            memoria = lido.memory_usage(deep=True).sum() / 1024 ** 2
+            print(f"{formato:8s} gravação {tempo_gravacao:.2f}s | leitura {tempo_leitura:.3f}s | "
+                  f"arquivo {tamanho:.1f} MB | em memória {memoria:.1f} MB")
+            resultados[formato] = {
+                'gravacao': tempo_gravacao,
+                'leitura': tempo_leitura,
+                'tamanho_mb': tamanho,
+                'memoria_mb': memoria,
+            }
+    return resultados
+
+
+def benchmark_carregamento(n_linhas=290_000, semente=42):
+    """
+    Compara `pd.read_csv` sem tipos com `carregar_dados` (esquema tipado)
+    usando os leitores 'c' e 'pyarrow'.
+    
+    Args:
+        n_linhas (int): Número de linhas do CSV sintético.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Para cada forma de leitura, tempo e memória ocupada.
+    """
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'vendas.csv')
+        gerar_dados_limpos(n_linhas, semente).to_csv(caminho, index=False)
+        print(f"CSV sintético: {n_linhas} linhas, {os.path.getsize(caminho) / 1024 ** 2:.1f} MB")
+        
+        leituras = {
+            'read_csv sem tipos': lambda: pd.read_csv(caminho),
+            "carregar_dados ('c')": lambda: carregar_dados(caminho, engine='c', relatar=False),
+            "carregar_dados ('pyarrow')": lambda: carregar_dados(caminho, engine='pyarrow', relatar=False),
+        }
+        for nome, leitura in leituras.items():
+            df, tempo = cronometrar(leitura)
+            memoria = df.memory_usage(deep=True).sum() / 1024 ** 2
+            print(f"{nome:28s} {tempo:.2f}s | {memoria:.1f} MB")
+            resultados[nome] = {'tempo': tempo, 'memoria_mb': memoria}
+    return resultados
+
+
+def gerar_dados_brutos(n_linhas, semente=42):
+    """
+    Gera um DataFrame com as colunas tratadas na etapa 3 ainda sujas.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: Colunas cliente, produto, data, hora, valor,
+        quantidade, total e frete.
+    """
+    rng = np.random.default_rng(semente)
+    clientes = np.array([f"  Cliente {i} " for i in range(5_000)], dtype=object)
+    datas, horas = gerar_colunas_data_hora(n_linhas, semente)
+    df = pd.DataFrame({
+        'cliente': clientes[rng.integers(0, len(clientes), n_linhas)],
+        'produto': gerar_coluna_produtos(n_linhas, semente),
+        'data': datas,
+        'hora': horas,
+    })
+    return pd.concat([df, gerar_colunas_numericas(n_linhas, semente)], axis=1)
+
+
+def benchmark_paralelismo(n_linhas=1_000_000, processos=None, semente=42):
+    """
+    Mede a escalabilidade de `aplicar_limpeza_por_linha` de 1 a N processos.
+    
+    Cada execução paralela é comparada com a execução em um único processo,
+    que deve produzir exatamente o mesmo DataFrame.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        processos (list): Números de processos a medir (padrão: 1, 2, 4, ...
+            até o número de núcleos da máquina).
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempo e aceleração para cada número de processos.
+    """
+    if processos is None:
+        nucleos = os.cpu_count() or 1
+        processos = sorted({2 ** i for i in range(nucleos.bit_length()) if 2 ** i <= nucleos} | {nucleos})
+    print(f"{n_linhas} linhas, {os.cpu_count()} núcleo(s) disponível(is)")
+    
+    dados = gerar_dados_brutos(n_linhas, semente)
+    referencia, tempo_serial = cronometrar(aplicar_limpeza_por_linha, dados.copy())
+    resultados = {}
+    for numero in processos:
+        if numero == 1:
+            tempo = tempo_serial
+        else:
+            resultado, tempo = cronometrar(aplicar_limpeza_por_linha, dados.copy(), processos=numero)
+            assert resultado.equals(referencia), f"Resultado diferente com {numero} processos"
+        print(f"{numero:3d} processo(s): {tempo:.2f}s | aceleração {tempo_serial / tempo:.2f}x")
+        resultados[numero] = {'tempo': tempo, 'aceleracao': tempo_serial / tempo}
+    return resultados
+
+
+def gerar_produtos_com_erros(n_distintos, semente=42):
+    """
+    Gera nomes de produtos distintos com erros de digitação.
+    
+    Cada nome parte de um produto padrão ou de uma variação conhecida e recebe
+    de uma a três edições (troca, remoção, inserção ou inversão de letras
+    vizinhas); parte dos nomes é texto aleatório, sem correspondente.
+    
+    Args:
+        n_distintos (int): Número de nomes distintos.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        list: Nomes distintos, já em minúsculas.
+    """
+    rng = np.random.default_rng(semente)
+    bases = list(MAPEAMENTO_PRODUTOS)
+    for variacoes in MAPEAMENTO_PRODUTOS.values():
+        bases.extend(variacoes)
+    letras = 'abcdefghijklmnopqrstuvwxyz'
+    
+    nomes = set()
+    while len(nomes) < n_distintos:
+        if rng.random() < 0.2:
+            nome = ''.join(rng.choice(list(letras), rng.integers(4, 20)))
+        else:
+            nome = list(bases[rng.integers(0, len(bases))])
+            for _ in range(rng.integers(1, 4)):
+                posicao = rng.integers(0, len(nome))
+                operacao = rng.integers(0, 4)
+                if operacao == 0:
+                    nome[posicao] = letras[rng.integers(0, 26)]
+                elif operacao == 1 and len(nome) > 1:
+                    del nome[posicao]
+                elif operacao == 2:
+                    nome.insert(posicao, letras[rng.integers(0, 26)])
+                elif posicao + 1 < len(nome):
+                    nome[posicao], nome[posicao + 1] = nome[posicao + 1], nome[posicao]
+            nome = ''.join(nome)
+        nomes.add(nome)
+    return sorted(nomes)
+
+
+def buscar_linear(produto, candidatos, limite):
+    """Referência: compara o produto com todos os candidatos (mesmo critério de `IndiceSimilaridade.buscar`)."""
+    melhor = None
+    for candidato in candidatos:
+        distancia = distancia_edicao(produto, candidato, limite)
+        if distancia <= limite and (melhor is None or distancia < melhor[1]):
+            melhor = (candidato, distancia)
+            limite = distancia
+    return melhor
+
+
+def benchmark_similaridade(tamanhos=(10_000, 100_000), amostra_linear=2_000, semente=42):
+    """
+    Compara a busca aproximada com índice de n-gramas com a comparação
+    contra todos os produtos padrão, para 10 mil e 100 mil nomes distintos.
+    
+    A busca linear é medida em uma amostra e extrapolada para o total.
+    
+    Args:
+        tamanhos (tuple): Números de nomes distintos.
+        amostra_linear (int): Nomes usados para medir a busca linear.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Para cada tamanho, tempos (s) e candidatos avaliados por busca.
+    """
+    candidatos = list(MAPEAMENTO_PRODUTOS) + list(CORRECOES_ESPECIFICAS.values())
+    indice, tempo_indice_montagem = cronometrar(IndiceSimilaridade, candidatos)
+    print(f"Índice com {len(indice.textos)} produtos montado em {tempo_indice_montagem * 1000:.1f}ms")
+    limite = lambda produto: int(len(produto) * 0.3)
+    
+    resultados = {}
+    for n_distintos in tamanhos:
+        produtos = gerar_produtos_com_erros(n_distintos, semente)
+        encontrados, tempo_indice = cronometrar(lambda: [indice.buscar(p, limite(p)) for p in produtos])
+        avaliados = sum(len(indice.candidatos(p, limite(p))) for p in produtos) / len(produtos)
+        
+        amostra = produtos[:amostra_linear]
+        referencia, tempo_amostra = cronometrar(lambda: [buscar_linear(p, candidatos, limite(p)) for p in amostra])
+        assert referencia == encontrados[:len(amostra)], "Índice e busca linear divergem"
+        tempo_linear = tempo_amostra * len(produtos) / len(amostra)
+        
+        print(f"{n_distintos} nomes: linear {tempo_linear:.2f}s (estimado) | índice {tempo_indice:.2f}s "
+              f"({tempo_linear / tempo_indice:.1f}x) | candidatos por busca: {avaliados:.1f} de {len(indice.textos)} "
+              f"| encontrados: {sum(e is not None for e in encontrados)}")
+        resultados[n_distintos] = {
+            'linear': tempo_linear, 'indice': tempo_indice, 'candidatos_por_busca': avaliados,
+        }
+    return resultados
+
+
+def gerar_produtos_distintos(n_distintos, proporcao_erros=0.02, semente=42):
+    """
+    Gera nomes de produtos distintos, como os que sobram quando a padronização
+    falha: um produto conhecido seguido de uma marca e, às vezes, do tamanho
+    da embalagem. Uma parte dos nomes é repetida com erros de digitação.
+    
+    Args:
+        n_distintos (int): Número de nomes distintos.
+        proporcao_erros (float): Fração dos nomes que são cópias com uma ou duas edições.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        list: Nomes distintos, em ordem aleatória.
+    """
+    rng = np.random.default_rng(semente)
+    produtos = list(MAPEAMENTO_PRODUTOS)
+    for variacoes in MAPEAMENTO_PRODUTOS.values():
+        produtos.extend(variacoes)
+    tamanhos = ['', '', ' 1kg', ' 500g', ' 2l', ' 350ml', ' 12un']
+    letras = 'abcdefghijklmnopqrstuvwxyz'
+    
+    nomes = set()
+    originais = int(n_distintos * (1 - proporcao_erros))
+    while len(nomes) < originais:
+        marca = ''.join(rng.choice(list(letras), rng.integers(4, 9)))
+        nomes.add(f"{produtos[rng.integers(0, len(produtos))]} {marca}{tamanhos[rng.integers(0, len(tamanhos))]}")
+    
+    bases = sorted(nomes)
+    while len(nomes) < n_distintos:
+        nome = list(bases[rng.integers(0, len(bases))])
+        for _ in range(rng.integers(1, 3)):
+            posicao = rng.integers(0, len(nome))
+            operacao = rng.integers(0, 3)
+            if operacao == 0:
+                nome[posicao] = letras[rng.integers(0, 26)]
+            elif operacao == 1:
+                nome.insert(posicao, letras[rng.integers(0, 26)])
+            elif posicao + 1 < len(nome):
+                nome[posicao], nome[posicao + 1] = nome[posicao + 1], nome[posicao]
+        nomes.add(''.join(nome))
+    return sorted(nomes, key=lambda nome: rng.random())
+
+
+def encontrar_produtos_similares_original(produtos):
+    """Comparação de todos os pares (laço duplo), com a mesma distância e o mesmo critério."""
+    pares = []
+    for i, prod1 in enumerate(produtos):
+        for prod2 in produtos[i + 1:]:
+            distancia = distancia_edicao(prod1, prod2, 3)
+            if 0 < distancia <= 3 and len(prod1) > 3 and len(prod2) > 3:
+                pares.append((prod1, prod2, distancia))
+    return sorted(pares, key=lambda par: par[2])
+
+
+def benchmark_produtos_similares(tamanhos=(10_000, 100_000), amostra_original=2_000, semente=42):
+    """
+    Compara a busca de produtos similares por todos os pares com a busca
+    com blocking (`encontrar_produtos_similares`).
+    
+    O laço duplo é medido em uma amostra e extrapolado (custo quadrático).
+    
+    Args:
+        tamanhos (tuple): Números de produtos distintos.
+        amostra_original (int): Produtos usados para medir o laço duplo.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Para cada tamanho, tempos (s) e número de pares encontrados.
+    """
+    resultados = {}
+    for n_distintos in tamanhos:
+        produtos = gerar_produtos_distintos(n_distintos, semente=semente)
+        pares, tempo_blocking = cronometrar(encontrar_produtos_similares, produtos)
+        
+        amostra = produtos[:amostra_original]
+        referencia, tempo_amostra = cronometrar(encontrar_produtos_similares_original, amostra)
+        assert list(encontrar_produtos_similares(amostra).itertuples(index=False, name=None)) == referencia
+        tempo_original = tempo_amostra * (n_distintos / len(amostra)) ** 2
+        
+        print(f"{n_distintos} produtos: todos os pares {tempo_original:.0f}s (estimado) | "
+              f"blocking {tempo_blocking:.2f}s | {len(pares)} pares suspeitos")
+        resultados[n_distintos] = {'original': tempo_original, 'blocking': tempo_blocking, 'pares': len(pares)}
+    return resultados
+
+
+def gerar_colunas_totais(n_linhas, semente=42):
+    """
+    Gera `valor`, `quantidade`, `frete` e `total` já numéricos, com 1% dos
+    totais ausentes e 10% divergentes de valor * quantidade + frete.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: DataFrame com as quatro colunas.
+    """
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({
+        'valor': np.round(rng.uniform(1, 10000, n_linhas), 2),
+        'quantidade': rng.integers(1, 101, n_linhas).astype(np.int8),
+        'frete': np.round(rng.uniform(0, 1000, n_linhas), 2),
+    })
+    total = df['valor'] * df['quantidade'] + df['frete']
+    sorteio = rng.random(n_linhas)
+    total[sorteio < 0.10] += np.round(rng.uniform(-50, 50, n_linhas), 2)[sorteio < 0.10]
+    total[sorteio >= 0.99] = np.nan
+    df['total'] = total
+    return df
+
+
+def recalcular_totais_original(df):
+    """Implementação original: preenchimento com `apply` por linha e verificação com colunas auxiliares."""
+    df['total'] = df.apply(
+        lambda row: row['valor'] * row['quantidade'] + row['frete']
+        if pd.isna(row['total']) else row['total'],
+        axis=1
+    )
+    df['total_calculado'] = df['valor'] * df['quantidade'] + df['frete']
+    df['diferenca'] = abs(df['total'] - df['total_calculado'])
+    df.loc[df['diferenca'] > 0.01, 'total'] = df['total_calculado']
+    return df.drop(['total_calculado', 'diferenca'], axis=1)
+
+
+def benchmark_totais(n_linhas=290_000, semente=42):
+    """
+    Compara o preenchimento e a verificação de totais originais com `recalcular_totais`.
+    
+    Args:
+        n_linhas (int): Número de linhas sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos, picos de memória e aceleração obtida.
+    """
+    df = gerar_colunas_totais(n_linhas, semente)
+    
+    referencia, tempo_referencia, pico_referencia = medir_pico_memoria(recalcular_totais_original, df.copy())
+    resultado, tempo_vetorizado, pico_vetorizado = medir_pico_memoria(recalcular_totais, df.copy())
+    assert referencia['total'].equals(resultado['total']), "recalcular_totais divergiu da implementação original"
+    
+    aceleracao = tempo_referencia / tempo_vetorizado
+    print(f"{n_linhas} linhas: {resultado.attrs['totais_preenchidos']} totais preenchidos, "
+          f"{resultado.attrs['totais_corrigidos']} corrigidos")
+    print(f"apply + verificar_calculos: {tempo_referencia:.2f}s (pico {pico_referencia:.1f} MB)")
+    print(f"recalcular_totais:          {tempo_vetorizado:.3f}s (pico {pico_vetorizado:.1f} MB)")
+    print(f"Aceleração: {aceleracao:.1f}x")
+    return {
+        'referencia': tempo_referencia,
+        'otimizado': tempo_vetorizado,
+        'aceleracao': aceleracao,
+        'pico_referencia_mb': pico_referencia,
+        'pico_otimizado_mb': pico_vetorizado,
+    }
+
+
+def gerar_chaves_duplicadas(n_linhas, proporcao_duplicatas=0.02, semente=42):
+    """
+    Gera as colunas-chave de duplicatas com uma fração de linhas repetidas.
+    
+    Args:
+        n_linhas (int): Número de linhas.
+        proporcao_duplicatas (float): Fração de linhas que repetem uma linha anterior.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: Colunas id_da_compra, data, hora, cliente e produto (texto).
+    """
+    rng = np.random.default_rng(semente)
+    n_unicas = n_linhas - int(n_linhas * proporcao_duplicatas)
+    datas, horas = gerar_colunas_data_hora(n_unicas, semente)
+    df = pd.DataFrame({
+        'id_da_compra': rng.integers(0, n_unicas // 3, n_unicas),
+        'data': datas,
+        'hora': horas,
+        'cliente': np.array([f"Cliente {i}" for i in range(5_000)], dtype=object)[rng.integers(0, 5_000, n_unicas)],
+        'produto': gerar_coluna_produtos(n_unicas, semente),
+    })
+    repetidas = df.iloc[rng.integers(0, n_unicas, n_linhas - n_unicas)]
+    df = pd.concat([df, repetidas], ignore_index=True)
+    return df.iloc[rng.permutation(n_linhas)].reset_index(drop=True)
+
+
+def deduplicar_em_disco(df, tamanho_bloco=50_000):
+    """Resolve as duplicatas de `df` em blocos com `DeduplicadorParticionado`."""
+    with tempfile.TemporaryDirectory(prefix="benchmark_duplicatas_") as pasta:
+        deduplicador = DeduplicadorParticionado(pasta)
+        for inicio in range(0, len(df), tamanho_bloco):
+            bloco = df.iloc[inicio:inicio + tamanho_bloco]
+            deduplicador.adicionar(pd.util.hash_pandas_object(bloco, index=False).to_numpy())
+        duplicadas = deduplicador.posicoes_duplicadas()
+    novas = np.ones(len(df), dtype=bool)
+    novas[duplicadas] = False
+    return df[novas]
+
+
+def deduplicar_entre_blocos(df, tamanho_bloco=50_000):
+    """Remove as duplicatas de `df` em blocos com os hashes vistos na memória, como o modo streaming."""
+    vistos = np.empty(0, dtype=np.uint64)
+    blocos = []
+    for inicio in range(0, len(df), tamanho_bloco):
+        bloco, vistos = remover_duplicatas_entre_blocos(df.iloc[inicio:inicio + tamanho_bloco], vistos)
+        blocos.append(bloco)
+    return pd.concat(blocos)
+
+
+def benchmark_duplicatas(n_linhas=290_000, semente=42):
+    """
+    Compara `tratar_duplicatas` (em memória) com a deduplicação em blocos do modo streaming.
+    
+    Em blocos, as chaves são reduzidas a impressões de 64 bits, mantidas na
+    memória (`remover_duplicatas_entre_blocos`) ou em partições em disco
+    (`DeduplicadorParticionado`). O resultado precisa ser igual ao de
+    `drop_duplicates`.
+    
+    Args:
+        n_linhas (int): Número de linhas sintéticas.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos e picos de memória de cada caminho.
+    """
+    df = gerar_chaves_duplicadas(n_linhas, semente=semente)[COLUNAS_CHAVE_DUPLICATAS]
+    
+    resultado, tempo_memoria, pico_memoria = medir_pico_memoria(tratar_duplicatas, df)
+    em_blocos, tempo_blocos, pico_blocos = medir_pico_memoria(deduplicar_entre_blocos, df)
+    em_disco, tempo_disco, pico_disco = medir_pico_memoria(deduplicar_em_disco, df)
+    referencia = df.drop_duplicates()
+    assert referencia.index.equals(resultado.index), "tratar_duplicatas divergiu de drop_duplicates"
+    assert referencia.index.equals(em_blocos.index), "a deduplicação em blocos divergiu de drop_duplicates"
+    assert referencia.index.equals(em_disco.index), "a deduplicação em disco divergiu de drop_duplicates"
+    
+    print(f"{n_linhas} linhas: {resultado.attrs['duplicatas_removidas']} duplicatas removidas")
+    print(f"tratar_duplicatas:  {tempo_memoria:.3f}s (pico {pico_memoria:.1f} MB)")
+    print(f"em blocos (hashes): {tempo_blocos:.3f}s (pico {pico_blocos:.1f} MB)")
+    print(f"em disco (blocos):  {tempo_disco:.3f}s (pico {pico_disco:.1f} MB)")
+    return {
+        'referencia': tempo_memoria,
+        'em_blocos': tempo_blocos,
+        'em_disco': tempo_disco,
+        'pico_referencia_mb': pico_memoria,
+        'pico_em_blocos_mb': pico_blocos,
+        'pico_em_disco_mb': pico_disco,
+    }
+
+
+def recomendar_varrendo_regras(rules, cesta, k):
+    """Recomendação de referência: filtra o DataFrame de regras a cada consulta."""
+    cesta = set(cesta)
+    aplicaveis = rules[rules['antecedents'].map(lambda antecedentes: antecedentes <= cesta)]
+    candidatos = {}
+    colunas = ['consequents', 'lift', 'confidence']
+    for consequentes, lift, confianca in aplicaveis[colunas].itertuples(index=False):
+        for produto in consequentes - cesta:
+            candidatos[produto] = max(candidatos.get(produto, (-np.inf, -np.inf)), (lift, confianca))
+    ordenados = sorted(candidatos.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+    return [(produto, lift, confianca) for produto, (lift, confianca) in ordenados[:k]]
+
+
+def benchmark_recomendacao(n_transacoes=50_000, n_cestas=10_000, k=5, semente=42):
+    """
+    Mede a latência de `IndiceRecomendacao.recomendar` e a vazão de
+    `recomendar_lote`, comparadas a filtrar o DataFrame de regras por consulta.
+    
+    Args:
+        n_transacoes (int): Número de compras sintéticas usadas na mineração.
+        n_cestas (int): Número de cestas consultadas.
+        k (int): Recomendações por cesta.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Latências por cesta (em microssegundos), tempo do lote e aceleração.
+    """
+    compras = gerar_compras(n_transacoes, semente=semente)
+    _, rules = analisar_regras_associacao(compras, 0.002, 0.1, caminho_csv=None)
+    indice, tempo_construcao = cronometrar(IndiceRecomendacao, rules)
+    
+    rng = np.random.default_rng(semente)
+    produtos = np.sort(compras['produto'].unique())
+    cestas = [list(rng.choice(produtos, rng.integers(1, 8), replace=False)) for _ in range(n_cestas)]
+    amostra = cestas[:500]
+    
+    referencia, tempo_referencia = cronometrar(lambda: [recomendar_varrendo_regras(rules, cesta, k) for cesta in amostra])
+    individuais, tempo_individual = cronometrar(lambda: [indice.recomendar(cesta, k) for cesta in cestas])
+    lote, tempo_lote = cronometrar(indice.recomendar_lote, cestas, k)
+    assert referencia == individuais[:len(amostra)], "recomendar divergiu da varredura das regras"
+    por_cesta = [list(grupo.itertuples(index=False, name=None)) for _, grupo in lote.groupby('cesta')[['produto', 'lift', 'confianca']]]
+    assert por_cesta == [recomendacoes for recomendacoes in individuais if recomendacoes], "recomendar_lote divergiu de recomendar"
+    
+    latencia_referencia = tempo_referencia / len(amostra) * 1e6
+    latencia_indice = tempo_individual / n_cestas * 1e6
+    latencia_lote = tempo_lote / n_cestas * 1e6
+    aceleracao = latencia_referencia / latencia_indice
+    print(f"{len(rules)} regras, {len(indice)} antecedentes (índice construído em {tempo_construcao:.2f}s)")
+    print(f"Varredura das regras: {latencia_referencia:9.1f} µs por cesta")
+    print(f"recomendar:           {latencia_indice:9.1f} µs por cesta")
+    print(f"recomendar_lote:      {latencia_lote:9.1f} µs por cesta ({n_cestas} cestas em {tempo_lote:.3f}s)")
+    print(f"Aceleração: {aceleracao:.0f}x")
+    return {
+        'referencia_us': latencia_referencia,
+        'otimizado_us': latencia_indice,
+        'lote_us': latencia_lote,
+        'aceleracao': aceleracao,
+    }
+
+
+def podar_regras_com_frozensets(rules):
+    """Poda de referência: compara os frozensets das regras em Python, grupo a grupo."""
+    regras = list(rules[['antecedents', 'consequents', 'lift', 'support']].itertuples(index=False))
+    por_consequente, por_antecedente = {}, {}
+    for posicao, (antecedentes, consequentes, _, _) in enumerate(regras):
+        por_consequente.setdefault(consequentes, []).append(posicao)
+        por_antecedente.setdefault(antecedentes, []).append(posicao)
+    
+    mantidas = []
+    for antecedentes, consequentes, lift, suporte in regras:
+        redundante = any(
+            regras[outra].antecedents < antecedentes and regras[outra].lift >= lift
+            for outra in por_consequente[consequentes]
+        )
+        nao_fechada = any(
+            consequentes < regras[outra].consequents and np.isclose(suporte, regras[outra].support)
+            for outra in por_antecedente[antecedentes]
+        )
+        mantidas.append(not (redundante or nao_fechada))
+    return rules[np.array(mantidas)]
+
+
+def etapas_seguintes(rules, pasta):
+    """Etapas que consomem as regras: gravação em CSV, relatório e índice de recomendação."""
+    salvar_regras(rules, os.path.join(pasta, "regras"), 'csv')
+    gerar_relatorio_associacao(rules, os.path.join(pasta, "relatorio.md"))
+    IndiceRecomendacao(rules)
+
+
+def benchmark_poda_regras(n_transacoes=50_000, min_support=0.002, min_confidence=0.05, semente=42):
+    """
+    Compara a poda vetorizada (`podar_regras`) com a comparação de frozensets
+    em Python e mede o efeito da poda nas etapas seguintes.
+    
+    Args:
+        n_transacoes (int): Número de compras sintéticas.
+        min_support (float): Suporte mínimo da mineração.
+        min_confidence (float): Confiança mínima das regras.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos da poda, tempos das etapas seguintes e número de regras.
+    """
+    compras = gerar_compras(n_transacoes, semente=semente)
+    matriz, produtos = codificar_transacoes(compras)
+    conjuntos = minerar_conjuntos_frequentes(matriz, produtos, min_support)
+    rules = association_rules(conjuntos, metric="confidence", min_threshold=min_confidence)
+    
+    referencia, tempo_referencia = cronometrar(podar_regras_com_frozensets, rules)
+    podadas, tempo_poda = cronometrar(podar_regras, rules)
+    assert referencia.index.equals(podadas.index), "podar_regras divergiu da comparação de frozensets"
+    
+    with tempfile.TemporaryDirectory(prefix="benchmark_poda_") as pasta:
+        _, tempo_completas = cronometrar(etapas_seguintes, rules, pasta)
+        _, tempo_podadas = cronometrar(etapas_seguintes, podadas, pasta)
+    
+    aceleracao = tempo_referencia / tempo_poda
+    print(f"{len(rules)} regras -> {len(podadas)} após a poda ({podadas.attrs['regras_removidas']})")
+    print(f"Poda com frozensets: {tempo_referencia:.2f}s")
+    print(f"podar_regras:        {tempo_poda:.3f}s")
+    print(f"Aceleração: {aceleracao:.1f}x")
+    print(f"CSV + relatório + índice: {tempo_completas:.2f}s com todas as regras, {tempo_podadas:.2f}s após a poda")
+    return {
+        'referencia': tempo_referencia,
+        'otimizado': tempo_poda,
+        'aceleracao': aceleracao,
+        'regras': len(rules),
+        'regras_podadas': len(podadas),
+        'etapas_seguintes_completas': tempo_completas,
+        'etapas_seguintes_podadas': tempo_podadas,
+    }
+
+
+def gerar_compras_particionadas(n_transacoes, n_estados=27, semente=42):
+    """
+    Gera compras sintéticas (`gerar_compras`) com estado e data por compra.
+    
+    Args:
+        n_transacoes (int): Número de compras.
+        n_estados (int): Número de estados distintos.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        pandas.DataFrame: Colunas 'id_da_compra', 'produto', 'estado' e 'data'.
+    """
+    rng = np.random.default_rng(semente)
+    df = gerar_compras(n_transacoes, semente=semente)
+    compras = df['id_da_compra'].to_numpy()
+    estados = np.array([f"estado {i:02d}" for i in range(n_estados)], dtype=object)
+    datas = pd.date_range("2023-01-01", "2023-12-31").strftime("%Y-%m-%d").to_numpy(dtype=object)
+    df['estado'] = estados[rng.integers(0, n_estados, n_transacoes)][compras]
+    df['data'] = datas[rng.integers(0, len(datas), n_transacoes)][compras]
+    return df
+
+
+def minerar_fatia_a_fatia(df, chave, min_support, min_confidence):
+    """Referência: filtra os dados e codifica as transações de novo para cada partição."""
+    valores = df['data'].str[:7] if chave == 'mes' else df[chave]
+    regras = {}
+    for valor in sorted(valores.unique()):
+        matriz, produtos = codificar_transacoes(df[valores == valor])
+        conjuntos = minerar_conjuntos_frequentes(matriz, produtos, min_support)
+        if len(conjuntos):
+            regras[valor] = podar_regras(association_rules(conjuntos, metric="confidence", min_threshold=min_confidence))
+    return regras
+
+
+def benchmark_particoes(n_transacoes=300_000, chave='estado', min_support=0.01, min_confidence=0.2,
+                        processos=None, semente=42):
+    """
+    Compara a mineração fatia a fatia com `minerar_por_particao`, que codifica
+    as partições de uma vez e as minera em paralelo.
+    
+    Args:
+        n_transacoes (int): Número de compras sintéticas.
+        chave (str): Chave de partição ('estado' ou 'mes').
+        min_support (float): Suporte mínimo de cada partição.
+        min_confidence (float): Confiança mínima.
+        processos (list): Números de processos a testar (padrão: 1 até o número de núcleos).
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempo da referência e de `minerar_por_particao` por número de processos.
+    """
+    df = gerar_compras_particionadas(n_transacoes, semente=semente)
+    if processos is None:
+        processos = sorted({1, os.cpu_count() or 1})
+    
+    referencia, tempo_referencia = cronometrar(minerar_fatia_a_fatia, df, chave, min_support, min_confidence)
+    print(f"{n_transacoes} compras por '{chave}': fatia a fatia {tempo_referencia:.2f}s")
+    tempos = {}
+    for numero in processos:
+        resultado, tempos[numero] = cronometrar(minerar_por_particao, df, chave, min_support, min_confidence, processos=numero)
+        for valor, regras in referencia.items():
+            particao = resultado[resultado['particao'] == valor]
+            # O lift das partições tem a mesma precisão do global (4 casas)
+            esperado = regras.assign(lift=regras['lift'].round(4)).sort_values('lift', ascending=False)
+            assert len(particao) == len(esperado) and np.allclose(particao['lift'], esperado['lift']), \
+                f"minerar_por_particao divergiu na partição {valor}"
+        print(f"minerar_por_particao, {numero} processo(s): {tempos[numero]:.2f}s "
+              f"({tempo_referencia / tempos[numero]:.1f}x)")
+    return {'referencia': tempo_referencia, 'processos': tempos}
+
+
+def consultar_linhas(df, por, filtros):
+    """Consulta de referência: agrupa os registros limpos a cada pergunta, como os painéis."""
+    dados = df.assign(dia=df['data'], hora=df['hora'].str[:2], mes=df['data'].str[:7], registros=1)
+    for dimensao, valores in filtros.items():
+        dados = dados[dados[dimensao].isin(valores)]
+    medidas = ['total', 'quantidade', 'frete', 'registros']
+    return dados.groupby(por, dropna=False, sort=True)[medidas].sum().reset_index()
+
+
+def benchmark_cubo(n_linhas=1_000_000, repeticoes=5, semente=42):
+    """
+    Compara consultas respondidas por `CuboVendas` com groupbys sobre os registros limpos.
+    
+    Args:
+        n_linhas (int): Número de linhas sintéticas.
+        repeticoes (int): Execuções de cada consulta (é usado o tempo médio).
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempo de construção do cubo e, por consulta, os tempos e a aceleração.
+    """
+    df = gerar_dados_limpos(n_linhas, semente)
+    cubo, tempo_construcao = cronometrar(CuboVendas, df)
+    print(f"{n_linhas} linhas: cubo construído em {tempo_construcao:.2f}s "
+          f"({sum(len(tabela) for tabela in cubo.niveis.values())} linhas em {len(cubo.niveis)} níveis)")
+    
+    consultas = {
+        'faturamento por mês': (['mes'], {}),
+        'mês × estado': (['mes', 'estado'], {}),
+        'produto em SP e RJ': (['produto'], {'estado': ['sp', 'rj']}),
+        'vendedor × marca no pix': (['vendedor', 'marca'], {'pagamento': ['pix']}),
+        'hora do dia': (['hora'], {}),
+    }
+    resultados = {}
+    for nome, (por, filtros) in consultas.items():
+        referencia, tempo_referencia = cronometrar(
+            lambda: [consultar_linhas(df, por, filtros) for _ in range(repeticoes)][-1]
+        )
+        resultado, tempo_cubo = cronometrar(lambda: [cubo.consultar(por, filtros) for _ in range(repeticoes)][-1])
+        assert len(referencia) == len(resultado) and np.allclose(
+            referencia[['total', 'frete', 'registros']], resultado[['total', 'frete', 'registros']]
+        ), f"a consulta '{nome}' divergiu do groupby"
+        tempo_referencia, tempo_cubo = tempo_referencia / repeticoes, tempo_cubo / repeticoes
+        resultados[nome] = {
+            'referencia': tempo_referencia,
+            'otimizado': tempo_cubo,
+            'aceleracao': tempo_referencia / tempo_cubo,
+        }
+        print(f"{nome:<26} groupby {tempo_referencia * 1000:8.1f} ms | cubo {tempo_cubo * 1000:7.2f} ms "
+              f"({tempo_referencia / tempo_cubo:.0f}x, nível {' × '.join(cubo.nivel_para(por + list(filtros)))})")
+    return {'construcao': tempo_construcao, 'consultas': resultados}
+
+
+def contar_exato(df, colunas_frequentes, colunas_distintas, n):
+    """Contagens exatas equivalentes às de `EsbocosVendas`, sobre o DataFrame inteiro."""
+    top = {coluna: df[coluna].value_counts().head(n) for coluna in colunas_frequentes}
+    distintos = {coluna: df[coluna].nunique() for coluna in colunas_distintas}
+    return top, distintos
+
+
+def resumir_em_blocos(df, tamanho_bloco, colunas_frequentes, colunas_distintas):
+    """Atualiza um `EsbocosVendas` por bloco, como um trabalhador, e mescla os resultados."""
+    esbocos = EsbocosVendas(colunas_frequentes, colunas_distintas)
+    for inicio in range(0, len(df), tamanho_bloco):
+        bloco = df.iloc[inicio:inicio + tamanho_bloco]
+        esbocos.mesclar(EsbocosVendas(colunas_frequentes, colunas_distintas).atualizar(bloco))
+    return esbocos
+
+
+def benchmark_esbocos(n_linhas=1_000_000, n_clientes=200_000, tamanho_bloco=100_000, n=10, semente=42):
+    """
+    Compara `EsbocosVendas` (atualizado por bloco e mesclado) com `value_counts` e `nunique` exatos.
+    
+    Os clientes seguem uma distribuição de Zipf, para que poucos concentrem a
+    maior parte das compras e muitos apareçam uma única vez.
+    
+    Args:
+        n_linhas (int): Número de linhas sintéticas.
+        n_clientes (int): Número máximo de clientes distintos.
+        tamanho_bloco (int): Linhas por bloco.
+        n (int): Itens mais frequentes comparados por coluna.
+        semente (int): Semente do gerador aleatório.
+        
+    Returns:
+        dict: Tempos, picos de memória, tamanho dos esboços e erros observados.
+    """
+    df = gerar_dados_limpos(n_linhas, semente)
+    rng = np.random.default_rng(semente)
+    df['cliente'] = pd.Series(np.minimum(rng.zipf(1.3, n_linhas), n_clientes)).map("cliente {}".format)
+    colunas_frequentes = ('produto', 'cliente')
+    colunas_distintas = ('cliente', 'id_da_compra')
+    
+    (top, distintos), tempo_exato, pico_exato = medir_pico_memoria(
+        contar_exato, df, colunas_frequentes, colunas_distintas, n
+    )
+    esbocos, tempo_esbocos, pico_esbocos = medir_pico_memoria(
+        resumir_em_blocos, df, tamanho_bloco, colunas_frequentes, colunas_distintas
+    )
+    tamanho_mb = len(pickle.dumps(esbocos)) / 1024 ** 2
+    
+    print(f"{n_linhas} linhas em blocos de {tamanho_bloco}; esboços com {tamanho_mb:.2f} MB")
+    erros = {}
+    for coluna in colunas_frequentes:
+        estimado = esbocos.top(coluna, n)
+        reais = df[coluna].value_counts()
+        assert ((estimado['minimo'] <= reais[estimado.index]) & (reais[estimado.index] <= estimado['contagem'])).all(), \
+            f"contagem real fora dos limites em '{coluna}'"
+        iguais = len(set(estimado.index) & set(top[coluna].index))
+        erros[f"top_{coluna}"] = int((estimado['contagem'] - reais[estimado.index]).max())
+        print(f"top {n} de {coluna:<13} {iguais}/{n} itens em comum com o exato, "
+              f"maior excesso na contagem: {erros[f'top_{coluna}']}")
+    for coluna in colunas_distintas:
+        estimativa, erro_padrao = esbocos.contar_distintos(coluna)
+        erros[f"distintos_{coluna}"] = estimativa / distintos[coluna] - 1
+        print(f"distintos de {coluna:<13} {estimativa} estimados, {distintos[coluna]} reais "
+              f"(erro {erros[f'distintos_{coluna}']:+.2%}, erro padrão {erro_padrao:.2%})")
+    print(f"exato:   {tempo_exato:.3f}s (pico {pico_exato:.1f} MB)")
+    print(f"esboços: {tempo_esbocos:.3f}s (pico {pico_esbocos:.1f} MB)")
+    return {
+        'referencia': tempo_exato,
+        'otimizado': tempo_esbocos,
+        'pico_referencia_mb': pico_exato,
+        'pico_otimizado_mb': pico_esbocos,
+        'tamanho_esbocos_mb': tamanho_mb,
+        'erros': erros,
+    }
+
+
+BENCHMARKS = {
+    'produtos': benchmark_padronizacao_produtos,
+    'data_hora': benchmark_data_hora,
+    'numericos': benchmark_colunas_numericas,
+    'ceps': benchmark_ceps,
+    'codificacao': benchmark_codificacao,
+    'mineracao': benchmark_mineracao,
+    'varredura': benchmark_varredura,
+    'formatos_saida': benchmark_formatos_saida,
+    'carregamento': benchmark_carregamento,
+    'paralelismo': benchmark_paralelismo,
+    'similaridade': benchmark_similaridade,
+    'produtos_similares': benchmark_produtos_similares,
+    'totais': benchmark_totais,
+    'duplicatas': benchmark_duplicatas,
+    'recomendacao': benchmark_recomendacao,
+    'poda_regras': benchmark_poda_regras,
+    'particoes': benchmark_particoes,
+    'cubo': benchmark_cubo,
+    'esbocos': benchmark_esbocos,
+}
+
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        print(f"\n=== Benchmark: {nome} ===")
+        BENCHMARKS[nome]()
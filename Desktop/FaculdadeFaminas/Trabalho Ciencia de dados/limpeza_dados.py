@@ -5,23 +5,149 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import time
+from collections import deque
+from functools import lru_cache
+from itertools import combinations
+import hashlib
+import json
+import inspect
 import re
+import sys
 import warnings
 import os
-warnings.filterwarnings('ignore')
-from mlxtend.frequent_patterns import apriori, association_rules
-from mlxtend.preprocessing import TransactionEncoder
+import tempfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+# mlxtend, scipy.sparse, concurrent.futures e cProfile são importados apenas
+# nas funções que os usam: quem só precisa das funções de limpeza (ex.:
+# `validar_cep`, `padronizar_produto`) não paga o custo dessas importações.
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS no perfil de execução
+    resource = None
 
-# Criação de diretórios se não existirem
-os.makedirs("dadosLimpos", exist_ok=True)
-os.makedirs("relatorios", exist_ok=True)
+# Caminhos e limiares padrão da linha de comando (ver `python limpeza_dados.py --help`).
+# As pastas de saída são criadas por `main` (e por cada função que grava um
+# arquivo), não na importação do módulo.
+CAMINHO_ENTRADA = "dadosSujos/vendas_modificado (2).csv"
+PASTA_DADOS_LIMPOS = "dadosLimpos"
+PASTA_RELATORIOS = "relatorios"
+MIN_SUPORTE = 0.01
+MIN_CONFIANCA = 0.3
+ETAPAS_PIPELINE = ('limpeza', 'associacao', 'cubo')
+COLUNAS_TRANSACAO = ['id_da_compra', 'produto']
 
-def carregar_dados(caminho_arquivo):
+# Modo streaming: defina TAMANHO_CHUNK com o número de linhas por bloco para
+# processar o arquivo de entrada em blocos, sem carregá-lo inteiro na memória.
+# Com None, o arquivo é carregado de uma vez (modo padrão).
+TAMANHO_CHUNK = None
+TAMANHO_CHUNK_PADRAO = 100_000
+
+# Cache de etapas: a saída de cada etapa do pipeline é gravada em PASTA_CACHE
+# (Parquet) e reaproveitada enquanto os dados de entrada, os parâmetros e o
+# código da etapa não mudarem. Liste em ETAPAS_INVALIDADAS os nomes das etapas
+# que devem ser refeitas na próxima execução (ex.: ['ceps']).
+USAR_CACHE_ETAPAS = True
+PASTA_CACHE = ".cache_etapas"
+TAMANHO_MAXIMO_CACHE_MB = 2048
+ETAPAS_INVALIDADAS = []
+# Parâmetros que mudam apenas a forma de executar uma etapa, não o resultado:
+# ficam fora da chave do cache
+PARAMETROS_SEM_EFEITO_NO_CACHE = ('processos',)
+
+# Perfil de execução: cada etapa registra tempo de parede, tempo de CPU, linhas
+# de entrada e saída, pico de RSS do processo e a memória do DataFrame
+# resultante. O perfil é gravado em CAMINHO_PERFIL (JSON) e anexado ao
+# relatório de limpeza. Opcionais, por deixarem a execução mais lenta:
+# PERFIL_RASTREAR_MEMORIA mede o pico alocado por etapa com tracemalloc, e
+# PERFIL_CPROFILE executa as etapas sob o cProfile, com o dump em
+# CAMINHO_CPROFILE (ex.: `python -m pstats relatorios/perfil_execucao.prof`).
+PERFIL_EXECUCAO = True
+PERFIL_RASTREAR_MEMORIA = False
+PERFIL_CPROFILE = False
+CAMINHO_PERFIL = "relatorios/perfil_execucao.json"
+CAMINHO_CPROFILE = "relatorios/perfil_execucao.prof"
+FUNCOES_CPROFILE_EXIBIDAS = 15
+
+# Formato dos arquivos de saída (dados limpos e regras): 'csv', 'parquet' ou
+# 'feather'. Parquet e Feather preservam os tipos (inclusive categóricos) e
+# gravam os conjuntos de produtos das regras como listas. Requer pyarrow.
+FORMATO_SAIDA = 'csv'
+FORMATOS_SAIDA = ('csv', 'parquet', 'feather')
+
+# Colunas de baixa cardinalidade, gravadas como categóricas nos formatos binários
+COLUNAS_CATEGORICAS = ['cliente', 'produto', 'status', 'cidade', 'estado', 'pais', 'pagamento', 'vendedor', 'marca']
+
+# Esquema do arquivo de vendas usado por `carregar_dados`: colunas de baixa
+# cardinalidade como categóricas e data, hora e CEP como texto (preserva zeros
+# à esquerda). As colunas numéricas sujas (com "R$", vírgula etc.) e o ID da
+# compra continuam com o tipo inferido pelo leitor.
+ESQUEMA_VENDAS = {
+    'data': str,
+    'hora': str,
+    'cep': str,
+    'status': 'category',
+    'cidade': 'category',
+    'estado': 'category',
+    'pais': 'category',
+    'pagamento': 'category',
+    'vendedor': 'category',
+    'marca': 'category',
+}
+
+# Leitor de CSV usado por `carregar_dados`: 'c' (padrão do pandas) ou 'pyarrow'
+MOTOR_CSV = 'c'
+
+# Execução paralela das etapas por linha (etapa 3): o DataFrame é dividido em
+# faixas de linhas processadas por NUMERO_PROCESSOS processos e remontado na
+# ordem original. Com 1, tudo roda no processo principal.
+NUMERO_PROCESSOS = 1
+PARTICOES_POR_PROCESSO = 4
+
+# Colunas lidas sempre como texto no modo streaming, para que a inferência de
+# tipos de cada bloco não altere o conteúdo (ex.: CEP ou hora lidos como número)
+TIPOS_TEXTO_STREAMING = {'data': str, 'hora': str, 'cep': str}
+
+def _ler_csv_pyarrow(caminho_arquivo, usecols, tipos):
+    """
+    Lê o CSV com `pyarrow.csv`, já convertendo os tipos do esquema.
+    
+    Colunas categóricas são lidas como dicionários do Arrow (viram `category`)
+    e colunas de texto como strings, com campos vazios tratados como ausentes,
+    como no leitor 'c' do pandas.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    
+    tipos_arrow = {}
+    for coluna, tipo in tipos.items():
+        if tipo == 'category':
+            tipos_arrow[coluna] = pa.dictionary(pa.int32(), pa.string())
+        elif tipo is str:
+            tipos_arrow[coluna] = pa.string()
+    opcoes = pa_csv.ConvertOptions(column_types=tipos_arrow, strings_can_be_null=True, include_columns=usecols)
+    df = pa_csv.read_csv(caminho_arquivo, convert_options=opcoes).to_pandas()
+    
+    outros_tipos = {coluna: tipo for coluna, tipo in tipos.items() if coluna not in tipos_arrow}
+    return df.astype(outros_tipos) if outros_tipos else df
+
+def carregar_dados(caminho_arquivo, usecols=None, engine=MOTOR_CSV, esquema=ESQUEMA_VENDAS, relatar=True):
     """
     Carrega o arquivo CSV de vendas e retorna um DataFrame.
     
+    Os tipos das colunas vêm de `esquema`, evitando um objeto Python por
+    célula nas colunas categóricas e a leitura de CEPs e horas como números.
+    
     Args:
         caminho_arquivo (str): Caminho do arquivo CSV a ser carregado.
+        usecols (list): Colunas a carregar (None para todas).
+        engine (str): Leitor de CSV, 'c' ou 'pyarrow'. Sem o pacote pyarrow,
+            o leitor 'c' é usado.
+        esquema (dict): Tipo de cada coluna, no formato do parâmetro `dtype`
+            de `pd.read_csv`.
+        relatar (bool): Se True, mostra o tempo de leitura e a memória ocupada,
+            comparada à que as colunas categóricas ocupariam como texto.
         
     Returns:
         pandas.DataFrame: DataFrame contendo os dados de vendas.
@@ -30,7 +156,30 @@ def carregar_dados(caminho_arquivo):
         FileNotFoundError: Se o arquivo não for encontrado.
         pd.errors.EmptyDataError: Se o arquivo estiver vazio.
     """
-    return pd.read_csv(caminho_arquivo)
+    tipos = {coluna: tipo for coluna, tipo in esquema.items() if usecols is None or coluna in usecols}
+    inicio = time.perf_counter()
+    if engine == 'pyarrow':
+        try:
+            df = _ler_csv_pyarrow(caminho_arquivo, usecols, tipos)
+        except ImportError:
+            print("Leitor 'pyarrow' indisponível; usando o leitor 'c'.")
+            engine = 'c'
+    if engine != 'pyarrow':
+        df = pd.read_csv(caminho_arquivo, usecols=usecols, dtype=tipos, engine=engine)
+    tempo = time.perf_counter() - inicio
+    
+    if relatar:
+        memoria = df.memory_usage(deep=True).sum()
+        categoricas = [coluna for coluna in df.columns if isinstance(df[coluna].dtype, pd.CategoricalDtype)]
+        memoria_texto = memoria + sum(
+            df[coluna].astype(object).memory_usage(deep=True, index=False)
+            - df[coluna].memory_usage(deep=True, index=False)
+            for coluna in categoricas
+        )
+        print(f"Arquivo carregado em {tempo:.2f}s ({len(df)} linhas, leitor '{engine}')")
+        print(f"Memória: {memoria / 1024 ** 2:.1f} MB "
+              f"(seriam {memoria_texto / 1024 ** 2:.1f} MB com as colunas categóricas como texto)")
+    return df
 
 def limpar_texto(texto):
     """
@@ -46,6 +195,685 @@ def limpar_texto(texto):
         return texto
     return str(texto).strip().lower()
 
+# Correção para erros de digitação específicos encontrados nos dados
+CORRECOES_ESPECIFICAS = {
+    'amaciayte': 'amaciante',
+    'arroc': 'arroz',
+    'açúcaz': 'açúcar',
+    'cafc': 'café',
+    'caff': 'café',
+    'caft': 'café',
+    'clfé': 'café',
+    'cnfé': 'café',
+    'condibionador': 'condicionador',
+    'condicioiador': 'condicionador',
+    'deqergente': 'detergente',
+    'desinfekante': 'desinfetante',
+    'desinfetanue': 'desinfetante',
+    'deterwente': 'detergente',
+    'ieijão': 'feijão',
+    'macawrão': 'macarrão',
+    'macirrão': 'macarrão',
+    'majarrão': 'macarrão',
+    'manteigt': 'manteiga',
+    'mqcarrão': 'macarrão',
+    'presuntd': 'presunto',
+    'sabonepe': 'sabonete',
+    'scl': 'sal',
+    'tal': 'sal',
+    'zabonete': 'sabonete'
+}
+
+# Mapeamento organizado por categorias
+MAPEAMENTO_PRODUTOS = {
+    # Higiene Pessoal
+    'pasta de dente': [
+        'pasta dental', 'creme dental', 'pasta', 'colgate', 'sensodyne', 
+        'oral-b', 'creme de dente', 'gel dental', 'dentifrício', 'pasta oral',
+        'close up', 'sorriso', 'oral b', 'escova e pasta', 'pasta dentes'
+    ],
+    'sabonete': [
+        'sabão', 'sabonete líquido', 'sabonete em barra', 'sabonete antibacteriano', 
+        'sabonete íntimo', 'sabão em barra', 'dove', 'lux', 'protex', 'palmolive',
+        'nivea', 'sabonete hidratante', 'sabonete perfumado', 'soap'
+    ],
+    'condicionador': [
+        'condicionador capilar', 'creme de pentear', 'máscara de tratamento', 
+        'creme de cabelo', 'condicionador antiqueda', 'condicionador hidratante',
+        'conditioner', 'acondicionador', 'creme rinse', 'condicionador cabelos'
+    ],
+    'shampoo': [
+        'xampu', 'shampoo anticaspa', 'shampoo hidratante', 'shampoo antiqueda',
+        'shampoo para cabelos', 'shampoo especializado', 'xampu', 'shampo',
+        'champô', 'shampoo cabelo', 'pantene', 'head shoulders', 'h s',
+        'head and shoulders', 'elseve', 'seda', 'clear men', 'clear'
+    ],
+    'desodorante': [
+        'desodorante roll on', 'desodorante aerosol', 'antitranspirante', 
+        'desodorante spray', 'deo', 'rexona', 'nivea men', 'axe', 'dove deo'
+    ],
+    'papel higiênico': [
+        'papel higienico', 'papel sanitário', 'rolo de papel', 'papel de banheiro',
+        'paper higienico', 'neve', 'personal', 'papel wc', 'papel de toilet'
+    ],
+
+    # Laticínios
+    'queijo mussarela': [
+        'mussarela', 'queijo', 'queijo muçarela', 'queijo muzzarela', 
+        'queijo mozarela', 'queijo fatiado', 'queijo para lanche', 'queijo musarela',
+        'queijo muzarela', 'mozzarella', 'queijo branco', 'queijo para pizza'
+    ],
+    'manteiga': [
+        'margarina', 'manteiga sem sal', 'manteiga com sal', 'manteiga light',
+        'manteiga vegetal', 'creme vegetal', 'margarina light', 'qualy',
+        'doriana', 'delícia', 'becel', 'manteiga extra', 'butter', 'margarine'
+    ],
+    'leite': [
+        'leite integral', 'leite desnatado', 'leite semidesnatado', 
+        'leite em pó', 'leite condensado', 'leite zero lactose', 'leite uht',
+        'leite caixinha', 'leite garrafa', 'leite pasteurizado', 'milk',
+        'leite longa vida', 'leite fresco', 'ninho', 'molico', 'itambé', 'parmalat'
+    ],
+    'iogurte': [
+        'yogurt', 'iogurte natural', 'iogurte grego', 'iogurte light',
+        'iogurte desnatado', 'iogurte integral', 'danone', 'yakult',
+        'iogurte de frutas', 'activia', 'yoghurt', 'coalhada', 'danoninho',
+        'iogurte liquido', 'iogurte batido', 'iogurte de morango'
+    ],
+    'requeijão': [
+        'requeijao', 'requeijão cremoso', 'requeijão light', 'cream cheese',
+        'catupiry', 'philadelphia', 'requeijão tradicional', 'queijo cremoso'
+    ],
+
+    # Limpeza
+    'papel toalha': [
+        'toalha de papel', 'papel absorvente', 'papel toalha interfolhado',
+        'guardanapo', 'papel multiuso', 'papel de cozinha', 'snob',
+        'kitchen paper', 'papel descartavel', 'toalha papel'
+    ],
+    'desinfetante': [
+        'desinfetante líquido', 'desinfetante em pó', 'desinfetante concentrado',
+        'desinfetante spray', 'água sanitária', 'cloro', 'pinho sol', 'kalipto',
+        'lysoform', 'veja', 'ajax', 'casa e perfume', 'alvejante', 'sanitizer'
+    ],
+    'detergente': [
+        'detergente líquido', 'detergente em pó', 'detergente concentrado',
+        'sabão em pó', 'lava louças', 'detergente neutro', 'ypê', 'limpol',
+        'minuano', 'omo', 'ariel', 'brilhante', 'ace', 'washing powder',
+        'detergente para pratos', 'sabão para louça', 'dish soap'
+    ],
+    'amaciante': [
+        'amaciante de roupas', 'amaciante concentrado', 'comfort', 'downy',
+        'mon bijou', 'baby soft', 'fofo', 'softener', 'amaciador', 
+        'amaciante de tecidos', 'suavizante'
+    ],
+
+    # Bebidas
+    'cerveja': [
+        'cerveja lata', 'cerveja garrafa', 'cerveja long neck', 
+        'cerveja artesanal', 'chopp', 'cerveja pilsen', 'cerveja puro malte',
+        'skol', 'brahma', 'antarctica', 'heineken', 'budweiser', 'stella artois',
+        'beer', 'cerveja 600ml', 'cerveja pack', 'cerveja latinha'
+    ],
+    'refrigerante': [
+        'refri', 'coca', 'guaraná', 'fanta', 'sprite', 'soda',
+        'bebida gaseificada', 'refrigerante cola', 'refrigerante zero',
+        'coca cola', 'coca-cola', 'zero', 'pepsi', 'kuat', 'guarana antarctica',
+        'sukita', 'soda limonada', 'soft drink', 'coke', 'tonica', 'h2oh'
+    ],
+    'café': [
+        'café em pó', 'café solúvel', 'café torrado', 'café moído',
+        'café expresso', 'café instantâneo', 'cápsula de café', 'nespresso',
+        'pilão', 'melitta', '3 corações', 'café forte', 'café tradicional',
+        'coffee', 'café especial', 'café gourmet', 'café prima', 'nescafé'
+    ],
+    'suco': [
+        'suco de fruta', 'suco natural', 'suco de caixinha', 'suco em pó',
+        'tang', 'del valle', 'juice', 'néctar', 'suco integral',
+        'suco concentrado', 'refresco', 'suco de laranja', 'suco de uva'
+    ],
+    'água': [
+        'agua', 'água mineral', 'água com gás', 'água sem gás', 'água de coco',
+        'crystal', 'indaiá', 'bonafont', 'mineral water', 'h2o',
+        'água garrafa', 'água galão', 'água 500ml', 'água natural'
+    ],
+    'vinho': [
+        'vinho tinto', 'vinho branco', 'vinho rose', 'vinho suave', 'vinho seco',
+        'vinho de mesa', 'vinho fino', 'wine', 'vinhos', 'espumante', 'champagne',
+        'prosecco'
+    ],
+
+    # Alimentos Básicos
+    'arroz': [
+        'arroz branco', 'arroz integral', 'arroz parboilizado',
+        'arroz arbório', 'arroz basmati', 'arroz japonês', 'tio joão',
+        'camil', 'prato fino', 'arroz agulhinha', 'rice', 'arroz solto'
+    ],
+    'feijão': [
+        'feijão carioca', 'feijão preto', 'feijão branco',
+        'feijão fradinho', 'feijão verde', 'feijão vermelho', 'feijao',
+        'beans', 'feijão kilo', 'feijão pacote', 'feijão camil', 'kicaldo'
+    ],
+    'macarrão': [
+        'massa', 'espaguete', 'penne', 'parafuso', 'nhoque',
+        'talharim', 'fettuccine', 'massa para lasanha', 'spaghetti',
+        'pasta', 'adria', 'barilla', 'renata', 'galo', 'macarrão instantâneo',
+        'miojo', 'cup noodles', 'nissin', 'macarrão integral'
+    ],
+    'molho de tomate': [
+        'molho', 'extrato de tomate', 'polpa de tomate',
+        'molho pronto', 'molho de pizza', 'passata', 'pomarola', 'quero',
+        'heinz', 'tomato sauce', 'molho de macarrão', 'sauce', 'ketchup'
+    ],
+    'farinha': [
+        'farinha de trigo', 'farinha de milho', 'farinha de mandioca',
+        'farinha de rosca', 'fubá', 'polvilho', 'maizena', 'farinha panko',
+        'flour', 'amido de milho', 'farinha lactea', 'farinha integral'
+    ],
+    'carvão': [
+        'carvão vegetal', 'briquete', 'carvão para churrasco', 'carvão especial',
+        'carvão ecológico'
+    ],
+
+    # Temperos e Condimentos
+    'óleo': [
+        'óleo de soja', 'óleo de girassol', 'óleo de canola',
+        'óleo vegetal', 'azeite', 'óleo de milho', 'óleo de coco',
+        'soya', 'oil', 'óleo de oliva', 'lisa', 'liza', 'sadia',
+        'gordura', 'azeite extra virgem', 'azeite gallo', 'azeite andorinha'
+    ],
+    'açúcar': [
+        'açúcar refinado', 'açúcar cristal', 'açúcar mascavo',
+        'açúcar demerara', 'adoçante', 'açúcar orgânico', 'açucar',
+        'sugar', 'união', 'guarani', 'stevia', 'sucralose', 'açúcar light',
+        'açúcar confeiteiro', 'açúcar de confeiteiro', 'açúcar em pó'
+    ],
+    'sal': [
+        'sal refinado', 'sal grosso', 'sal marinho',
+        'sal light', 'sal iodado', 'sal rosa', 'sal do himalaia',
+        'salt', 'sal de cozinha', 'saleiro', 'sal cisne', 'sal temperado'
+    ],
+    'tempero': [
+        'tempero pronto', 'mix de temperos', 'tempero sazon', 'knorr', 'ajinomoto',
+        'tempero completo', 'caldo', 'caldo em pó', 'caldo em cubos', 'seasoning',
+        'pimenta', 'cominho', 'orégano', 'manjericão', 'alecrim', 'louro'
+    ],
+
+    # Frutas e Vegetais
+    'banana': [
+        'banana prata', 'banana nanica', 'banana da terra', 'banana maçã',
+        'cacho de banana', 'banana ouro', 'banana verde', 'bananas'
+    ],
+    'maçã': [
+        'maça', 'maça fuji', 'maça gala', 'maça verde', 'maça argentina',
+        'apple', 'maças', 'maçãs', 'maçãs vermelhas'
+    ],
+    'batata': [
+        'batata inglesa', 'batata doce', 'batata baroa', 'batata asterix',
+        'batatas', 'potato', 'potatoes', 'batata kg', 'batata lavada'
+    ],
+    'tomate': [
+        'tomate italiano', 'tomate cereja', 'tomate salada', 'tomate longa vida',
+        'tomates', 'tomato', 'tomate kg', 'tomate para molho'
+    ],
+    'cebola': [
+        'cebola branca', 'cebola roxa', 'cebola amarela', 'cebola nacional',
+        'onion', 'cebolas', 'cebola kg', 'cebola média'
+    ],
+
+    # Outros
+    'fralda': [
+        'fralda descartável', 'fralda geriátrica', 'fralda infantil',
+        'fralda pampers', 'fralda noturna', 'fralda premium', 'pampers',
+        'huggies', 'mamy poko', 'diapers', 'fralda tamanho', 'fralda pacote'
+    ],
+    'chocolate': [
+        'chocolate ao leite', 'chocolate amargo', 'chocolate branco',
+        'barra de chocolate', 'bombom', 'chocolate em pó', 'cacau em pó',
+        'garoto', 'nestlé', 'lacta', 'milka', 'lindt', 'hershey', 'chocolates'
+    ],
+    'pão': [
+        'pão francês', 'pão de forma', 'pão integral', 'pão de centeio',
+        'pão sírio', 'pão de hambúrguer', 'pão de hot dog', 'bread',
+        'pão pullman', 'bisnaguinha', 'pão caseiro', 'pão light'
+    ],
+    'biscoito': [
+        'bolacha', 'cookie', 'biscoito doce', 'biscoito salgado', 'biscoito recheado',
+        'wafer', 'cracker', 'rosquinha', 'cookies', 'oreo', 'passatempo',
+        'trakinas', 'club social', 'água e sal', 'cream cracker'
+    ],
+    'presunto': [
+        'presunto cozido', 'presunto parma', 'presunto royale', 'presunto defumado',
+        'apresuntado', 'ham', 'presunto fatiado', 'presunto magro'
+    ]
+}
+
+def preprocessar_produto(produto):
+    """
+    Normaliza o texto bruto de um produto antes da padronização.
+    
+    Args:
+        produto (str): Nome do produto como aparece nos dados.
+        
+    Returns:
+        str: Texto em minúsculas, sem caracteres especiais, espaços duplicados
+        e sem os termos genéricos 'produto' e 'item'.
+    """
+    produto = str(produto).lower().strip()
+    
+    # Pré-processamento para remover caracteres especiais e termos comuns irrelevantes
+    produto = re.sub(r'[^\w\s]', ' ', produto)  # Remove caracteres especiais
+    produto = re.sub(r'\s+', ' ', produto)      # Remove espaços duplicados
+    return produto.replace('produto', '').replace('item', '').strip()
+
+# Busca aproximada de produtos (distância de edição)
+LIMIAR_EDICAO_PRODUTO = 0.3  # Distância máxima na padronização, como fração do tamanho do produto
+TAMANHO_MINIMO_EDICAO = 4  # Produtos mais curtos não passam pela busca aproximada
+DISTANCIA_MAXIMA_SIMILARES = 3  # Distância máxima entre produtos apontados como similares na validação
+CONSIDERAR_TRANSPOSICOES = True  # Troca de duas letras vizinhas conta como uma única edição
+
+def distancia_edicao(a, b, limite=None, transposicoes=CONSIDERAR_TRANSPOSICOES):
+    """
+    Calcula a distância de edição (Levenshtein) entre dois textos.
+    
+    Com `transposicoes`, a troca de dois caracteres vizinhos custa uma única
+    edição (distância de Damerau-Levenshtein restrita). Com `limite`, o cálculo
+    é interrompido assim que a distância certamente passa do limite.
+    
+    Args:
+        a (str): Primeiro texto.
+        b (str): Segundo texto.
+        limite (int): Maior distância de interesse (None para calcular sempre).
+        transposicoes (bool): Se a troca de caracteres vizinhos conta como uma edição.
+        
+    Returns:
+        int: Distância entre os textos, ou `limite + 1` se ela passar do limite.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if limite is None:
+        limite = len(a)
+    if len(a) - len(b) > limite:
+        return limite + 1
+    
+    # Prefixo e sufixo comuns não alteram a distância
+    inicio = 0
+    while inicio < len(b) and a[inicio] == b[inicio]:
+        inicio += 1
+    fim = 0
+    while fim < len(b) - inicio and a[-1 - fim] == b[-1 - fim]:
+        fim += 1
+    a = a[inicio:len(a) - fim]
+    b = b[inicio:len(b) - fim]
+    if not b:
+        return min(len(a), limite + 1)
+    
+    # Só as células a até `limite` da diagonal podem ficar dentro do limite;
+    # as demais valem "infinito" (limite + 1)
+    infinito = limite + 1
+    linha_anterior2 = None
+    linha_anterior = [j if j <= limite else infinito for j in range(len(b) + 1)]
+    menor_anterior = 0
+    for i in range(1, len(a) + 1):
+        caractere_a = a[i - 1]
+        linha = [infinito] * (len(b) + 1)
+        if i <= limite:
+            linha[0] = i
+        menor = linha[0]
+        for j in range(max(1, i - limite), min(len(b), i + limite) + 1):
+            caractere_b = b[j - 1]
+            if caractere_a == caractere_b:
+                valor = linha_anterior[j - 1]
+            else:
+                valor = linha_anterior[j - 1] + 1
+                if linha_anterior[j] + 1 < valor:
+                    valor = linha_anterior[j] + 1
+                if linha[j - 1] + 1 < valor:
+                    valor = linha[j - 1] + 1
+                if (transposicoes and i > 1 and j > 1 and caractere_a == b[j - 2] and a[i - 2] == caractere_b
+                        and linha_anterior2[j - 2] + 1 < valor):
+                    valor = linha_anterior2[j - 2] + 1
+            linha[j] = valor
+            if valor < menor:
+                menor = valor
+        # As próximas linhas não ficam abaixo do limite (a transposição olha duas linhas atrás)
+        if menor > limite and (not transposicoes or menor_anterior >= limite):
+            return infinito
+        linha_anterior2, linha_anterior, menor_anterior = linha_anterior, linha, menor
+    return min(linha_anterior[-1], infinito)
+
+class IndiceSimilaridade:
+    """
+    Índice de n-gramas para buscar textos a poucas edições de distância.
+    
+    Dois textos a até k edições compartilham pelo menos |n-gramas| - k·n
+    n-gramas (k·(n+1) com transposições). Assim, basta procurar candidatos
+    pelos k·n + 1 n-gramas mais raros da consulta; os que também passam pelo
+    filtro de tamanho são confirmados com `distancia_edicao`, que para ao
+    passar do limite. Consultas curtas demais para o filtro de n-gramas usam
+    apenas o filtro de tamanho.
+    """
+    
+    def __init__(self, textos, n=2, transposicoes=CONSIDERAR_TRANSPOSICOES):
+        """
+        Args:
+            textos (iterable): Textos indexados; repetições são ignoradas e a
+                posição da primeira ocorrência desempata as buscas.
+            n (int): Tamanho dos n-gramas.
+            transposicoes (bool): Se a troca de caracteres vizinhos conta como uma edição.
+        """
+        self.textos = list(dict.fromkeys(textos))
+        self.n = n
+        self.transposicoes = transposicoes
+        self._postagens = {}
+        self._por_tamanho = {}
+        for indice, texto in enumerate(self.textos):
+            for grama in self._gramas(texto):
+                self._postagens.setdefault(grama, []).append(indice)
+            self._por_tamanho.setdefault(len(texto), []).append(indice)
+    
+    def _gramas(self, texto):
+        """N-gramas do texto com bordas, numerados por ocorrência (multiconjunto como conjunto)."""
+        borda = '\x00' * (self.n - 1)
+        texto = borda + texto + borda
+        ocorrencias = {}
+        gramas = []
+        for inicio in range(len(texto) - self.n + 1):
+            grama = texto[inicio:inicio + self.n]
+            ocorrencias[grama] = ocorrencias.get(grama, 0) + 1
+            gramas.append((grama, ocorrencias[grama]))
+        return gramas
+    
+    def candidatos(self, texto, limite):
+        """
+        Seleciona os textos indexados que podem estar a até `limite` edições.
+        
+        Args:
+            texto (str): Texto consultado.
+            limite (int): Distância máxima.
+            
+        Returns:
+            list: Índices dos candidatos (em `self.textos`), em ordem crescente.
+        """
+        gramas = self._gramas(texto)
+        por_edicao = self.n + 1 if self.transposicoes else self.n
+        tamanhos = range(len(texto) - limite, len(texto) + limite + 1)
+        if len(gramas) <= limite * por_edicao:
+            # Nenhum n-grama em comum é exigido: só o tamanho filtra
+            return sorted(indice for tamanho in tamanhos for indice in self._por_tamanho.get(tamanho, ()))
+        
+        raros = sorted(gramas, key=lambda grama: len(self._postagens.get(grama, ())))[:limite * por_edicao + 1]
+        encontrados = set()
+        for grama in raros:
+            encontrados.update(self._postagens.get(grama, ()))
+        return sorted(indice for indice in encontrados if len(self.textos[indice]) in tamanhos)
+    
+    def similares(self, texto, limite):
+        """
+        Lista os textos indexados a até `limite` edições.
+        
+        Args:
+            texto (str): Texto consultado.
+            limite (int): Distância máxima.
+            
+        Returns:
+            list: Pares (índice, distância), do mais próximo ao mais distante
+            (empates na ordem de indexação).
+        """
+        encontrados = []
+        for indice in self.candidatos(texto, limite):
+            distancia = distancia_edicao(texto, self.textos[indice], limite, self.transposicoes)
+            if distancia <= limite:
+                encontrados.append((indice, distancia))
+        return sorted(encontrados, key=lambda par: (par[1], par[0]))
+    
+    def buscar(self, texto, limite):
+        """
+        Busca o texto indexado mais próximo.
+        
+        Args:
+            texto (str): Texto consultado.
+            limite (int): Distância máxima.
+            
+        Returns:
+            tuple: (texto encontrado, distância), ou None se nenhum estiver a
+            até `limite` edições. Empates ficam com o indexado primeiro.
+        """
+        melhor = None
+        for indice in self.candidatos(texto, limite):
+            distancia = distancia_edicao(texto, self.textos[indice], limite, self.transposicoes)
+            if distancia <= limite and (melhor is None or distancia < melhor[1]):
+                melhor = (self.textos[indice], distancia)
+                limite = distancia  # Candidatos seguintes só interessam se forem mais próximos
+        return melhor
+
+    def pares_similares(self, limite):
+        """
+        Encontra todos os pares de textos indexados a até `limite` edições.
+        
+        Args:
+            limite (int): Distância máxima.
+            
+        Returns:
+            tuple: Ver `encontrar_pares_similares`.
+        """
+        return encontrar_pares_similares(self.textos, limite, self.transposicoes)
+
+def encontrar_pares_similares(textos, limite, transposicoes=CONSIDERAR_TRANSPOSICOES, tamanho_lote=200_000):
+    """
+    Encontra todos os pares de textos distintos a até `limite` edições.
+    
+    Evita comparar todos os pares (blocking por partição): cada texto é
+    dividido em k + 2 segmentos. Se dois textos estão a até k edições, ao
+    menos dois segmentos do mais curto aparecem intactos no outro, em posições
+    próximas (a diferença de tamanho limita o deslocamento possível); por
+    isso o segmento mais repetido de cada texto pode ser ignorado. Com
+    transposições, os segmentos são separados por um caractere, para que uma
+    troca de vizinhos não altere dois segmentos. Os segmentos são comparados
+    por hash, de forma vetorizada, apenas entre textos com tamanhos a até k de
+    diferença. Antes da confirmação com `_distancias_edicao_em_lote`, são
+    descartados os candidatos cujas contagens de caracteres diferem demais
+    (cada edição altera no máximo duas contagens).
+    
+    Args:
+        textos (list): Textos distintos.
+        limite (int): Distância máxima.
+        transposicoes (bool): Se a troca de caracteres vizinhos conta como uma edição.
+        tamanho_lote (int): Pares verificados por vez.
+        
+    Returns:
+        tuple: Arrays (índice_1, índice_2, distância), com índice_1 < índice_2,
+        ordenados por distância e depois pelos índices.
+    """
+    total = len(textos)
+    if total < 2:
+        vazio = np.empty(0, dtype=np.int64)
+        return vazio, vazio, vazio
+    codigos, tamanhos = _codigos_textos(textos, folga=limite)
+    hashes, potencias = _hashes_prefixos(codigos)
+    histogramas = _histogramas_caracteres(codigos, tamanhos)
+    separador = 1 if transposicoes else 0
+    numero_segmentos = limite + 2
+    
+    def filtrar(pares):
+        primeiros, segundos = pares // total, pares % total
+        diferenca = np.abs(histogramas[primeiros] - histogramas[segundos]).sum(axis=1, dtype=np.int32)
+        return pares[diferenca <= 2 * limite]
+    
+    por_tamanho = {int(tamanho): np.flatnonzero(tamanhos == tamanho) for tamanho in np.unique(tamanhos)}
+    candidatos = []
+    for tamanho, indexados in por_tamanho.items():
+        # Textos consultados: do mesmo tamanho até `limite` caracteres maiores
+        consultas = {
+            diferenca: por_tamanho[tamanho + diferenca]
+            for diferenca in range(limite + 1) if tamanho + diferenca in por_tamanho
+        }
+        utilizaveis = tamanho - separador * (numero_segmentos - 1)
+        if utilizaveis < numero_segmentos:
+            # Há segmentos vazios: todo texto consultado é candidato
+            for outros in consultas.values():
+                candidatos.append(filtrar(_combinar_pares(indexados, outros, total)))
+            continue
+        
+        # Segmentos: os primeiros com utilizaveis // numero_segmentos caracteres, os últimos com um a mais
+        curtos = numero_segmentos - utilizaveis % numero_segmentos
+        comprimentos = [utilizaveis // numero_segmentos + (segmento >= curtos) for segmento in range(numero_segmentos)]
+        inicios = (np.concatenate([[0], np.cumsum(comprimentos)[:-1]]) + separador * np.arange(numero_segmentos)).tolist()
+        todas_chaves = np.stack([
+            _hash_trecho(hashes, potencias, indexados, inicio, comprimento)
+            for inicio, comprimento in zip(inicios, comprimentos)
+        ], axis=1)
+        # Pelo menos dois segmentos ficam intactos: o mais comum de cada texto indexado é ignorado
+        frequencias = np.empty(todas_chaves.shape, dtype=np.int64)
+        for segmento in range(numero_segmentos):
+            _, inverso, contagens = np.unique(todas_chaves[:, segmento], return_inverse=True, return_counts=True)
+            frequencias[:, segmento] = contagens[inverso]
+        usados = np.ones(todas_chaves.shape, dtype=bool)
+        usados[np.arange(len(indexados)), frequencias.argmax(axis=1)] = False
+        for segmento, (inicio, comprimento) in enumerate(zip(inicios, comprimentos)):
+            chaves = todas_chaves[usados[:, segmento], segmento]
+            ordem = np.argsort(chaves)
+            chaves, ordenados = chaves[ordem], indexados[usados[:, segmento]][ordem]
+            
+            for diferenca, outros in consultas.items():
+                # Com até k edições e diferença de tamanho d, o deslocamento x satisfaz |x| + |d - x| <= k
+                for deslocamento in range(-((limite - diferenca) // 2), (limite + diferenca) // 2 + 1):
+                    posicao = inicio + deslocamento
+                    if posicao < 0 or posicao + comprimento > tamanho + diferenca:
+                        continue
+                    procuradas = _hash_trecho(hashes, potencias, outros, posicao, comprimento)
+                    esquerda = np.searchsorted(chaves, procuradas, side='left')
+                    quantidade = np.searchsorted(chaves, procuradas, side='right') - esquerda
+                    if not quantidade.any():
+                        continue
+                    inicio_grupo = np.repeat(esquerda - (np.cumsum(quantidade) - quantidade), quantidade)
+                    encontrados = ordenados[inicio_grupo + np.arange(quantidade.sum())]
+                    candidatos.append(filtrar(_codificar_pares(encontrados, np.repeat(outros, quantidade), total)))
+    
+    pares = np.unique(np.concatenate(candidatos)) if candidatos else np.empty(0, dtype=np.int64)
+    primeiros, segundos = pares // total, pares % total
+    distancias = np.concatenate([
+        _distancias_edicao_em_lote(
+            codigos, tamanhos, primeiros[inicio:inicio + tamanho_lote],
+            segundos[inicio:inicio + tamanho_lote], limite, transposicoes,
+        )
+        for inicio in range(0, len(primeiros), tamanho_lote)
+    ] or [np.empty(0, dtype=np.int64)])
+    dentro = distancias <= limite
+    primeiros, segundos, distancias = primeiros[dentro], segundos[dentro], distancias[dentro]
+    ordem = np.lexsort((segundos, primeiros, distancias))
+    return primeiros[ordem], segundos[ordem], distancias[ordem]
+
+def _codificar_pares(primeiros, segundos, total):
+    """Codifica pares de índices distintos como menor·total + maior (descarta i == j)."""
+    diferentes = primeiros != segundos
+    primeiros, segundos = primeiros[diferentes], segundos[diferentes]
+    return np.minimum(primeiros, segundos).astype(np.int64) * total + np.maximum(primeiros, segundos)
+
+def _combinar_pares(primeiros, segundos, total):
+    """Todos os pares entre dois grupos de índices (codificados por `_codificar_pares`)."""
+    return _codificar_pares(np.repeat(primeiros, len(segundos)), np.tile(segundos, len(primeiros)), total)
+
+def _codigos_textos(textos, folga=0):
+    """
+    Converte textos em uma matriz de códigos de caracteres.
+    
+    Returns:
+        tuple: (matriz textos × posições com os códigos, zeros após o fim e em
+        `folga` colunas extras; array com o tamanho de cada texto)
+    """
+    tamanhos = np.fromiter((len(texto) for texto in textos), dtype=np.int64, count=len(textos))
+    largura = max(int(tamanhos.max()), 1)
+    codigos = np.array(textos, dtype=f'<U{largura}').view(np.uint32).reshape(len(textos), largura)
+    return np.pad(codigos, ((0, 0), (0, folga))), tamanhos
+
+_BASE_HASH = np.uint64(1_000_003)
+
+def _hashes_prefixos(codigos):
+    """Hashes polinomiais (módulo 2**64) de todos os prefixos de cada texto."""
+    hashes = np.zeros((codigos.shape[0], codigos.shape[1] + 1), dtype=np.uint64)
+    potencias = np.ones(codigos.shape[1] + 1, dtype=np.uint64)
+    for coluna in range(codigos.shape[1]):
+        hashes[:, coluna + 1] = hashes[:, coluna] * _BASE_HASH + codigos[:, coluna].astype(np.uint64)
+        potencias[coluna + 1:coluna + 2] = potencias[coluna:coluna + 1] * _BASE_HASH
+    return hashes, potencias
+
+def _hash_trecho(hashes, potencias, indices, inicio, comprimento):
+    """Hash do trecho [inicio, inicio + comprimento) dos textos `indices`."""
+    return hashes[indices, inicio + comprimento] - hashes[indices, inicio] * potencias[comprimento]
+
+def _histogramas_caracteres(codigos, tamanhos, grupos=32):
+    """Contagem de caracteres de cada texto, com os códigos agrupados por resto da divisão."""
+    histogramas = np.zeros((len(tamanhos), grupos), dtype=np.int16)
+    linhas = np.arange(len(tamanhos))
+    for coluna in range(int(tamanhos.max(initial=0))):
+        dentro = tamanhos > coluna
+        np.add.at(histogramas, (linhas[dentro], codigos[dentro, coluna] % grupos), 1)
+    return histogramas
+
+def _distancias_edicao_em_lote(codigos, tamanhos, primeiros, segundos, limite, transposicoes=CONSIDERAR_TRANSPOSICOES):
+    """
+    Calcula `distancia_edicao` para muitos pares de uma vez (vetorizado por par).
+    
+    Percorre a matriz de programação dinâmica linha a linha, guardando apenas
+    a faixa de largura 2·limite + 1 em torno da diagonal, para todos os pares
+    ao mesmo tempo. Os pares devem ter tamanhos a até `limite` de diferença.
+    
+    Args:
+        codigos (numpy.ndarray): Matriz de `_codigos_textos` (com folga >= limite).
+        tamanhos (numpy.ndarray): Tamanho de cada texto.
+        primeiros (numpy.ndarray): Índice do primeiro texto de cada par.
+        segundos (numpy.ndarray): Índice do segundo texto de cada par.
+        limite (int): Maior distância de interesse.
+        transposicoes (bool): Se a troca de caracteres vizinhos conta como uma edição.
+        
+    Returns:
+        numpy.ndarray: Distância de cada par, ou `limite + 1` se passar do limite.
+    """
+    infinito = limite + 1
+    largura = 2 * limite + 1
+    a, b = codigos[primeiros], codigos[segundos]
+    tamanhos_a, tamanhos_b = tamanhos[primeiros], tamanhos[segundos]
+    pares = np.arange(len(primeiros))
+    
+    # Coluna d da faixa corresponde à posição j = i + d - limite da linha i
+    colunas = np.arange(largura) - limite
+    anterior = np.where((colunas >= 0) & (colunas <= tamanhos_b[:, None]), colunas, infinito)
+    anterior2 = anterior
+    resultado = np.where(tamanhos_a == 0, np.minimum(tamanhos_b, infinito), infinito)
+    for i in range(1, int(tamanhos_a.max(initial=0)) + 1):
+        linha = np.full((len(pares), largura), infinito, dtype=np.int64)
+        caractere_a = a[:, i - 1]
+        for d in range(largura):
+            j = i + d - limite
+            if j < 0:
+                continue
+            if j == 0:
+                linha[:, d] = min(i, infinito)
+                continue
+            caractere_b = b[:, j - 1]
+            diferente = caractere_a != caractere_b
+            valor = anterior[:, d] + diferente
+            if d + 1 < largura:
+                valor = np.minimum(valor, anterior[:, d + 1] + 1)
+            if d > 0:
+                valor = np.minimum(valor, linha[:, d - 1] + 1)
+            if transposicoes and i > 1 and j > 1:
+                troca = diferente & (caractere_a == b[:, j - 2]) & (a[:, i - 2] == caractere_b)
+                valor = np.where(troca, np.minimum(valor, anterior2[:, d] + 1), valor)
+            linha[:, d] = np.where(j <= tamanhos_b, np.minimum(valor, infinito), infinito)
+        terminados = tamanhos_a == i
+        resultado[terminados] = linha[pares[terminados], (tamanhos_b - tamanhos_a + limite)[terminados]]
+        anterior2, anterior = anterior, linha
+    return resultado
+
+@lru_cache(maxsize=1)
+def _indice_produtos_padrao():
+    """Índice dos produtos padrão e das correções, usado por `padronizar_produto`."""
+    return IndiceSimilaridade(list(MAPEAMENTO_PRODUTOS.keys()) + list(CORRECOES_ESPECIFICAS.values()))
+
 def padronizar_produto(produto):
     """
     Padroniza nomes de produtos organizados por categorias.
@@ -62,283 +890,25 @@ def padronizar_produto(produto):
     if pd.isna(produto):
         return produto
     
-    produto = str(produto).lower().strip()
-    
-    # Pré-processamento para remover caracteres especiais e termos comuns irrelevantes
-    produto = re.sub(r'[^\w\s]', ' ', produto)  # Remove caracteres especiais
-    produto = re.sub(r'\s+', ' ', produto)      # Remove espaços duplicados
-    produto = produto.replace('produto', '').replace('item', '').strip()
-    
-    # Correção para erros de digitação específicos encontrados nos dados
-    correcoes_especificas = {
-        'amaciayte': 'amaciante',
-        'arroc': 'arroz',
-        'açúcaz': 'açúcar',
-        'cafc': 'café',
-        'caff': 'café',
-        'caft': 'café',
-        'clfé': 'café',
-        'cnfé': 'café',
-        'condibionador': 'condicionador',
-        'condicioiador': 'condicionador',
-        'deqergente': 'detergente',
-        'desinfekante': 'desinfetante',
-        'desinfetanue': 'desinfetante',
-        'deterwente': 'detergente',
-        'ieijão': 'feijão',
-        'macawrão': 'macarrão',
-        'macirrão': 'macarrão',
-        'majarrão': 'macarrão',
-        'manteigt': 'manteiga',
-        'mqcarrão': 'macarrão',
-        'presuntd': 'presunto',
-        'sabonepe': 'sabonete',
-        'scl': 'sal',
-        'tal': 'sal',
-        'zabonete': 'sabonete'
-    }
+    produto = preprocessar_produto(produto)
     
     # Verifica se o produto está na lista de correções específicas
-    if produto in correcoes_especificas:
-        return correcoes_especificas[produto]
-    
-    # Mapeamento organizado por categorias
-    mapeamento = {
-        # Higiene Pessoal
-        'pasta de dente': [
-            'pasta dental', 'creme dental', 'pasta', 'colgate', 'sensodyne', 
-            'oral-b', 'creme de dente', 'gel dental', 'dentifrício', 'pasta oral',
-            'close up', 'sorriso', 'oral b', 'escova e pasta', 'pasta dentes'
-        ],
-        'sabonete': [
-            'sabão', 'sabonete líquido', 'sabonete em barra', 'sabonete antibacteriano', 
-            'sabonete íntimo', 'sabão em barra', 'dove', 'lux', 'protex', 'palmolive',
-            'nivea', 'sabonete hidratante', 'sabonete perfumado', 'soap'
-        ],
-        'condicionador': [
-            'condicionador capilar', 'creme de pentear', 'máscara de tratamento', 
-            'creme de cabelo', 'condicionador antiqueda', 'condicionador hidratante',
-            'conditioner', 'acondicionador', 'creme rinse', 'condicionador cabelos'
-        ],
-        'shampoo': [
-            'xampu', 'shampoo anticaspa', 'shampoo hidratante', 'shampoo antiqueda',
-            'shampoo para cabelos', 'shampoo especializado', 'xampu', 'shampo',
-            'champô', 'shampoo cabelo', 'pantene', 'head shoulders', 'h s',
-            'head and shoulders', 'elseve', 'seda', 'clear men', 'clear'
-        ],
-        'desodorante': [
-            'desodorante roll on', 'desodorante aerosol', 'antitranspirante', 
-            'desodorante spray', 'deo', 'rexona', 'nivea men', 'axe', 'dove deo'
-        ],
-        'papel higiênico': [
-            'papel higienico', 'papel sanitário', 'rolo de papel', 'papel de banheiro',
-            'paper higienico', 'neve', 'personal', 'papel wc', 'papel de toilet'
-        ],
-
-        # Laticínios
-        'queijo mussarela': [
-            'mussarela', 'queijo', 'queijo muçarela', 'queijo muzzarela', 
-            'queijo mozarela', 'queijo fatiado', 'queijo para lanche', 'queijo musarela',
-            'queijo muzarela', 'mozzarella', 'queijo branco', 'queijo para pizza'
-        ],
-        'manteiga': [
-            'margarina', 'manteiga sem sal', 'manteiga com sal', 'manteiga light',
-            'manteiga vegetal', 'creme vegetal', 'margarina light', 'qualy',
-            'doriana', 'delícia', 'becel', 'manteiga extra', 'butter', 'margarine'
-        ],
-        'leite': [
-            'leite integral', 'leite desnatado', 'leite semidesnatado', 
-            'leite em pó', 'leite condensado', 'leite zero lactose', 'leite uht',
-            'leite caixinha', 'leite garrafa', 'leite pasteurizado', 'milk',
-            'leite longa vida', 'leite fresco', 'ninho', 'molico', 'itambé', 'parmalat'
-        ],
-        'iogurte': [
-            'yogurt', 'iogurte natural', 'iogurte grego', 'iogurte light',
-            'iogurte desnatado', 'iogurte integral', 'danone', 'yakult',
-            'iogurte de frutas', 'activia', 'yoghurt', 'coalhada', 'danoninho',
-            'iogurte liquido', 'iogurte batido', 'iogurte de morango'
-        ],
-        'requeijão': [
-            'requeijao', 'requeijão cremoso', 'requeijão light', 'cream cheese',
-            'catupiry', 'philadelphia', 'requeijão tradicional', 'queijo cremoso'
-        ],
-
-        # Limpeza
-        'papel toalha': [
-            'toalha de papel', 'papel absorvente', 'papel toalha interfolhado',
-            'guardanapo', 'papel multiuso', 'papel de cozinha', 'snob',
-            'kitchen paper', 'papel descartavel', 'toalha papel'
-        ],
-        'desinfetante': [
-            'desinfetante líquido', 'desinfetante em pó', 'desinfetante concentrado',
-            'desinfetante spray', 'água sanitária', 'cloro', 'pinho sol', 'kalipto',
-            'lysoform', 'veja', 'ajax', 'casa e perfume', 'alvejante', 'sanitizer'
-        ],
-        'detergente': [
-            'detergente líquido', 'detergente em pó', 'detergente concentrado',
-            'sabão em pó', 'lava louças', 'detergente neutro', 'ypê', 'limpol',
-            'minuano', 'omo', 'ariel', 'brilhante', 'ace', 'washing powder',
-            'detergente para pratos', 'sabão para louça', 'dish soap'
-        ],
-        'amaciante': [
-            'amaciante de roupas', 'amaciante concentrado', 'comfort', 'downy',
-            'mon bijou', 'baby soft', 'fofo', 'softener', 'amaciador', 
-            'amaciante de tecidos', 'suavizante'
-        ],
-
-        # Bebidas
-        'cerveja': [
-            'cerveja lata', 'cerveja garrafa', 'cerveja long neck', 
-            'cerveja artesanal', 'chopp', 'cerveja pilsen', 'cerveja puro malte',
-            'skol', 'brahma', 'antarctica', 'heineken', 'budweiser', 'stella artois',
-            'beer', 'cerveja 600ml', 'cerveja pack', 'cerveja latinha'
-        ],
-        'refrigerante': [
-            'refri', 'coca', 'guaraná', 'fanta', 'sprite', 'soda',
-            'bebida gaseificada', 'refrigerante cola', 'refrigerante zero',
-            'coca cola', 'coca-cola', 'zero', 'pepsi', 'kuat', 'guarana antarctica',
-            'sukita', 'soda limonada', 'soft drink', 'coke', 'tonica', 'h2oh'
-        ],
-        'café': [
-            'café em pó', 'café solúvel', 'café torrado', 'café moído',
-            'café expresso', 'café instantâneo', 'cápsula de café', 'nespresso',
-            'pilão', 'melitta', '3 corações', 'café forte', 'café tradicional',
-            'coffee', 'café especial', 'café gourmet', 'café prima', 'nescafé'
-        ],
-        'suco': [
-            'suco de fruta', 'suco natural', 'suco de caixinha', 'suco em pó',
-            'tang', 'del valle', 'juice', 'néctar', 'suco integral',
-            'suco concentrado', 'refresco', 'suco de laranja', 'suco de uva'
-        ],
-        'água': [
-            'agua', 'água mineral', 'água com gás', 'água sem gás', 'água de coco',
-            'crystal', 'indaiá', 'bonafont', 'mineral water', 'h2o',
-            'água garrafa', 'água galão', 'água 500ml', 'água natural'
-        ],
-        'vinho': [
-            'vinho tinto', 'vinho branco', 'vinho rose', 'vinho suave', 'vinho seco',
-            'vinho de mesa', 'vinho fino', 'wine', 'vinhos', 'espumante', 'champagne',
-            'prosecco'
-        ],
-
-        # Alimentos Básicos
-        'arroz': [
-            'arroz branco', 'arroz integral', 'arroz parboilizado',
-            'arroz arbório', 'arroz basmati', 'arroz japonês', 'tio joão',
-            'camil', 'prato fino', 'arroz agulhinha', 'rice', 'arroz solto'
-        ],
-        'feijão': [
-            'feijão carioca', 'feijão preto', 'feijão branco',
-            'feijão fradinho', 'feijão verde', 'feijão vermelho', 'feijao',
-            'beans', 'feijão kilo', 'feijão pacote', 'feijão camil', 'kicaldo'
-        ],
-        'macarrão': [
-            'massa', 'espaguete', 'penne', 'parafuso', 'nhoque',
-            'talharim', 'fettuccine', 'massa para lasanha', 'spaghetti',
-            'pasta', 'adria', 'barilla', 'renata', 'galo', 'macarrão instantâneo',
-            'miojo', 'cup noodles', 'nissin', 'macarrão integral'
-        ],
-        'molho de tomate': [
-            'molho', 'extrato de tomate', 'polpa de tomate',
-            'molho pronto', 'molho de pizza', 'passata', 'pomarola', 'quero',
-            'heinz', 'tomato sauce', 'molho de macarrão', 'sauce', 'ketchup'
-        ],
-        'farinha': [
-            'farinha de trigo', 'farinha de milho', 'farinha de mandioca',
-            'farinha de rosca', 'fubá', 'polvilho', 'maizena', 'farinha panko',
-            'flour', 'amido de milho', 'farinha lactea', 'farinha integral'
-        ],
-        'carvão': [
-            'carvão vegetal', 'briquete', 'carvão para churrasco', 'carvão especial',
-            'carvão ecológico'
-        ],
-
-        # Temperos e Condimentos
-        'óleo': [
-            'óleo de soja', 'óleo de girassol', 'óleo de canola',
-            'óleo vegetal', 'azeite', 'óleo de milho', 'óleo de coco',
-            'soya', 'oil', 'óleo de oliva', 'lisa', 'liza', 'sadia',
-            'gordura', 'azeite extra virgem', 'azeite gallo', 'azeite andorinha'
-        ],
-        'açúcar': [
-            'açúcar refinado', 'açúcar cristal', 'açúcar mascavo',
-            'açúcar demerara', 'adoçante', 'açúcar orgânico', 'açucar',
-            'sugar', 'união', 'guarani', 'stevia', 'sucralose', 'açúcar light',
-            'açúcar confeiteiro', 'açúcar de confeiteiro', 'açúcar em pó'
-        ],
-        'sal': [
-            'sal refinado', 'sal grosso', 'sal marinho',
-            'sal light', 'sal iodado', 'sal rosa', 'sal do himalaia',
-            'salt', 'sal de cozinha', 'saleiro', 'sal cisne', 'sal temperado'
-        ],
-        'tempero': [
-            'tempero pronto', 'mix de temperos', 'tempero sazon', 'knorr', 'ajinomoto',
-            'tempero completo', 'caldo', 'caldo em pó', 'caldo em cubos', 'seasoning',
-            'pimenta', 'cominho', 'orégano', 'manjericão', 'alecrim', 'louro'
-        ],
-
-        # Frutas e Vegetais
-        'banana': [
-            'banana prata', 'banana nanica', 'banana da terra', 'banana maçã',
-            'cacho de banana', 'banana ouro', 'banana verde', 'bananas'
-        ],
-        'maçã': [
-            'maça', 'maça fuji', 'maça gala', 'maça verde', 'maça argentina',
-            'apple', 'maças', 'maçãs', 'maçãs vermelhas'
-        ],
-        'batata': [
-            'batata inglesa', 'batata doce', 'batata baroa', 'batata asterix',
-            'batatas', 'potato', 'potatoes', 'batata kg', 'batata lavada'
-        ],
-        'tomate': [
-            'tomate italiano', 'tomate cereja', 'tomate salada', 'tomate longa vida',
-            'tomates', 'tomato', 'tomate kg', 'tomate para molho'
-        ],
-        'cebola': [
-            'cebola branca', 'cebola roxa', 'cebola amarela', 'cebola nacional',
-            'onion', 'cebolas', 'cebola kg', 'cebola média'
-        ],
-
-        # Outros
-        'fralda': [
-            'fralda descartável', 'fralda geriátrica', 'fralda infantil',
-            'fralda pampers', 'fralda noturna', 'fralda premium', 'pampers',
-            'huggies', 'mamy poko', 'diapers', 'fralda tamanho', 'fralda pacote'
-        ],
-        'chocolate': [
-            'chocolate ao leite', 'chocolate amargo', 'chocolate branco',
-            'barra de chocolate', 'bombom', 'chocolate em pó', 'cacau em pó',
-            'garoto', 'nestlé', 'lacta', 'milka', 'lindt', 'hershey', 'chocolates'
-        ],
-        'pão': [
-            'pão francês', 'pão de forma', 'pão integral', 'pão de centeio',
-            'pão sírio', 'pão de hambúrguer', 'pão de hot dog', 'bread',
-            'pão pullman', 'bisnaguinha', 'pão caseiro', 'pão light'
-        ],
-        'biscoito': [
-            'bolacha', 'cookie', 'biscoito doce', 'biscoito salgado', 'biscoito recheado',
-            'wafer', 'cracker', 'rosquinha', 'cookies', 'oreo', 'passatempo',
-            'trakinas', 'club social', 'água e sal', 'cream cracker'
-        ],
-        'presunto': [
-            'presunto cozido', 'presunto parma', 'presunto royale', 'presunto defumado',
-            'apresuntado', 'ham', 'presunto fatiado', 'presunto magro'
-        ]
-    }
+    if produto in CORRECOES_ESPECIFICAS:
+        return CORRECOES_ESPECIFICAS[produto]
     
     # Busca pelo produto no mapeamento - match exato
-    for padrao, variacoes in mapeamento.items():
+    for padrao, variacoes in MAPEAMENTO_PRODUTOS.items():
         if produto in variacoes or produto == padrao:
             return padrao
     
     # Busca pelo produto no mapeamento - substring match
-    for padrao, variacoes in mapeamento.items():
+    for padrao, variacoes in MAPEAMENTO_PRODUTOS.items():
         if any(variacao in produto for variacao in variacoes) or padrao in produto:
             return padrao
     
     # Busca pelo produto no mapeamento - palavras-chave
     palavras_produto = set(produto.split())
-    for padrao, variacoes in mapeamento.items():
+    for padrao, variacoes in MAPEAMENTO_PRODUTOS.items():
         # Cria um conjunto de todas as palavras nas variações
         palavras_variacoes = set()
         for variacao in variacoes:
@@ -350,17 +920,194 @@ def padronizar_produto(produto):
             return padrao
     
     # Busca por similaridade para casos específicos - distância de edição
-    if len(produto) > 3:  # Apenas para produtos com mais de 3 caracteres
-        for padrao in list(mapeamento.keys()) + list(correcoes_especificas.values()):
-            # Calcula a distância de edição (Levenshtein)
-            distancia = sum(1 for a, b in zip(produto, padrao) if a != b) + abs(len(produto) - len(padrao))
-            # Se a distância for pequena em relação ao tamanho do produto
-            if distancia <= len(produto) * 0.3:  # Até 30% de diferença
-                return padrao
-            
+    if len(produto) >= TAMANHO_MINIMO_EDICAO:
+        # Produto padrão mais próximo, com até 30% de diferença em relação ao tamanho do produto
+        encontrado = _indice_produtos_padrao().buscar(produto, int(len(produto) * LIMIAR_EDICAO_PRODUTO))
+        if encontrado is not None:
+            return encontrado[0]
+    
     # Se não encontrou em nenhuma categoria, retorna o próprio produto
     return produto
 
+class _AutomatoAhoCorasick:
+    """
+    Autômato de Aho-Corasick para localizar vários padrões em uma única passada.
+    
+    Cada padrão é associado a um identificador; a busca devolve o conjunto de
+    identificadores de todos os padrões que aparecem como substring do texto.
+    """
+    
+    def __init__(self, padroes):
+        """
+        Args:
+            padroes (iterable): Pares (texto do padrão, identificador).
+        """
+        self._transicoes = [{}]
+        self._falhas = [0]
+        self._saidas = [set()]
+        
+        # Monta a trie com todos os padrões
+        for padrao, identificador in padroes:
+            estado = 0
+            for caractere in padrao:
+                proximo = self._transicoes[estado].get(caractere)
+                if proximo is None:
+                    proximo = len(self._transicoes)
+                    self._transicoes[estado][caractere] = proximo
+                    self._transicoes.append({})
+                    self._falhas.append(0)
+                    self._saidas.append(set())
+                estado = proximo
+            self._saidas[estado].add(identificador)
+        
+        # Calcula os links de falha em largura, herdando as saídas dos sufixos
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falhas[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falhas[falha]
+                self._falhas[proximo] = self._transicoes[falha].get(caractere, 0)
+                self._saidas[proximo] |= self._saidas[self._falhas[proximo]]
+    
+    def buscar(self, texto):
+        """
+        Retorna os identificadores dos padrões contidos no texto.
+        
+        Args:
+            texto (str): Texto a ser percorrido.
+            
+        Returns:
+            set: Identificadores dos padrões encontrados.
+        """
+        estado = 0
+        encontrados = set()
+        for caractere in texto:
+            while estado and caractere not in self._transicoes[estado]:
+                estado = self._falhas[estado]
+            estado = self._transicoes[estado].get(caractere, 0)
+            if self._saidas[estado]:
+                encontrados |= self._saidas[estado]
+        return encontrados
+
+class NormalizadorProdutos:
+    """
+    Versão compilada e memoizada de `padronizar_produto`.
+    
+    As estruturas de busca são montadas uma única vez a partir de
+    `CORRECOES_ESPECIFICAS` e `MAPEAMENTO_PRODUTOS`:
+    
+    - índice invertido variação → produto padrão (match exato);
+    - autômato de Aho-Corasick com todas as variações (substring match);
+    - mapa palavra-chave → produtos padrão (palavras em comum);
+    - índice de n-gramas para a distância de edição (`IndiceSimilaridade`).
+    
+    Cada texto distinto é resolvido uma única vez (cache LRU limitado) e o
+    resultado é aplicado à coluna inteira de forma vetorizada. A ordem de
+    prioridade entre categorias é a mesma de `padronizar_produto`, portanto a
+    saída é idêntica à da função original.
+    """
+    
+    def __init__(self, correcoes=None, mapeamento=None, tamanho_cache=100_000):
+        """
+        Args:
+            correcoes (dict): Correções de digitação (padrão: CORRECOES_ESPECIFICAS).
+            mapeamento (dict): Produto padrão → variações (padrão: MAPEAMENTO_PRODUTOS).
+            tamanho_cache (int): Número máximo de textos distintos mantidos em cache.
+        """
+        self.correcoes = dict(CORRECOES_ESPECIFICAS if correcoes is None else correcoes)
+        mapeamento = MAPEAMENTO_PRODUTOS if mapeamento is None else mapeamento
+        
+        # A posição de cada produto padrão no mapeamento define sua prioridade
+        self._padroes = list(mapeamento.keys())
+        
+        self._exato = {}
+        substrings = []
+        self._palavras = {}
+        for indice, (padrao, variacoes) in enumerate(mapeamento.items()):
+            self._exato.setdefault(padrao, indice)
+            substrings.append((padrao, indice))
+            for variacao in variacoes:
+                self._exato.setdefault(variacao, indice)
+                substrings.append((variacao, indice))
+                for palavra in variacao.split():
+                    self._palavras.setdefault(palavra, set()).add(indice)
+        
+        self._automato = _AutomatoAhoCorasick(substrings)
+        self._indice_edicao = IndiceSimilaridade(self._padroes + list(self.correcoes.values()))
+        self._resolver = lru_cache(maxsize=tamanho_cache)(self._resolver_texto)
+    
+    def _resolver_texto(self, produto):
+        """Aplica as etapas de `padronizar_produto` a um texto já pré-processado."""
+        if produto in self.correcoes:
+            return self.correcoes[produto]
+        
+        # Match exato
+        indice = self._exato.get(produto)
+        if indice is not None:
+            return self._padroes[indice]
+        
+        # Substring match
+        encontrados = self._automato.buscar(produto)
+        if encontrados:
+            return self._padroes[min(encontrados)]
+        
+        # Palavras-chave: conta as palavras em comum com cada produto padrão
+        palavras_produto = set(produto.split())
+        palavras_comuns = {}
+        for palavra in palavras_produto:
+            for indice in self._palavras.get(palavra, ()):
+                palavras_comuns[indice] = palavras_comuns.get(indice, 0) + 1
+        aceitos = [
+            indice for indice, comuns in palavras_comuns.items()
+            if comuns >= 2 or comuns / len(palavras_produto) >= 0.5
+        ]
+        if aceitos:
+            return self._padroes[min(aceitos)]
+        
+        # Distância de edição
+        if len(produto) >= TAMANHO_MINIMO_EDICAO:
+            encontrado = self._indice_edicao.buscar(produto, int(len(produto) * LIMIAR_EDICAO_PRODUTO))
+            if encontrado is not None:
+                return encontrado[0]
+        
+        return produto
+    
+    def padronizar(self, produto):
+        """
+        Padroniza um único nome de produto.
+        
+        Args:
+            produto (str): Nome do produto a ser padronizado.
+            
+        Returns:
+            str: O mesmo resultado de `padronizar_produto(produto)`.
+        """
+        if pd.isna(produto):
+            return produto
+        return self._resolver(preprocessar_produto(produto))
+    
+    def padronizar_serie(self, serie):
+        """
+        Padroniza uma coluna inteira resolvendo cada valor distinto uma única vez.
+        
+        Args:
+            serie (pandas.Series): Coluna com os nomes de produtos.
+            
+        Returns:
+            pandas.Series: Coluna padronizada, com o mesmo índice da original.
+        """
+        # Valores ausentes são devolvidos como estavam, assim como em padronizar_produto
+        return _aplicar_em_valores_distintos(
+            serie, lambda unicos: unicos.map(self.padronizar), manter_nulos=True
+        )
+    
+    def limpar_cache(self):
+        """Descarta os textos já resolvidos."""
+        self._resolver.cache_clear()
+
 def validar_valor(valor):
     """
     Valida e converte valores monetários.
@@ -415,96 +1162,86 @@ def validar_frete(frete):
         pass
     return 0
 
-def tratar_ceps_ausentes(df):
+# Prefixos de CEP por estado para gerar CEPs sintéticos
+PREFIXOS_CEP = {
+    'sp': '01000',
+    'rj': '20000',
+    'mg': '30000',
+    'es': '29000',
+    'ba': '40000',
+    'se': '49000',
+    'pe': '50000',
+    'al': '57000',
+    'pb': '58000',
+    'rn': '59000',
+    'ce': '60000',
+    'pi': '64000',
+    'ma': '65000',
+    'pa': '66000',
+    'ap': '68900',
+    'am': '69000',
+    'ac': '69900',
+    'rr': '69300',
+    'df': '70000',
+    'go': '74000',
+    'to': '77000',
+    'mt': '78000',
+    'ms': '79000',
+    'pr': '80000',
+    'sc': '88000',
+    'rs': '90000'
+}
+
+# Semente do gerador dos sufixos de CEPs sintéticos, para execuções reprodutíveis
+SEMENTE_CEP_SINTETICO = 42
+
+def tratar_ceps_ausentes(df, modas=None, semente=SEMENTE_CEP_SINTETICO):
     """
     Trata CEPs ausentes usando o padrão mais comum por cidade.
     
+    A ordem de preenchimento é: CEP mais comum da cidade, do estado, geral e,
+    se não houver nenhum CEP conhecido, um CEP sintético com o prefixo do
+    estado e sufixo aleatório (ou '00000-000' para estados desconhecidos).
+    Cada nível é aplicado com `map` + `fillna` apenas sobre as linhas ainda
+    vazias, e a coluna 'cep' é alterada no próprio DataFrame, sem cópia.
+    
     Args:
         df (pandas.DataFrame): DataFrame contendo os dados.
+        modas (tuple): (CEP por cidade, CEP por estado, CEP geral) já calculados,
+            por exemplo sobre o arquivo inteiro no modo streaming. Se None, as
+            modas são calculadas a partir do próprio df.
+        semente: Semente de `numpy.random.default_rng` para os sufixos sintéticos.
         
     Returns:
         pandas.DataFrame: DataFrame com CEPs ausentes preenchidos.
     """
-    # Criar uma cópia para não modificar o original
-    df_temp = df.copy()
-    
-    # Encontrar o CEP mais comum por cidade
-    cep_por_cidade = df_temp.groupby('cidade')['cep'].agg(
-        lambda x: x.mode()[0] if not x.mode().empty and not pd.isna(x.mode()[0]) else None
-    )
+    if modas is None:
+        modas = modas_cep_de_contagens(contar_ceps(df))
+    cep_por_cidade, cep_por_estado, cep_geral = modas
     
-    # Encontrar o CEP mais comum por estado para usar como fallback
-    cep_por_estado = df_temp.groupby('estado')['cep'].agg(
-        lambda x: x.mode()[0] if not x.mode().empty and not pd.isna(x.mode()[0]) else None
-    )
-    
-    # Encontrar o CEP mais comum geral para usar como último recurso
-    cep_geral = df_temp['cep'].mode()[0] if not df_temp['cep'].mode().empty else None
-    
-    # Mapeamento de prefixos de CEP por estado para gerar CEPs sintéticos
-    prefixos_cep = {
-        'sp': '01000',
-        'rj': '20000',
-        'mg': '30000',
-        'es': '29000',
-        'ba': '40000',
-        'se': '49000',
-        'pe': '50000',
-        'al': '57000',
-        'pb': '58000',
-        'rn': '59000',
-        'ce': '60000',
-        'pi': '64000',
-        'ma': '65000',
-        'pa': '66000',
-        'ap': '68900',
-        'am': '69000',
-        'ac': '69900',
-        'rr': '69300',
-        'df': '70000',
-        'go': '74000',
-        'to': '77000',
-        'mt': '78000',
-        'ms': '79000',
-        'pr': '80000',
-        'sc': '88000',
-        'rs': '90000'
-    }
+    ausentes = df['cep'].isna().to_numpy()
+    if not ausentes.any():
+        return df
     
-    # Função para preencher CEPs ausentes
-    def preencher_cep(row):
-        if pd.isna(row['cep']):
-            # Tenta usar o CEP da cidade
-            cep_cidade = cep_por_cidade.get(row['cidade'])
-            if cep_cidade is not None:
-                return cep_cidade
-            
-            # Se não tiver CEP da cidade, tenta usar o CEP do estado
-            cep_estado = cep_por_estado.get(row['estado'])
-            if cep_estado is not None:
-                return cep_estado
-            
-            # Se não tiver nenhum dos anteriores, usa o CEP geral
-            if cep_geral is not None:
-                return cep_geral
-            
-            # Se ainda não tiver CEP, gera um sintético baseado no estado
-            estado = str(row['estado']).lower().strip()
-            if estado in prefixos_cep:
-                # Usa o prefixo do estado + 3 dígitos aleatórios
-                import random
-                sufixo = str(random.randint(0, 999)).zfill(3)
-                return f"{prefixos_cep[estado]}-{sufixo}"
-            
-            # Último recurso - CEP genérico para o Brasil
-            return "00000-000"
-        
-        return row['cep']
+    # Tenta o CEP da cidade, depois o do estado e por fim o geral
+    # astype(object): em colunas categóricas, map/fillna atuariam sobre as categorias
+    ceps = df['cidade'][ausentes].astype(object).map(cep_por_cidade)
+    ceps = ceps.fillna(df['estado'][ausentes].astype(object).map(cep_por_estado))
+    if cep_geral is not None:
+        ceps = ceps.fillna(cep_geral)
     
-    # Aplica a função de preenchimento
-    df_temp['cep'] = df_temp.apply(preencher_cep, axis=1)
+    # Se ainda não tiver CEP, gera um sintético baseado no estado
+    sem_cep = ceps.isna().to_numpy()
+    if sem_cep.any():
+        estados = df['estado'][ausentes][sem_cep].astype(str).str.lower().str.strip()
+        sufixos = np.random.default_rng(semente).integers(0, 1000, size=len(estados))
+        sinteticos = estados.map(PREFIXOS_CEP) + pd.Series(sufixos, index=estados.index).map('-{:03d}'.format)
+        ceps[sem_cep] = sinteticos.fillna('00000-000')  # Último recurso - CEP genérico para o Brasil
     
-    return df_temp
+    preenchidos = df['cep'].to_numpy(dtype=object, copy=True)
+    preenchidos[ausentes] = ceps.to_numpy(dtype=object)
+    df['cep'] = preenchidos
+    return df
 
 def validar_cep(cep):
     """
@@ -532,113 +1269,800 @@ def validar_cep(cep):
     
     return cep_formatado
 
-def gerar_relatorio(df, df_original):
+def _formatar_ceps_distintos(valores):
+    """Extrai os dígitos de CEPs distintos e formata os que têm 8 dígitos."""
+    digitos = valores.astype(str).str.replace(r'\D', '', regex=True)
+    return (digitos.str[:5] + '-' + digitos.str[5:]).where(digitos.str.len() == 8, None)
+
+def validar_ceps(serie):
     """
-    Gera um relatório detalhado do processo de limpeza.
+    Versão vetorizada de `validar_cep` para uma coluna inteira.
     
     Args:
-        df (pandas.DataFrame): DataFrame após a limpeza.
-        df_original (pandas.DataFrame): DataFrame original.
+        serie (pandas.Series): Coluna com os CEPs.
         
     Returns:
-        str: Conteúdo do relatório em formato markdown.
+        pandas.Series: CEPs no formato XXXXX-XXX ou None se inválidos.
     """
-    relatorio = []
-    relatorio.append("# Relatório de Limpeza de Dados - MegaSuper Vendas\n")
-    
-    # Estatísticas Gerais
-    relatorio.append("## 1. Estatísticas Gerais")
-    relatorio.append(f"- Total de registros: {len(df)}")
-    relatorio.append(f"- Registros duplicados removidos: {len(df_original) - len(df)}\n")
-    
-    # Valores Ausentes
-    relatorio.append("## 2. Tratamento de Dados")
-    relatorio.append("### Valores Ausentes")
-    for coluna in df.columns:
-        nulos = df[coluna].isnull().sum()
-        relatorio.append(f"- {coluna}: {nulos} valores ausentes")
-    
-    # Tipos de Dados
-    relatorio.append("\n### Tipos de Dados")
-    for coluna in df.columns:
-        tipo = df[coluna].dtype
-        relatorio.append(f"- {coluna}: {tipo}")
-    
-    # Problemas Corrigidos
-    relatorio.append("\n### Problemas Corrigidos")
-    relatorio.append("- Espaços extras removidos de todas as colunas de texto")
-    relatorio.append("- Produtos padronizados para nomes consistentes")
-    relatorio.append("- Valores monetários validados e corrigidos")
-    relatorio.append("- Quantidades validadas e corrigidas")
-    relatorio.append("- Fretes validados e corrigidos")
-    relatorio.append("- Totais recalculados e corrigidos")
-    relatorio.append("- CEPs ausentes preenchidos com valores sintéticos baseados no estado")
-    
-    # Análise de Produtos
-    relatorio.append("\n## 3. Análise de Produtos")
-    relatorio.append("### Top 5 Produtos Mais Vendidos")
-    top_produtos = df['produto'].value_counts().head(5)
-    for produto, quantidade in top_produtos.items():
-        relatorio.append(f"- {produto}: {quantidade} unidades")
-    
-    return "\n".join(relatorio)
+    return _aplicar_em_valores_distintos(serie, _formatar_ceps_distintos)
 
-def padronizar_data(data):
+def tratar_ceps(df, modas=None, semente=SEMENTE_CEP_SINTETICO):
     """
-    Padroniza datas para o formato YYYY-MM-DD.
+    Preenche os CEPs ausentes e formata todos os CEPs em uma única etapa.
+    
+    Equivale a `tratar_ceps_ausentes` seguido de `validar_cep` em cada linha.
     
     Args:
-        data (str): Data no formato original.
+        df (pandas.DataFrame): DataFrame contendo os dados.
+        modas (tuple): Modas de CEP repassadas a `tratar_ceps_ausentes`.
+        semente: Semente dos sufixos de CEPs sintéticos.
         
     Returns:
-        str: Data padronizada no formato YYYY-MM-DD ou None se inválida.
+        pandas.DataFrame: DataFrame com os CEPs preenchidos e formatados.
     """
-    if pd.isna(data):
-        return None
-    
-    try:
-        # Tenta converter para datetime
-        data_dt = pd.to_datetime(data, format='%d/%m/%Y', errors='coerce')
-        if pd.isna(data_dt):
-            data_dt = pd.to_datetime(data, format='%Y-%m-%d', errors='coerce')
-        
-        if not pd.isna(data_dt):
-            return data_dt.strftime('%Y-%m-%d')
-    except:
-        pass
-    return None
+    df = tratar_ceps_ausentes(df, modas, semente)
+    df['cep'] = validar_ceps(df['cep'])
+    return df
 
-def padronizar_hora(hora):
+# Contagens aproximadas para os relatórios (`EsbocosVendas`): produtos e
+# clientes mais frequentes (Space-Saving com Count-Min) e número de valores
+# distintos (HyperLogLog). Os erros são configuráveis: ERRO_FREQUENCIAS é o
+# erro das contagens como fração dos registros resumidos, com probabilidade
+# de falha PROBABILIDADE_FALHA_COUNT_MIN no Count-Min, e ERRO_DISTINTOS é o
+# erro padrão relativo das contagens de distintos.
+ERRO_FREQUENCIAS = 0.001
+PROBABILIDADE_FALHA_COUNT_MIN = 0.01
+ERRO_DISTINTOS = 0.01
+COLUNAS_FREQUENTES = ('produto', 'cliente', 'cidade', 'vendedor')
+COLUNAS_DISTINTAS = ('cliente', 'id_da_compra')
+ITENS_POR_COLUNA_RELATORIO = 5
+
+def _hash_valores(valores):
+    """Calcula um hash de 64 bits de cada valor, igual entre blocos, processos e execuções."""
+    valores = np.asarray(valores)
+    # Garante o mesmo hash para 1 e 1.0 quando o tipo muda entre blocos
+    if valores.dtype.kind in 'biuf':
+        valores = valores.astype('float64')
+    else:
+        valores = valores.astype(object)
+    return pd.util.hash_array(valores)
+
+def _comprimento_em_bits(valores):
+    """Número de bits significativos de cada inteiro sem sinal de 64 bits (0 para 0)."""
+    valores = valores.copy()
+    comprimento = np.zeros(len(valores), dtype=np.int64)
+    for deslocamento in (32, 16, 8, 4, 2, 1):
+        grandes = valores >= np.uint64(1 << deslocamento)
+        comprimento += deslocamento * grandes
+        valores[grandes] >>= np.uint64(deslocamento)
+    return comprimento + (valores > 0)
+
+class ContadorFrequentes:
     """
-    Padroniza horas para o formato HH:MM:SS.
+    Itens mais frequentes de uma coluna (Space-Saving), atualizável por bloco e mesclável.
     
-    Args:
-        hora (str): Hora no formato original.
-        
-    Returns:
-        str: Hora padronizada no formato HH:MM:SS ou None se inválida.
+    Guarda no máximo `capacidade` = ceil(1 / erro) itens, cada um com uma
+    contagem que nunca subestima a real e o erro máximo dessa contagem: a
+    contagem real fica entre `contagem - erro` e `contagem`. Um item fora do
+    resumo ocorreu no máximo `limite` vezes.
+    
+    Cada bloco é resumido pelas contagens exatas dos seus valores e mesclado
+    ao resumo como dois resumos quaisquer: um item ausente de um dos lados
+    recebe, desse lado, o `limite` como contagem e como erro, e só os
+    `capacidade` itens de maior contagem são mantidos.
     """
-    if pd.isna(hora):
-        return None
     
-    try:
-        # Remove caracteres não numéricos
-        hora_limpa = re.sub(r'[^\d]', '', str(hora))
+    def __init__(self, erro=ERRO_FREQUENCIAS):
+        """
+        Args:
+            erro (float): Erro das contagens, como fração dos registros resumidos.
+        """
+        self.erro = erro
+        self.capacidade = int(np.ceil(1 / erro))
+        self.contagens = pd.DataFrame({'contagem': pd.Series(dtype='int64'), 'erro': pd.Series(dtype='int64')})
+        self.limite = 0
+        self.total = 0
+    
+    def atualizar(self, valores):
+        """
+        Acrescenta os valores de um bloco ao resumo (valores ausentes são ignorados).
         
-        # Completa com zeros à esquerda se necessário
-        hora_limpa = hora_limpa.zfill(6)
+        Args:
+            valores (pandas.Series): Valores da coluna no bloco.
+            
+        Returns:
+            ContadorFrequentes: O próprio contador.
+        """
+        return self.atualizar_contagens(valores.value_counts())
+    
+    def atualizar_contagens(self, contagens):
+        """
+        Como `atualizar`, a partir das contagens do bloco (`value_counts`).
         
-        # Formata para HH:MM:SS
-        hora_formatada = f"{hora_limpa[:2]}:{hora_limpa[2:4]}:{hora_limpa[4:]}"
+        Args:
+            contagens (pandas.Series): Ocorrências de cada valor no bloco.
+            
+        Returns:
+            ContadorFrequentes: O próprio contador.
+        """
+        contagens = contagens[contagens > 0].astype('int64')
+        if isinstance(contagens.index, pd.CategoricalIndex):
+            contagens.index = contagens.index.astype(object)
+        bloco = ContadorFrequentes(self.erro)
+        bloco.total = int(contagens.sum())
+        if len(contagens) > self.capacidade:
+            contagens = contagens.sort_values(ascending=False, kind='stable')
+            bloco.limite = int(contagens.iloc[self.capacidade])
+            contagens = contagens.iloc[:self.capacidade]
+        bloco.contagens = pd.DataFrame({'contagem': contagens, 'erro': np.zeros(len(contagens), dtype='int64')})
+        return self.mesclar(bloco)
+    
+    def mesclar(self, outro):
+        """
+        Incorpora outro resumo da mesma coluna (de outro bloco, processo ou execução).
         
-        # Valida se é uma hora válida
-        datetime.strptime(hora_formatada, '%H:%M:%S')
-        return hora_formatada
-    except:
-        pass
-    return None
+        Args:
+            outro (ContadorFrequentes): Resumo com o mesmo erro.
+            
+        Returns:
+            ContadorFrequentes: O próprio contador.
+            
+        Raises:
+            ValueError: Se os resumos têm capacidades diferentes.
+        """
+        if outro.capacidade != self.capacidade:
+            raise ValueError(f"Não é possível mesclar resumos com {self.capacidade} e {outro.capacidade} contadores.")
+        itens = self.contagens.index.union(outro.contagens.index, sort=False)
+        proprios = self.contagens.reindex(itens, fill_value=self.limite)
+        outros = outro.contagens.reindex(itens, fill_value=outro.limite)
+        mescladas = (proprios + outros).sort_values('contagem', ascending=False, kind='stable')
+        limite = self.limite + outro.limite
+        if len(mescladas) > self.capacidade:
+            limite = max(limite, int(mescladas['contagem'].iloc[self.capacidade]))
+            mescladas = mescladas.iloc[:self.capacidade]
+        self.contagens = mescladas.astype('int64')
+        self.limite = limite
+        self.total += outro.total
+        return self
+    
+    def top(self, n):
+        """
+        Returns:
+            pandas.DataFrame: Os `n` itens de maior contagem, com as colunas
+            'contagem' (limite superior) e 'erro'.
+        """
+        return self.contagens.head(n)
 
-def validar_valores_numericos(df):
+class EsbocoCountMin:
+    """
+    Frequência aproximada de qualquer valor de uma coluna (Count-Min), mesclável.
+    
+    Uma tabela de `profundidade` linhas por `largura` contadores; cada valor
+    soma sua contagem a um contador por linha, escolhido por um hash. A
+    estimativa (o menor desses contadores) nunca subestima a contagem real e,
+    com probabilidade 1 - `probabilidade_falha`, excede-a em no máximo
+    `erro` × registros resumidos.
+    """
+    
+    def __init__(self, erro=ERRO_FREQUENCIAS, probabilidade_falha=PROBABILIDADE_FALHA_COUNT_MIN):
+        """
+        Args:
+            erro (float): Erro das estimativas, como fração dos registros resumidos.
+            probabilidade_falha (float): Probabilidade de o erro ser maior.
+        """
+        self.erro = erro
+        self.probabilidade_falha = probabilidade_falha
+        self.largura = int(np.ceil(np.e / erro))
+        self.profundidade = int(np.ceil(np.log(1 / probabilidade_falha)))
+        self.tabela = np.zeros((self.profundidade, self.largura), dtype=np.int64)
+        self.total = 0
+    
+    def _colunas(self, hashes):
+        # Hashing duplo: a linha i usa h1 + i * h2 (Kirsch e Mitzenmacher)
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = hashes >> np.uint64(32)
+        return [((h1 + np.uint64(i) * h2) % np.uint64(self.largura)).astype(np.intp) for i in range(self.profundidade)]
+    
+    def atualizar(self, valores):
+        """
+        Acrescenta os valores de um bloco (valores ausentes são ignorados).
+        
+        Args:
+            valores (pandas.Series): Valores da coluna no bloco.
+            
+        Returns:
+            EsbocoCountMin: O próprio esboço.
+        """
+        return self.atualizar_contagens(valores.value_counts())
+    
+    def atualizar_contagens(self, contagens):
+        """
+        Como `atualizar`, a partir das contagens do bloco (`value_counts`).
+        
+        Args:
+            contagens (pandas.Series): Ocorrências de cada valor no bloco.
+            
+        Returns:
+            EsbocoCountMin: O próprio esboço.
+        """
+        contagens = contagens[contagens > 0]
+        pesos = contagens.to_numpy(dtype=np.float64)
+        for linha, colunas in enumerate(self._colunas(_hash_valores(contagens.index))):
+            self.tabela[linha] += np.bincount(colunas, weights=pesos, minlength=self.largura).astype(np.int64)
+        self.total += int(pesos.sum())
+        return self
+    
+    def mesclar(self, outro):
+        """
+        Incorpora outro esboço com os mesmos parâmetros.
+        
+        Returns:
+            EsbocoCountMin: O próprio esboço.
+            
+        Raises:
+            ValueError: Se as tabelas têm dimensões diferentes.
+        """
+        if self.tabela.shape != outro.tabela.shape:
+            raise ValueError(f"Não é possível mesclar esboços {self.tabela.shape} e {outro.tabela.shape}.")
+        self.tabela += outro.tabela
+        self.total += outro.total
+        return self
+    
+    def estimar(self, valores):
+        """
+        Args:
+            valores (list): Valores a consultar.
+            
+        Returns:
+            numpy.ndarray: Contagem estimada de cada valor.
+        """
+        colunas = self._colunas(_hash_valores(list(valores)))
+        return np.min([self.tabela[linha, indices] for linha, indices in enumerate(colunas)], axis=0)
+
+class ContadorDistintos:
+    """
+    Número aproximado de valores distintos de uma coluna (HyperLogLog), mesclável.
+    
+    Os `precisao` bits mais altos do hash de cada valor escolhem um dos
+    2**precisao registradores, que guarda o maior número de zeros à esquerda
+    (mais um) visto nos bits restantes. A estimativa tem erro padrão relativo
+    de 1.04 / sqrt(2**precisao); mesclar é tomar o máximo de cada registrador.
+    """
+    
+    def __init__(self, erro=ERRO_DISTINTOS):
+        """
+        Args:
+            erro (float): Erro padrão relativo desejado. A precisão é a menor
+                que o atinge, entre 4 e 18 bits.
+        """
+        self.precisao = int(np.clip(np.ceil(np.log2((1.04 / erro) ** 2)), 4, 18))
+        self.registradores = np.zeros(1 << self.precisao, dtype=np.uint8)
+    
+    @property
+    def erro(self):
+        """Erro padrão relativo da estimativa."""
+        return 1.04 / np.sqrt(len(self.registradores))
+    
+    def atualizar(self, valores):
+        """
+        Acrescenta os valores de um bloco (valores ausentes são ignorados).
+        
+        Args:
+            valores (pandas.Series): Valores da coluna no bloco.
+            
+        Returns:
+            ContadorDistintos: O próprio contador.
+        """
+        hashes = _hash_valores(valores.dropna().unique())
+        indices = (hashes >> np.uint64(64 - self.precisao)).astype(np.intp)
+        restantes = hashes << np.uint64(self.precisao)
+        # Posição do primeiro bit 1 nos 64 - precisao bits restantes
+        posicoes = np.minimum(64 - _comprimento_em_bits(restantes) + 1, 64 - self.precisao + 1)
+        np.maximum.at(self.registradores, indices, posicoes.astype(np.uint8))
+        return self
+    
+    def mesclar(self, outro):
+        """
+        Incorpora outro contador com a mesma precisão.
+        
+        Returns:
+            ContadorDistintos: O próprio contador.
+            
+        Raises:
+            ValueError: Se as precisões são diferentes.
+        """
+        if outro.precisao != self.precisao:
+            raise ValueError(f"Não é possível mesclar contadores com precisões {self.precisao} e {outro.precisao}.")
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+        return self
+    
+    def estimativa(self):
+        """
+        Returns:
+            int: Número estimado de valores distintos.
+        """
+        m = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.sum(np.ldexp(1.0, -self.registradores.astype(np.int64)))
+        vazios = np.count_nonzero(self.registradores == 0)
+        if estimativa <= 2.5 * m and vazios:
+            # Poucos valores: contagem linear dos registradores vazios
+            estimativa = m * np.log(m / vazios)
+        return int(round(estimativa))
+
+class EsbocosVendas:
+    """
+    Contagens aproximadas das vendas para os relatórios, em memória constante.
+    
+    Para cada coluna de `colunas_frequentes`, um `ContadorFrequentes` com um
+    `EsbocoCountMin` (os itens mais frequentes, com a contagem limitada pelo
+    menor dos dois); para cada coluna de `colunas_distintas`, um
+    `ContadorDistintos`. Os esboços são atualizados bloco a bloco
+    (`atualizar`), mesclados entre blocos, processos ou lotes (`mesclar`) e
+    gravados entre execuções (`salvar`/`carregar`), sem manter os registros.
+    """
+    
+    def __init__(self, colunas_frequentes=COLUNAS_FREQUENTES, colunas_distintas=COLUNAS_DISTINTAS,
+                 erro_frequencias=ERRO_FREQUENCIAS, probabilidade_falha=PROBABILIDADE_FALHA_COUNT_MIN,
+                 erro_distintos=ERRO_DISTINTOS):
+        """
+        Args:
+            colunas_frequentes (tuple): Colunas com os itens mais frequentes.
+            colunas_distintas (tuple): Colunas com o número de valores distintos.
+            erro_frequencias (float): Erro das contagens, como fração dos registros.
+            probabilidade_falha (float): Probabilidade de falha do Count-Min.
+            erro_distintos (float): Erro padrão relativo dos distintos.
+        """
+        self.frequentes = {coluna: ContadorFrequentes(erro_frequencias) for coluna in colunas_frequentes}
+        self.count_min = {
+            coluna: EsbocoCountMin(erro_frequencias, probabilidade_falha) for coluna in colunas_frequentes
+        }
+        self.distintos = {coluna: ContadorDistintos(erro_distintos) for coluna in colunas_distintas}
+        self.registros = 0
+    
+    def atualizar(self, df):
+        """
+        Acrescenta um bloco de registros. Colunas ausentes do bloco são ignoradas.
+        
+        Args:
+            df (pandas.DataFrame): Bloco de registros limpos.
+            
+        Returns:
+            EsbocosVendas: Os próprios esboços.
+        """
+        # Uma única contagem por coluna serve aos três esboços
+        contagens = {}
+        for coluna in self.frequentes:
+            if coluna in df.columns:
+                contagens[coluna] = df[coluna].value_counts()
+                self.frequentes[coluna].atualizar_contagens(contagens[coluna])
+                self.count_min[coluna].atualizar_contagens(contagens[coluna])
+        for coluna, contador in self.distintos.items():
+            if coluna in contagens:
+                contador.atualizar(contagens[coluna].index[contagens[coluna] > 0].to_series())
+            elif coluna in df.columns:
+                contador.atualizar(df[coluna])
+        self.registros += len(df)
+        return self
+    
+    def mesclar(self, outro):
+        """
+        Incorpora os esboços de outros blocos, processos ou lotes.
+        
+        Args:
+            outro (EsbocosVendas): Esboços com as mesmas colunas e erros.
+            
+        Returns:
+            EsbocosVendas: Os próprios esboços.
+            
+        Raises:
+            ValueError: Se as colunas ou os parâmetros são diferentes.
+        """
+        if set(self.frequentes) != set(outro.frequentes) or set(self.distintos) != set(outro.distintos):
+            raise ValueError("Não é possível mesclar esboços de colunas diferentes.")
+        for coluna in self.frequentes:
+            self.frequentes[coluna].mesclar(outro.frequentes[coluna])
+            self.count_min[coluna].mesclar(outro.count_min[coluna])
+        for coluna in self.distintos:
+            self.distintos[coluna].mesclar(outro.distintos[coluna])
+        self.registros += outro.registros
+        return self
+    
+    def top(self, coluna, n=ITENS_POR_COLUNA_RELATORIO):
+        """
+        Itens mais frequentes de uma coluna.
+        
+        Args:
+            coluna (str): Uma das colunas de `colunas_frequentes`.
+            n (int): Número de itens.
+            
+        Returns:
+            pandas.DataFrame: Um item por linha (no índice), do mais frequente
+            ao menos frequente, com a contagem estimada ('contagem', que nunca
+            é menor que a real) e a contagem mínima garantida ('minimo').
+        """
+        resumo = self.frequentes[coluna].contagens
+        if resumo.empty:
+            return pd.DataFrame({'contagem': pd.Series(dtype='int64'), 'minimo': pd.Series(dtype='int64')})
+        # As duas contagens são limites superiores: vale a menor
+        contagem = np.minimum(resumo['contagem'].to_numpy(), self.count_min[coluna].estimar(resumo.index))
+        top = pd.DataFrame({'contagem': contagem, 'minimo': (resumo['contagem'] - resumo['erro']).to_numpy()},
+                           index=resumo.index)
+        return top.sort_values('contagem', ascending=False, kind='stable').head(n)
+    
+    def contar_distintos(self, coluna):
+        """
+        Args:
+            coluna (str): Uma das colunas de `colunas_distintas`.
+            
+        Returns:
+            tuple: (número estimado de valores distintos, erro padrão relativo).
+        """
+        contador = self.distintos[coluna]
+        return contador.estimativa(), contador.erro
+    
+    def salvar(self, caminho):
+        """
+        Grava os esboços (pickle), substituindo o arquivo de uma vez.
+        
+        Args:
+            caminho (str): Arquivo de destino.
+        """
+        _criar_pasta_de(caminho)
+        temporario = caminho + '.tmp'
+        pd.to_pickle(self, temporario)
+        os.replace(temporario, caminho)
+    
+    @classmethod
+    def carregar(cls, caminho):
+        """
+        Lê esboços gravados por `salvar`.
+        
+        Args:
+            caminho (str): Arquivo gravado por `salvar`.
+            
+        Returns:
+            EsbocosVendas: Esboços lidos.
+        """
+        return pd.read_pickle(caminho)
+    
+    def secao_relatorio(self, titulo, nivel=2, n=ITENS_POR_COLUNA_RELATORIO):
+        """
+        Args:
+            titulo (str): Título da seção.
+            nivel (int): Nível do título em markdown.
+            n (int): Itens mais frequentes listados por coluna.
+            
+        Returns:
+            str: Seção em markdown com os distintos e os itens mais frequentes,
+            e os erros de cada estimativa.
+        """
+        subtitulo = '#' * (nivel + 1)
+        secao = [f"{'#' * nivel} {titulo}"]
+        secao.append(f"- Registros resumidos: {self.registros}")
+        if self.frequentes:
+            contador = next(iter(self.frequentes.values()))
+            esboco = next(iter(self.count_min.values()))
+            secao.append(
+                f"- Itens mais frequentes: Space-Saving com {contador.capacidade} contadores e Count-Min "
+                f"{esboco.profundidade} × {esboco.largura} (erro configurado de {contador.erro:.2%} dos "
+                f"registros, probabilidade de falha de {esboco.probabilidade_falha:.0%})"
+            )
+        if self.distintos:
+            contador = next(iter(self.distintos.values()))
+            secao.append(
+                f"- Valores distintos: HyperLogLog com 2^{contador.precisao} registradores "
+                f"(erro padrão relativo de {contador.erro:.2%})"
+            )
+        
+        if self.distintos:
+            secao.append(f"\n{subtitulo} Valores Distintos (estimados)")
+            for coluna in self.distintos:
+                estimativa, erro = self.contar_distintos(coluna)
+                secao.append(f"- {coluna}: ~{estimativa} (± {int(round(estimativa * erro))}, 1 erro padrão)")
+        
+        for coluna, contador in self.frequentes.items():
+            secao.append(f"\n{subtitulo} Top {n} - {coluna} (estimado)")
+            for item, linha in self.top(coluna, n).iterrows():
+                secao.append(f"- {item}: ~{linha['contagem']} (no mínimo {linha['minimo']})")
+            secao.append(f"- Itens fora da lista: no máximo {contador.limite} ocorrências cada")
+        return "\n".join(secao)
+
+def gerar_relatorio(df, df_original=None, esbocos=None):
+    """
+    Gera um relatório detalhado do processo de limpeza.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame após a limpeza.
+        df_original (pandas.DataFrame): DataFrame original. Usado para contar
+            as duplicatas removidas apenas se `df.attrs` não tiver essa
+            contagem (registrada por `tratar_duplicatas`).
+        esbocos (EsbocosVendas): Contagens aproximadas de `df`, usadas nos
+            produtos mais vendidos e na seção de contagens aproximadas. Se
+            None, são calculadas a partir de `df`.
+        
+    Returns:
+        str: Conteúdo do relatório em formato markdown. Os totais preenchidos
+        e corrigidos também vêm de `df.attrs` (ver `recalcular_totais`).
+    """
+    duplicatas_removidas = df.attrs.get('duplicatas_removidas')
+    if duplicatas_removidas is None:
+        duplicatas_removidas = len(df_original) - len(df) if df_original is not None else 0
+    if esbocos is None:
+        esbocos = EsbocosVendas().atualizar(df)
+    return montar_relatorio_limpeza(
+        total_registros=len(df),
+        duplicatas_removidas=duplicatas_removidas,
+        nulos=df.isnull().sum(),
+        tipos=df.dtypes,
+        top_produtos=esbocos.top('produto', 5)['contagem'],
+        totais_preenchidos=df.attrs.get('totais_preenchidos'),
+        totais_corrigidos=df.attrs.get('totais_corrigidos'),
+        esbocos=esbocos,
+    )
+
+def montar_relatorio_limpeza(total_registros, duplicatas_removidas, nulos, tipos, top_produtos,
+                             totais_preenchidos=None, totais_corrigidos=None, esbocos=None,
+                             esbocos_acumulados=None):
+    """
+    Monta o relatório de limpeza a partir de estatísticas já agregadas.
+    
+    Permite gerar o mesmo relatório de `gerar_relatorio` sem manter o
+    DataFrame inteiro em memória (modo streaming).
+    
+    Args:
+        total_registros (int): Número de registros após a limpeza.
+        duplicatas_removidas (int): Número de registros duplicados removidos.
+        nulos (pandas.Series): Valores ausentes por coluna.
+        tipos (pandas.Series): Tipo de dado por coluna.
+        top_produtos (pandas.Series): Contagem dos 5 produtos mais vendidos.
+        totais_preenchidos (int): Totais ausentes preenchidos (ver `recalcular_totais`).
+        totais_corrigidos (int): Totais divergentes corrigidos.
+        esbocos (EsbocosVendas): Contagens aproximadas dos registros limpos,
+            para a seção "Contagens Aproximadas".
+        esbocos_acumulados (EsbocosVendas): Contagens aproximadas de todos os
+            lotes do modo incremental, acrescentadas à mesma seção.
+        
+    Returns:
+        str: Conteúdo do relatório em formato markdown.
+    """
+    relatorio = []
+    relatorio.append("# Relatório de Limpeza de Dados - MegaSuper Vendas\n")
+    
+    # Estatísticas Gerais
+    relatorio.append("## 1. Estatísticas Gerais")
+    relatorio.append(f"- Total de registros: {total_registros}")
+    relatorio.append(f"- Registros duplicados removidos: {duplicatas_removidas}\n")
+    
+    # Valores Ausentes
+    relatorio.append("## 2. Tratamento de Dados")
+    relatorio.append("### Valores Ausentes")
+    for coluna, quantidade_nulos in nulos.items():
+        relatorio.append(f"- {coluna}: {quantidade_nulos} valores ausentes")
+    
+    # Tipos de Dados
+    relatorio.append("\n### Tipos de Dados")
+    for coluna, tipo in tipos.items():
+        relatorio.append(f"- {coluna}: {tipo}")
+    
+    # Problemas Corrigidos
+    relatorio.append("\n### Problemas Corrigidos")
+    relatorio.append("- Espaços extras removidos de todas as colunas de texto")
+    relatorio.append("- Produtos padronizados para nomes consistentes")
+    relatorio.append("- Valores monetários validados e corrigidos")
+    relatorio.append("- Quantidades validadas e corrigidas")
+    relatorio.append("- Fretes validados e corrigidos")
+    if totais_preenchidos is None or totais_corrigidos is None:
+        relatorio.append("- Totais recalculados e corrigidos")
+    else:
+        relatorio.append(
+            f"- Totais recalculados: {totais_preenchidos} preenchidos e {totais_corrigidos} corrigidos"
+        )
+    relatorio.append("- CEPs ausentes preenchidos com valores sintéticos baseados no estado")
+    
+    # Análise de Produtos
+    relatorio.append("\n## 3. Análise de Produtos")
+    relatorio.append("### Top 5 Produtos Mais Vendidos")
+    for produto, quantidade in top_produtos.items():
+        relatorio.append(f"- {produto}: {quantidade} unidades")
+    
+    # Contagens aproximadas (esboços)
+    if esbocos is not None:
+        relatorio.append("\n" + esbocos.secao_relatorio("4. Contagens Aproximadas"))
+    if esbocos_acumulados is not None:
+        relatorio.append("\n" + esbocos_acumulados.secao_relatorio("Acumulado de Todos os Lotes", nivel=3))
+    
+    return "\n".join(relatorio)
+
+def padronizar_data(data):
+    """
+    Padroniza datas para o formato YYYY-MM-DD.
+    
+    Args:
+        data (str): Data no formato original.
+        
+    Returns:
+        str: Data padronizada no formato YYYY-MM-DD ou None se inválida.
+    """
+    if pd.isna(data):
+        return None
+    
+    try:
+        # Tenta converter para datetime
+        data_dt = pd.to_datetime(data, format='%d/%m/%Y', errors='coerce')
+        if pd.isna(data_dt):
+            data_dt = pd.to_datetime(data, format='%Y-%m-%d', errors='coerce')
+        
+        if not pd.isna(data_dt):
+            return data_dt.strftime('%Y-%m-%d')
+    except:
+        pass
+    return None
+
+def padronizar_hora(hora):
+    """
+    Padroniza horas para o formato HH:MM:SS.
+    
+    Args:
+        hora (str): Hora no formato original.
+        
+    Returns:
+        str: Hora padronizada no formato HH:MM:SS ou None se inválida.
+    """
+    if pd.isna(hora):
+        return None
+    
+    try:
+        # Remove caracteres não numéricos
+        hora_limpa = re.sub(r'[^\d]', '', str(hora))
+        
+        # Completa com zeros à esquerda se necessário
+        hora_limpa = hora_limpa.zfill(6)
+        
+        # Formata para HH:MM:SS
+        hora_formatada = f"{hora_limpa[:2]}:{hora_limpa[2:4]}:{hora_limpa[4:]}"
+        
+        # Valida se é uma hora válida
+        datetime.strptime(hora_formatada, '%H:%M:%S')
+        return hora_formatada
+    except:
+        pass
+    return None
+
+def _aplicar_em_valores_distintos(serie, funcao, manter_nulos=False):
+    """
+    Aplica uma função vetorizada apenas aos valores distintos e não nulos da coluna.
+    
+    Args:
+        serie (pandas.Series): Coluna original.
+        funcao (callable): Recebe uma Series com os valores distintos e retorna
+            uma Series alinhada com os resultados.
+        manter_nulos (bool): Se True, linhas nulas mantêm o valor original;
+            caso contrário recebem None.
+        
+    Returns:
+        pandas.Series: Resultado para cada linha, com o mesmo índice da original.
+    """
+    if pd.api.types.infer_dtype(serie, skipna=True).startswith('mixed'):
+        # Em colunas com tipos misturados o factorize considera 1 e 1.0 o mesmo
+        # valor, mas str() gera textos diferentes: processa cada tipo separadamente
+        tipos = serie.map(type).to_numpy()
+        resultado = np.empty(len(serie), dtype=object)
+        for tipo in pd.unique(tipos):
+            mascara = tipos == tipo
+            resultado[mascara] = _aplicar_em_valores_distintos(serie[mascara], funcao, manter_nulos).to_numpy()
+        return pd.Series(resultado, index=serie.index, name=serie.name)
+    
+    codigos, unicos = pd.factorize(serie)
+    resultado = np.empty(0, dtype=object)
+    if len(unicos):
+        resultado = funcao(pd.Series(unicos, dtype=object)).to_numpy(dtype=object)
+    resultado = np.append(resultado, None)[codigos]  # Código -1 (nulo) aponta para o None final
+    nulos = codigos < 0
+    if manter_nulos and nulos.any():
+        resultado[nulos] = serie.to_numpy(dtype=object)[nulos]
+    return pd.Series(resultado, index=serie.index, name=serie.name)
+
+def _padronizar_datas_distintas(valores):
+    """Converte datas distintas tentando '%d/%m/%Y' e depois '%Y-%m-%d'."""
+    datas = pd.to_datetime(valores, format='%d/%m/%Y', errors='coerce')
+    faltantes = datas.isna()
+    if faltantes.any():
+        datas[faltantes] = pd.to_datetime(valores[faltantes], format='%Y-%m-%d', errors='coerce')
+    return datas.dt.strftime('%Y-%m-%d').where(datas.notna(), None)
+
+def padronizar_datas(serie):
+    """
+    Versão vetorizada de `padronizar_data` para uma coluna inteira.
+    
+    Cada formato aceito é convertido em uma única chamada a `pd.to_datetime`
+    sobre os valores distintos da coluna, e o segundo formato só é tentado
+    onde o primeiro falhou.
+    
+    Args:
+        serie (pandas.Series): Coluna com as datas no formato original.
+        
+    Returns:
+        pandas.Series: Datas no formato YYYY-MM-DD ou None se inválidas,
+        idênticas a `serie.apply(padronizar_data)`.
+    """
+    return _aplicar_em_valores_distintos(serie, _padronizar_datas_distintas)
+
+# Horas com mais caracteres que isso são tratadas por padronizar_hora
+_TAMANHO_MAXIMO_HORA_VETORIZADA = 16
+
+@lru_cache(maxsize=1)
+def _tabela_horas():
+    """Textos 'HH:MM:SS' de todos os segundos do dia, indexados por segundo."""
+    return np.array(
+        [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in range(86400)],
+        dtype=object,
+    )
+
+def padronizar_horas(serie):
+    """
+    Versão vetorizada de `padronizar_hora` para uma coluna inteira.
+    
+    Os textos são convertidos em uma matriz de códigos de caracteres e os
+    dígitos de cada linha são acumulados em um número HHMMSS (equivalente a
+    remover os não dígitos e completar com zeros à esquerda). As faixas
+    (horas 0-23, minutos e segundos 0-59) são validadas numericamente, em
+    vez de usar `datetime.strptime`. Textos longos ou com caracteres não
+    ASCII, raros, continuam passando por `padronizar_hora`.
+    
+    Args:
+        serie (pandas.Series): Coluna com as horas no formato original.
+        
+    Returns:
+        pandas.Series: Horas no formato HH:MM:SS ou None se inválidas,
+        idênticas a `serie.apply(padronizar_hora)`.
+    """
+    resultado = np.full(len(serie), None, dtype=object)
+    valores = serie.to_numpy(dtype=object)
+    indices = np.flatnonzero(~pd.isna(valores))
+    if len(indices) == 0:
+        return pd.Series(resultado, index=serie.index, name=serie.name)
+    
+    # Matriz (linhas x caracteres) com o código Unicode de cada caractere;
+    # a conversão para texto usa str(), como em padronizar_hora
+    textos = np.asarray(valores[indices], dtype=str)
+    largura = max(textos.dtype.itemsize // 4, 1)
+    if largura > _TAMANHO_MAXIMO_HORA_VETORIZADA:
+        curtos = np.char.str_len(textos) <= _TAMANHO_MAXIMO_HORA_VETORIZADA
+        largura = _TAMANHO_MAXIMO_HORA_VETORIZADA
+        textos = textos[curtos].astype(f'<U{largura}')
+    else:
+        curtos = np.ones(len(indices), dtype=bool)
+    codigos = textos.view(np.uint32).reshape(len(textos), largura)
+    
+    # Acumula os dígitos da esquerda para a direita em um número HHMMSS
+    numeros = np.zeros(len(textos), dtype=np.int64)
+    quantidade_digitos = np.zeros(len(textos), dtype=np.int64)
+    ascii_puro = np.ones(len(textos), dtype=bool)
+    for coluna in range(largura):
+        caracteres = codigos[:, coluna]
+        digito = (caracteres >= 48) & (caracteres <= 57)
+        numeros = np.where(digito, numeros * 10 + (caracteres.astype(np.int64) - 48), numeros)
+        quantidade_digitos += digito
+        ascii_puro &= caracteres < 128
+    
+    horas, minutos, segundos = numeros // 10000, numeros // 100 % 100, numeros % 100
+    validas = (
+        (quantidade_digitos <= 6)
+        & (horas <= 23) & (minutos <= 59) & (segundos <= 59)
+        & ascii_puro
+    )
+    
+    indices_curtos = indices[curtos]
+    segundos_do_dia = horas[validas] * 3600 + minutos[validas] * 60 + segundos[validas]
+    resultado[indices_curtos[validas]] = _tabela_horas()[segundos_do_dia]
+    
+    # Casos raros (textos longos ou com caracteres não ASCII) usam a função original
+    restantes = np.concatenate([indices[~curtos], indices_curtos[~ascii_puro]])
+    resultado[restantes] = [padronizar_hora(valor) for valor in valores[restantes]]
+    return pd.Series(resultado, index=serie.index, name=serie.name)
+
+def validar_valores_numericos(df):
     """
     Valida e converte colunas numéricas para o formato adequado.
     
@@ -686,122 +2110,465 @@ def validar_valores_numericos(df):
     
     return df
 
-def tratar_duplicatas(df):
+# Colunas tratadas pelas etapas por linha (as únicas enviadas aos processos
+# auxiliares por `executar_em_paralelo`)
+COLUNAS_TEXTO = ['cliente', 'produto', 'data', 'hora']
+COLUNAS_NUMERICAS = ['valor', 'quantidade', 'total', 'frete']
+
+# Faixas válidas usadas por validar_valor, validar_quantidade e validar_frete
+FAIXA_VALOR = (0, 10000)
+FAIXA_QUANTIDADE = (1, 100)
+FAIXA_FRETE = (0, 1000)
+
+# Textos numéricos com mais caracteres que isso são tratados pelas operações de texto do pandas
+_TAMANHO_MAXIMO_NUMERO_VETORIZADO = 32
+
+def _limpar_textos_numericos_pandas(textos):
+    """Aplica as regras de `limpar_valor` com operações de texto do pandas (casos raros)."""
+    limpos = (
+        textos.str.replace(r'[^\d.,]', '', regex=True)  # Remove caracteres não numéricos exceto ponto e vírgula
+        .str[:20]                                        # Textos muito longos: apenas os primeiros caracteres
+        .str.replace(',', '.', regex=False)
+    )
+    
+    # Mantém apenas o primeiro ponto, juntando as demais partes após ele
+    partes = limpos.str.partition('.')
+    limpos = partes[0] + partes[1] + partes[2].str.replace('.', '', regex=False)
+    
+    # Restam apenas dígitos e no máximo um ponto: é um número se houver algum dígito
+    numeros = pd.Series(np.nan, index=textos.index)
+    validos = limpos.str.contains(r'\d', regex=True)
+    numeros[validos] = limpos[validos].astype(float)
+    return numeros.to_numpy()
+
+def _limpar_textos_numericos(valores):
     """
-    Remove registros duplicados, mantendo o primeiro registro.
+    Versão vetorizada de `limpar_valor` (em validar_valores_numericos) para
+    valores não nulos.
+    
+    Os textos viram uma matriz de códigos de caracteres percorrida coluna a
+    coluna: só dígitos, pontos e vírgulas contam (até 20 deles), o primeiro
+    ponto ou vírgula separa a parte decimal e os demais são ignorados. Com até
+    15 dígitos, o número inteiro N formado pelos dígitos e as k casas decimais
+    são exatos em float64, e N / 10**k dá o mesmo resultado de `float()`.
     
     Args:
-        df (pandas.DataFrame): DataFrame com os dados.
+        valores (numpy.ndarray): Valores não nulos, de qualquer tipo.
         
     Returns:
-        pandas.DataFrame: DataFrame sem duplicatas.
+        numpy.ndarray: Números em float64, NaN onde não há dígitos.
     """
-    # Colunas para verificar duplicatas
-    colunas_duplicadas = ['id_da_compra', 'data', 'hora', 'cliente', 'produto']
-    colunas_disponiveis = [col for col in colunas_duplicadas if col in df.columns]
+    numeros = np.full(len(valores), np.nan)
+    textos = np.asarray(valores, dtype=str)  # Usa str(), como limpar_valor
+    largura = max(textos.dtype.itemsize // 4, 1)
+    curtos = np.ones(len(textos), dtype=bool)
+    if largura > _TAMANHO_MAXIMO_NUMERO_VETORIZADO:
+        curtos = np.char.str_len(textos) <= _TAMANHO_MAXIMO_NUMERO_VETORIZADO
+        largura = _TAMANHO_MAXIMO_NUMERO_VETORIZADO
+        textos = textos[curtos].astype(f'<U{largura}')
+    codigos = textos.view(np.uint32).reshape(len(textos), largura)
+    
+    inteiros = np.zeros(len(textos), dtype=np.int64)
+    quantidade_digitos = np.zeros(len(textos), dtype=np.int64)
+    casas_decimais = np.zeros(len(textos), dtype=np.int64)
+    caracteres_mantidos = np.zeros(len(textos), dtype=np.int64)
+    viu_ponto = np.zeros(len(textos), dtype=bool)
+    ascii_puro = np.ones(len(textos), dtype=bool)
+    for coluna in range(largura):
+        caracteres = codigos[:, coluna]
+        digito = (caracteres >= 48) & (caracteres <= 57)
+        ponto = (caracteres == 44) | (caracteres == 46)
+        caracteres_mantidos += digito | ponto
+        dentro_do_limite = caracteres_mantidos <= 20
+        digito &= dentro_do_limite
+        
+        inteiros = np.where(digito, inteiros * 10 + (caracteres.astype(np.int64) - 48), inteiros)
+        casas_decimais += digito & viu_ponto
+        quantidade_digitos += digito
+        viu_ponto |= ponto & dentro_do_limite
+        ascii_puro &= caracteres < 128
     
-    # Remove duplicatas
-    df_sem_duplicatas = df.drop_duplicates(subset=colunas_disponiveis, keep='first')
+    exatos = ascii_puro & (quantidade_digitos >= 1) & (quantidade_digitos <= 15)
+    indices_curtos = np.flatnonzero(curtos)
+    numeros[indices_curtos[exatos]] = inteiros[exatos] / 10.0 ** casas_decimais[exatos]
     
-    return df_sem_duplicatas
+    # Números com mais de 15 dígitos, textos longos ou com dígitos não ASCII
+    # (aceitos por float()) usam as operações de texto do pandas
+    restantes = np.concatenate([
+        np.flatnonzero(~curtos),
+        indices_curtos[~ascii_puro | (quantidade_digitos > 15)],
+    ])
+    if len(restantes):
+        numeros[restantes] = _limpar_textos_numericos_pandas(pd.Series(valores[restantes], dtype=object).astype(str))
+    return numeros
 
-def verificar_calculos(df):
+def _limpar_serie_numerica(serie):
     """
-    Verifica e corrige cálculos da coluna total.
+    Versão vetorizada de `limpar_valor` seguida de `pd.to_numeric` para uma coluna.
     
-    Args:
-        df (pandas.DataFrame): DataFrame com os dados.
-        
-    Returns:
-        pandas.DataFrame: DataFrame com cálculos corrigidos.
+    Colunas já numéricas não precisam passar por texto: str(x) de um número
+    entre 0.1 e 1e16 (ou zero) tem no máximo 20 caracteres e nenhum expoente,
+    então a limpeza equivale ao valor absoluto. Os demais valores seguem
+    pela limpeza de texto.
     """
-    if all(col in df.columns for col in ['valor', 'quantidade', 'frete', 'total']):
-        # Calcula o total correto
-        df['total_calculado'] = df['valor'] * df['quantidade'] + df['frete']
-        
-        # Verifica diferenças maiores que 0.01
-        df['diferenca'] = abs(df['total'] - df['total_calculado'])
-        df.loc[df['diferenca'] > 0.01, 'total'] = df['total_calculado']
-        
-        # Remove colunas auxiliares
-        df = df.drop(['total_calculado', 'diferenca'], axis=1)
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        resultado = np.abs(serie.to_numpy(dtype=np.float64))
+        diretos = np.isnan(resultado) | (resultado == 0) | ((resultado >= 0.1) & (resultado < 1e16))
+        if not diretos.all():
+            resultado[~diretos] = _limpar_textos_numericos(serie.to_numpy(dtype=object)[~diretos])
+        return pd.Series(resultado, index=serie.index, name=serie.name)
     
-    return df
+    valores = serie.to_numpy(dtype=object)
+    resultado = np.full(len(valores), np.nan)
+    textos = ~pd.isna(valores)
+    if pd.api.types.infer_dtype(serie, skipna=True) != 'string':
+        # Números guardados em colunas de texto evitam a conversão para str
+        numeros = textos & np.fromiter((not isinstance(v, str) for v in valores), dtype=bool, count=len(valores))
+        subconjunto = pd.Series(valores[numeros]).infer_objects()
+        if pd.api.types.is_numeric_dtype(subconjunto) and not pd.api.types.is_bool_dtype(subconjunto):
+            resultado[numeros] = _limpar_serie_numerica(subconjunto).to_numpy()
+            textos &= ~numeros
+    resultado[textos] = _limpar_textos_numericos(valores[textos])
+    return pd.Series(resultado, index=serie.index, name=serie.name)
 
-def tratar_valores_ausentes(df):
+def limpar_colunas_numericas(df, processos=1):
     """
-    Trata valores ausentes usando estratégias específicas para cada coluna.
+    Limpa e valida as colunas numéricas em uma única etapa vetorizada.
+    
+    Equivale a `validar_valores_numericos` seguido de `validar_valor`,
+    `validar_quantidade` e `validar_frete`, mas cada coluna é convertida uma
+    única vez e as faixas são aplicadas com máscaras:
+    
+    - valor: entre 0 e 10.000, senão NaN;
+    - quantidade: parte inteira entre 1 e 100, senão 1 (tipo int8);
+    - total: apenas convertido;
+    - frete: entre 0 e 1.000, senão 0.
+    
+    Valores monetários continuam em float64: float32 alteraria os totais
+    recalculados e a tolerância de 0.01 usada em `recalcular_totais`.
     
     Args:
         df (pandas.DataFrame): DataFrame com os dados.
+        processos (int): Número de processos (ver `executar_em_paralelo`).
         
     Returns:
-        pandas.DataFrame: DataFrame com valores ausentes tratados.
+        pandas.DataFrame: DataFrame com as colunas numéricas tratadas.
     """
-    # Estratégias para cada coluna
-    estrategias = {
-        'valor': lambda x: x.fillna(x.mean()),
-        'quantidade': lambda x: x.fillna(1),
-        'frete': lambda x: x.fillna(0),
-        'vendedor': lambda x: x.fillna('Não Especificado'),
-        'marca': lambda x: x.fillna('Não Especificada')
-    }
+    if processos > 1:
+        return executar_em_paralelo(limpar_colunas_numericas, df, COLUNAS_NUMERICAS, processos)
     
-    # Aplica as estratégias para colunas individuais
-    for coluna, estrategia in estrategias.items():
-        if coluna in df.columns:
-            df[coluna] = estrategia(df[coluna])
+    if 'valor' in df.columns:
+        valor = _limpar_serie_numerica(df['valor'])
+        df['valor'] = valor.where(valor.between(*FAIXA_VALOR))
+    
+    if 'quantidade' in df.columns:
+        # int() trunca a parte decimal, como em validar_quantidade
+        quantidade = np.trunc(_limpar_serie_numerica(df['quantidade']))
+        df['quantidade'] = quantidade.where(quantidade.between(*FAIXA_QUANTIDADE), 1).astype(np.int8)
     
-    # Trata a coluna total separadamente
     if 'total' in df.columns:
-        df['total'] = df.apply(
-            lambda row: row['valor'] * row['quantidade'] + row['frete'] 
-            if pd.isna(row['total']) else row['total'],
-            axis=1
-        )
+        df['total'] = _limpar_serie_numerica(df['total'])
+    
+    if 'frete' in df.columns:
+        frete = _limpar_serie_numerica(df['frete'])
+        df['frete'] = frete.where(frete.between(*FAIXA_FRETE), 0.0)
     
     return df
 
-def validar_padronizacao_produtos(df):
+def padronizar_textos(df, normalizador_produtos=None, processos=1):
     """
-    Valida a eficácia da padronização de produtos, identificando possíveis
-    produtos similares que não foram padronizados corretamente.
+    Padroniza cliente, produto, data e hora.
     
     Args:
-        df (pandas.DataFrame): DataFrame contendo os dados com produtos padronizados.
+        df (pandas.DataFrame): DataFrame (ou bloco) com os dados brutos.
+        normalizador_produtos (NormalizadorProdutos): Normalizador a reutilizar
+            entre blocos, mantendo o cache de produtos já resolvidos.
+        processos (int): Número de processos (ver `executar_em_paralelo`).
+            Com mais de um, cada processo usa seu próprio normalizador.
         
     Returns:
-        pandas.DataFrame: O mesmo DataFrame de entrada.
-        
-    Prints:
-        Estatísticas de validação e alertas sobre possíveis produtos não padronizados.
+        pandas.DataFrame: DataFrame com as colunas de texto, data e hora tratadas.
     """
-    produtos_unicos = df['produto'].unique()
-    total_produtos = len(produtos_unicos)
-    print(f"Total de categorias de produtos após padronização: {total_produtos}")
+    if processos > 1:
+        return executar_em_paralelo(padronizar_textos, df, COLUNAS_TEXTO, processos)
     
-    # Verifica se há possíveis produtos similares usando distância de Levenshtein
-    produtos_potencialmente_similares = []
+    if normalizador_produtos is None:
+        normalizador_produtos = NormalizadorProdutos()
     
-    for i, prod1 in enumerate(produtos_unicos):
-        for prod2 in produtos_unicos[i+1:]:
-            # Calcula distância de Levenshtein simples
-            distancia = sum(1 for a, b in zip(prod1, prod2) if a != b) + abs(len(prod1) - len(prod2))
-            
-            # Se a distância for pequena mas não zero, pode ser um produto similar não padronizado
-            if 0 < distancia <= 3 and len(prod1) > 3 and len(prod2) > 3:
-                produtos_potencialmente_similares.append((prod1, prod2, distancia))
+    df['cliente'] = df['cliente'].apply(limpar_texto)  # Remove espaços extra e converte para minúsculas
+    df['produto'] = normalizador_produtos.padronizar_serie(df['produto'])  # Padroniza nomes de produtos
+    df['data'] = padronizar_datas(df['data'])  # Converte para formato YYYY-MM-DD
+    df['hora'] = padronizar_horas(df['hora'])  # Converte para formato HH:MM:SS
+    return df
+
+def aplicar_limpeza_por_linha(df, normalizador_produtos=None, processos=1):
+    """
+    Aplica as etapas de limpeza que dependem apenas da própria linha.
     
-    # Relatório de possíveis produtos similares
-    if produtos_potencialmente_similares:
-        print("\nAlerta: Possíveis produtos similares que poderiam ser padronizados:")
-        for prod1, prod2, dist in sorted(produtos_potencialmente_similares, key=lambda x: x[2]):
+    Corresponde à etapa 3 do pipeline e pode ser executada bloco a bloco,
+    pois nenhuma das funções usa informações de outras linhas.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame (ou bloco) com os dados brutos.
+        normalizador_produtos (NormalizadorProdutos): Normalizador a reutilizar
+            entre blocos, mantendo o cache de produtos já resolvidos.
+        processos (int): Número de processos (ver `executar_em_paralelo`).
+        
+    Returns:
+        pandas.DataFrame: DataFrame com textos, datas, horas e valores numéricos tratados.
+    """
+    if processos > 1:
+        return executar_em_paralelo(aplicar_limpeza_por_linha, df, COLUNAS_TEXTO + COLUNAS_NUMERICAS, processos)
+    
+    df = padronizar_textos(df, normalizador_produtos)
+    df = limpar_colunas_numericas(df)  # Valida valor (0 a 10.000), quantidade (1 a 100), total e frete (0 a 1.000)
+    return df
+
+def executar_em_paralelo(funcao, df, colunas, processos=NUMERO_PROCESSOS,
+                         particoes_por_processo=PARTICOES_POR_PROCESSO):
+    """
+    Executa uma etapa por linha em vários processos.
+    
+    O DataFrame é dividido em faixas contíguas de linhas, tratadas por `funcao`
+    em um `ProcessPoolExecutor`. Apenas as colunas que a etapa lê e altera são
+    enviadas aos processos, e as partes voltam na ordem de envio, então o
+    resultado é o mesmo da execução em um único processo, para qualquer número
+    de processos.
+    
+    Só deve ser usada com etapas que dependem apenas da própria linha
+    (`aplicar_limpeza_por_linha`, `padronizar_textos`, `limpar_colunas_numericas`).
+    
+    Args:
+        funcao (callable): Etapa a executar, chamada como `funcao(particao)`.
+            Deve ser uma função de nível de módulo (enviada por referência).
+        df (pandas.DataFrame): DataFrame com os dados.
+        colunas (list): Colunas lidas e alteradas pela etapa.
+        processos (int): Número de processos auxiliares.
+        particoes_por_processo (int): Número de faixas por processo; mais de
+            uma equilibra a carga quando as faixas têm custos diferentes.
+        
+    Returns:
+        pandas.DataFrame: DataFrame com as colunas tratadas.
+    """
+    colunas = [coluna for coluna in colunas if coluna in df.columns]
+    if processos <= 1 or len(df) < 2:
+        return funcao(df)
+    
+    numero_particoes = min(len(df), processos * particoes_por_processo)
+    limites = np.linspace(0, len(df), numero_particoes + 1).astype(int)
+    particoes = (df.iloc[inicio:fim][colunas] for inicio, fim in zip(limites[:-1], limites[1:]))
+    
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        # map devolve os resultados na ordem de envio
+        resultado = pd.concat(list(executor.map(funcao, particoes)))
+    for coluna in colunas:
+        df[coluna] = resultado[coluna]
+    return df
+
+# Colunas-chave dos registros duplicados
+COLUNAS_CHAVE_DUPLICATAS = ['id_da_compra', 'data', 'hora', 'cliente', 'produto']
+
+# Deduplicação em disco no modo streaming (`DeduplicadorParticionado`): as
+# impressões das chaves são particionadas pelos BITS_PARTICAO_DUPLICATAS bits
+# mais altos, em vez de ficarem todas na memória
+DUPLICATAS_EM_DISCO = False
+BITS_PARTICAO_DUPLICATAS = 4
+
+def tratar_duplicatas(df):
+    """
+    Remove registros duplicados, mantendo o primeiro registro.
+    
+    Em memória, `drop_duplicates` nas colunas-chave é o caminho mais rápido;
+    as impressões de 64 bits (`_impressoes_chave`) só são usadas quando as
+    chaves precisam ser comparadas entre blocos (`remover_duplicatas_entre_blocos`)
+    ou gravadas em disco (`DeduplicadorParticionado`).
+    
+    O número de registros removidos fica em `df.attrs['duplicatas_removidas']`
+    (usado por `gerar_relatorio`).
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com os dados.
+        
+    Returns:
+        pandas.DataFrame: DataFrame sem duplicatas.
+    """
+    colunas_disponiveis = [col for col in COLUNAS_CHAVE_DUPLICATAS if col in df.columns]
+    
+    if colunas_disponiveis:
+        df_sem_duplicatas = df.drop_duplicates(subset=colunas_disponiveis, keep='first')
+    else:
+        df_sem_duplicatas = df.copy()
+    df_sem_duplicatas.attrs['duplicatas_removidas'] = len(df) - len(df_sem_duplicatas)
+    return df_sem_duplicatas
+
+# Diferença máxima aceita entre o total informado e valor * quantidade + frete
+TOLERANCIA_TOTAL = 0.01
+
+def recalcular_totais(df):
+    """
+    Preenche e corrige a coluna total em uma única etapa vetorizada.
+    
+    O total esperado (valor * quantidade + frete) é calculado uma única vez.
+    Totais ausentes recebem o esperado; totais que diferem dele em mais de
+    TOLERANCIA_TOTAL são corrigidos. As quantidades de linhas preenchidas e
+    corrigidas ficam em `df.attrs` ('totais_preenchidos' e 'totais_corrigidos')
+    para o relatório.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com os dados.
+        
+    Returns:
+        pandas.DataFrame: DataFrame com os totais preenchidos e corrigidos.
+    """
+    if not all(col in df.columns for col in ['valor', 'quantidade', 'frete', 'total']):
+        return df
+    
+    total = df['total'].to_numpy(dtype=np.float64)
+    esperado = (
+        df['valor'].to_numpy(dtype=np.float64) * df['quantidade'].to_numpy(dtype=np.float64)
+        + df['frete'].to_numpy(dtype=np.float64)
+    )
+    preenchidos = np.isnan(total) & ~np.isnan(esperado)
+    divergentes = np.abs(total - esperado) > TOLERANCIA_TOTAL  # Falso onde há NaN
+    
+    substituir = preenchidos | divergentes
+    if substituir.any():
+        df['total'] = np.where(substituir, esperado, total)
+    df.attrs['totais_preenchidos'] = int(preenchidos.sum())
+    df.attrs['totais_corrigidos'] = int(divergentes.sum())
+    return df
+
+def verificar_calculos(df):
+    """
+    Verifica e corrige cálculos da coluna total.
+    
+    Mantida por compatibilidade: equivale a `recalcular_totais`.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com os dados.
+        
+    Returns:
+        pandas.DataFrame: DataFrame com cálculos corrigidos.
+    """
+    return recalcular_totais(df)
+
+def _preencher_texto(serie, valor):
+    """Preenche ausentes com um texto, incluindo-o nas categorias se a coluna for categórica."""
+    if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+        serie = serie.cat.add_categories([valor])
+    return serie.fillna(valor)
+
+def tratar_valores_ausentes(df, media_valor=None):
+    """
+    Trata valores ausentes usando estratégias específicas para cada coluna.
+    
+    Ao final, a coluna total é preenchida e verificada por `recalcular_totais`.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com os dados.
+        media_valor (float): Média de 'valor' usada no preenchimento. Se None,
+            é calculada a partir do próprio df.
+        
+    Returns:
+        pandas.DataFrame: DataFrame com valores ausentes tratados.
+    """
+    # Estratégias para cada coluna
+    estrategias = {
+        'valor': lambda x: x.fillna(x.mean() if media_valor is None else media_valor),
+        'quantidade': lambda x: x.fillna(1),
+        'frete': lambda x: x.fillna(0),
+        'vendedor': lambda x: _preencher_texto(x, 'Não Especificado'),
+        'marca': lambda x: _preencher_texto(x, 'Não Especificada')
+    }
+    
+    # Aplica as estratégias para colunas individuais
+    for coluna, estrategia in estrategias.items():
+        if coluna in df.columns:
+            df[coluna] = estrategia(df[coluna])
+    
+    # Total: preenchido e conferido com valor * quantidade + frete na mesma passada
+    return recalcular_totais(df)
+
+def validar_padronizacao_produtos(df):
+    """
+    Valida a eficácia da padronização de produtos, identificando possíveis
+    produtos similares que não foram padronizados corretamente.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame contendo os dados com produtos padronizados.
+        
+    Returns:
+        pandas.DataFrame: Pares de produtos suspeitos (ver `encontrar_produtos_similares`).
+        
+    Prints:
+        Estatísticas de validação e alertas sobre possíveis produtos não padronizados.
+    """
+    return relatar_padronizacao_produtos(df['produto'].unique(), df['produto'].value_counts())
+
+def encontrar_produtos_similares(produtos, distancia_maxima=DISTANCIA_MAXIMA_SIMILARES):
+    """
+    Encontra pares de produtos distintos a poucas edições de distância.
+    
+    Usa `encontrar_pares_similares`, que só compara os pares plausíveis,
+    em vez de comparar todos os pares de produtos.
+    
+    Args:
+        produtos (array-like): Produtos distintos.
+        distancia_maxima (int): Maior distância de edição de um par suspeito.
+        
+    Returns:
+        pandas.DataFrame: Colunas 'produto_1', 'produto_2' e 'distancia', do
+        par mais próximo ao mais distante (empates na ordem dos produtos).
+    """
+    produtos = [
+        produto for produto in produtos
+        if isinstance(produto, str) and len(produto) >= TAMANHO_MINIMO_EDICAO
+    ]
+    produtos = list(dict.fromkeys(produtos))
+    primeiros, segundos, distancias = encontrar_pares_similares(produtos, distancia_maxima)
+    textos = np.array(produtos, dtype=object)
+    return pd.DataFrame({
+        'produto_1': textos[primeiros],
+        'produto_2': textos[segundos],
+        'distancia': distancias,
+    })
+
+# Número máximo de pares similares listados na saída da validação
+MAXIMO_PARES_EXIBIDOS = 50
+
+def relatar_padronizacao_produtos(produtos_unicos, contagem_produtos):
+    """
+    Executa a validação de `validar_padronizacao_produtos` a partir dos
+    produtos distintos e de suas contagens já agregadas.
+    
+    Args:
+        produtos_unicos (array-like): Produtos distintos, na ordem de aparição.
+        contagem_produtos (pandas.Series): Ocorrências de cada produto.
+        
+    Returns:
+        pandas.DataFrame: Pares de produtos suspeitos (ver `encontrar_produtos_similares`).
+        
+    Prints:
+        Estatísticas de validação e alertas sobre possíveis produtos não padronizados.
+    """
+    total_produtos = len(produtos_unicos)
+    print(f"Total de categorias de produtos após padronização: {total_produtos}")
+    
+    # Verifica se há possíveis produtos similares usando a distância de edição
+    produtos_similares = encontrar_produtos_similares(produtos_unicos)
+    
+    # Relatório de possíveis produtos similares
+    if not produtos_similares.empty:
+        print("\nAlerta: Possíveis produtos similares que poderiam ser padronizados:")
+        for prod1, prod2, dist in produtos_similares.head(MAXIMO_PARES_EXIBIDOS).itertuples(index=False):
             print(f"  - '{prod1}' e '{prod2}' (distância: {dist})")
+        if len(produtos_similares) > MAXIMO_PARES_EXIBIDOS:
+            print(f"  ... e mais {len(produtos_similares) - MAXIMO_PARES_EXIBIDOS} pares")
     else:
         print("\nValidação concluída: Nenhum produto similar encontrado que precise de padronização adicional.")
     
     # Analisa frequência dos produtos padronizados
-    contagem_produtos = df['produto'].value_counts()
     produtos_raros = contagem_produtos[contagem_produtos <= 5]
     
     if not produtos_raros.empty:
@@ -809,16 +2576,409 @@ def validar_padronizacao_produtos(df):
         for produto, contagem in produtos_raros.items():
             print(f"  - '{produto}': {contagem} ocorrências")
     
-    return df
+    return produtos_similares
+
+# Algoritmos aceitos por `ReticuladoItemsets` e `minerar_conjuntos_frequentes`
+ALGORITMOS_MINERACAO = ('eclat', 'apriori')
 
-def analisar_regras_associacao(df, min_support=0.01, min_confidence=0.3):
+def _bitsets_por_item(matriz, itens):
     """
-    Analisa regras de associação entre produtos usando o algoritmo Apriori.
+    Converte colunas de uma matriz booleana (transações × itens) em bitsets.
+    
+    Cada bitset é um inteiro Python em que o bit i indica se o item aparece na
+    transação i; `&` e `int.bit_count()` fazem a interseção e a contagem em C,
+    usando 1 bit por transação em vez de 1 byte da matriz booleana.
+    
+    Args:
+        matriz: numpy.ndarray booleano ou matriz esparsa do scipy.
+        itens (list): Índices das colunas a converter.
+        
+    Returns:
+        list: Um inteiro para cada item de `itens`.
+    """
+    n_transacoes = matriz.shape[0]
+    esparsa = hasattr(matriz, 'tocsc')
+    if esparsa:
+        matriz = matriz.tocsc()
+    bitsets = []
+    for item in itens:
+        if esparsa:
+            coluna = np.zeros(n_transacoes, dtype=bool)
+            coluna[matriz.indices[matriz.indptr[item]:matriz.indptr[item + 1]]] = True
+        else:
+            coluna = np.asarray(matriz[:, item], dtype=bool)
+        bitsets.append(int.from_bytes(np.packbits(coluna, bitorder='little').tobytes(), 'little'))
+    return bitsets
+
+def minerar_itemsets_eclat(matriz, colunas, min_support, max_len=None, cache_bitsets=None):
+    """
+    Encontra os conjuntos de itens frequentes com o algoritmo Eclat sobre bitsets.
+    
+    A busca é em profundidade: cada conjunto frequente é estendido apenas com
+    itens maiores que o seu último item, e o suporte da extensão vem da
+    interseção dos bitsets, sem percorrer as transações novamente.
+    
+    O resultado é idêntico ao de `mlxtend.frequent_patterns.apriori` com
+    `use_colnames=True`: mesmas colunas ('support', 'itemsets'), mesmos valores
+    de suporte e mesma ordem (por tamanho e depois pela ordem das colunas).
+    
+    Args:
+        matriz: Matriz booleana (transações × itens), densa ou esparsa do scipy.
+        colunas (list): Nome de cada item (coluna da matriz).
+        min_support (float): Suporte mínimo, no intervalo (0, 1].
+        max_len (int): Tamanho máximo dos conjuntos (None para não limitar).
+        cache_bitsets (dict): Bitsets já calculados por item, reaproveitados e
+            completados entre chamadas sobre a mesma matriz.
+        
+    Returns:
+        pandas.DataFrame: Conjuntos frequentes e seus suportes.
+    """
+    if min_support <= 0.0:
+        raise ValueError(f"`min_support` deve estar no intervalo (0, 1]. Recebido: {min_support}")
+    
+    n_transacoes = matriz.shape[0]
+    encontrados = []
+    
+    def estender(prefixo, candidatos):
+        for posicao, (item, bits, contagem) in enumerate(candidatos):
+            itens = prefixo + (item,)
+            encontrados.append((itens, contagem))
+            if max_len is not None and len(itens) >= max_len:
+                continue
+            extensoes = []
+            for outro, bits_outro, _ in candidatos[posicao + 1:]:
+                intersecao = bits & bits_outro
+                contagem_intersecao = intersecao.bit_count()
+                if contagem_intersecao / n_transacoes >= min_support:
+                    extensoes.append((outro, intersecao, contagem_intersecao))
+            if extensoes:
+                estender(itens, extensoes)
+    
+    if n_transacoes:
+        # Só os itens frequentes recebem bitsets
+        contagens_itens = np.asarray(matriz.sum(axis=0)).reshape(-1).astype(np.int64)
+        frequentes = np.flatnonzero(contagens_itens / n_transacoes >= min_support).tolist()
+        if cache_bitsets is None:
+            cache_bitsets = {}
+        faltantes = [item for item in frequentes if item not in cache_bitsets]
+        cache_bitsets.update(zip(faltantes, _bitsets_por_item(matriz, faltantes)))
+        estender((), [(item, cache_bitsets[item], contagens_itens[item]) for item in frequentes])
+    
+    # Mesma ordem do apriori: por tamanho e, dentro do tamanho, pelos índices das colunas
+    encontrados.sort(key=lambda par: (len(par[0]), par[0]))
+    contagens = np.array([contagem for _, contagem in encontrados], dtype=np.int64)
+    return pd.DataFrame({
+        'support': contagens / n_transacoes if n_transacoes else contagens.astype(float),
+        'itemsets': pd.Series(
+            [frozenset(colunas[i] for i in itens) for itens, _ in encontrados], dtype=object
+        ),
+    })
+
+def codificar_transacoes(df):
+    """
+    Codifica as compras como uma matriz esparsa de transações × produtos.
+    
+    As colunas 'id_da_compra' e 'produto' viram códigos categóricos, cada par
+    (transação, produto) é deduplicado com `np.unique` e os pares formam
+    diretamente uma matriz CSR booleana. A memória é proporcional ao número de
+    itens vendidos, não a transações × produtos como na matriz densa do
+    `TransactionEncoder`.
+    
+    Os produtos ficam em ordem alfabética, como nas colunas do `TransactionEncoder`.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com as colunas 'id_da_compra' e 'produto'.
+        
+    Returns:
+        tuple: (matriz CSR booleana, lista com o produto de cada coluna)
+    """
+    compras = df.loc[df['id_da_compra'].notna() & df['produto'].notna(), ['id_da_compra', 'produto']]
+    ids = compras['id_da_compra'].astype('category').cat.remove_unused_categories()
+    produtos = compras['produto'].astype('category').cat.remove_unused_categories()
+    if not produtos.cat.categories.is_monotonic_increasing:
+        produtos = produtos.cat.reorder_categories(produtos.cat.categories.sort_values())
+    
+    n_transacoes = len(ids.cat.categories)
+    n_produtos = len(produtos.cat.categories)
+    
+    # Remove produtos repetidos na mesma compra; os pares saem ordenados por transação
+    pares = np.unique(ids.cat.codes.to_numpy(dtype=np.int64) * n_produtos + produtos.cat.codes.to_numpy(dtype=np.int64))
+    transacoes, colunas = np.divmod(pares, n_produtos)
+    inicio_linhas = np.zeros(n_transacoes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(transacoes, minlength=n_transacoes), out=inicio_linhas[1:])
+    
+    from scipy.sparse import csr_matrix
+    matriz = csr_matrix(
+        (np.ones(len(pares), dtype=bool), colunas, inicio_linhas),
+        shape=(n_transacoes, n_produtos),
+    )
+    return matriz, produtos.cat.categories.tolist()
+
+class ReticuladoItemsets:
+    """
+    Guarda os conjuntos frequentes minerados de uma matriz de transações.
+    
+    A mineração é feita uma vez no menor suporte pedido, e os conjuntos para
+    qualquer suporte maior são obtidos filtrando o resultado guardado, pois
+    todo conjunto frequente em um suporte maior também é frequente no menor.
+    Da mesma forma, as regras são geradas uma vez na menor confiança pedida e
+    filtradas por suporte e confiança. Os resultados filtrados são idênticos
+    aos de uma mineração nova com os mesmos limiares.
+    
+    Só um suporte menor que o já minerado exige nova mineração; nesse caso a
+    matriz e os bitsets dos itens (no Eclat) são reaproveitados.
+    """
+    
+    def __init__(self, matriz, produtos, algoritmo='eclat'):
+        """
+        Args:
+            matriz (scipy.sparse.csr_matrix): Matriz de transações de `codificar_transacoes`.
+            produtos (list): Produto de cada coluna da matriz.
+            algoritmo (str): 'eclat' (minerador próprio, direto sobre a matriz
+                esparsa) ou 'apriori' (mlxtend, que precisa da matriz densa).
+        """
+        if algoritmo not in ALGORITMOS_MINERACAO:
+            raise ValueError(f"Algoritmo desconhecido: {algoritmo!r}. Use um de {ALGORITMOS_MINERACAO}.")
+        self.matriz = matriz
+        self.produtos = produtos
+        self.algoritmo = algoritmo
+        self.suporte_minerado = None
+        self._conjuntos = None
+        self._bitsets = {}
+        self._confianca_regras = None
+        self._regras = None
+    
+    def _minerar(self, min_support):
+        if self.algoritmo == 'eclat':
+            return minerar_itemsets_eclat(self.matriz, self.produtos, min_support, cache_bitsets=self._bitsets)
+        df_transacoes = pd.DataFrame(self.matriz.toarray(), columns=self.produtos)
+        from mlxtend.frequent_patterns import apriori
+        return apriori(df_transacoes, min_support=min_support, use_colnames=True)
+    
+    def conjuntos_frequentes(self, min_support):
+        """
+        Retorna os conjuntos frequentes com suporte mínimo `min_support`.
+        
+        Args:
+            min_support (float): Suporte mínimo.
+            
+        Returns:
+            pandas.DataFrame: Conjuntos frequentes no formato do mlxtend.
+        """
+        if self.suporte_minerado is None or min_support < self.suporte_minerado:
+            self._conjuntos = self._minerar(min_support)
+            self.suporte_minerado = min_support
+            self._confianca_regras = None
+            self._regras = None
+        return self._conjuntos[self._conjuntos['support'] >= min_support].reset_index(drop=True)
+    
+    def regras(self, min_support, min_confidence):
+        """
+        Retorna as regras de associação para os limiares dados.
+        
+        Args:
+            min_support (float): Suporte mínimo dos conjuntos frequentes.
+            min_confidence (float): Confiança mínima das regras.
+            
+        Returns:
+            pandas.DataFrame: Regras no formato de `association_rules`, ou None
+            se não houver conjuntos frequentes.
+        """
+        if self.conjuntos_frequentes(min_support).empty:
+            return None
+        if self._regras is None or min_confidence < self._confianca_regras:
+            from mlxtend.frequent_patterns import association_rules
+            self._regras = association_rules(self._conjuntos, metric="confidence", min_threshold=min_confidence)
+            self._confianca_regras = min_confidence
+        filtro = (self._regras['support'] >= min_support) & (self._regras['confidence'] >= min_confidence)
+        return self._regras[filtro].reset_index(drop=True)
+
+def minerar_conjuntos_frequentes(matriz, produtos, min_support, algoritmo='eclat'):
+    """
+    Encontra os conjuntos de itens frequentes na matriz de transações.
+    
+    Args:
+        matriz (scipy.sparse.csr_matrix): Matriz de transações de `codificar_transacoes`.
+        produtos (list): Produto de cada coluna da matriz.
+        min_support (float): Suporte mínimo.
+        algoritmo (str): 'eclat' (minerador próprio, direto sobre a matriz
+            esparsa) ou 'apriori' (mlxtend, que precisa da matriz densa).
+        
+    Returns:
+        pandas.DataFrame: Conjuntos frequentes no formato do mlxtend.
+    """
+    return ReticuladoItemsets(matriz, produtos, algoritmo).conjuntos_frequentes(min_support)
+
+# Pós-processamento das regras (`podar_regras`): remove as regras redundantes
+# e não fechadas; os limiares de lift/leverage/conviction e o tamanho máximo
+# das regras são opcionais (None desliga o filtro)
+REMOVER_REGRAS_REDUNDANTES = True
+MAXIMO_PARES_POR_LOTE = 2_000_000
+
+def _codificar_conjuntos(colunas):
+    """
+    Codifica colunas de conjuntos de produtos como máscaras de bits.
+    
+    Args:
+        colunas (list): Séries de conjuntos (ou listas) de produtos, com o
+            mesmo número de linhas.
+        
+    Returns:
+        tuple: (lista de arrays uint64 de forma (linhas, palavras), um por
+        coluna, e lista de arrays com o número de produtos de cada linha)
+    """
+    explodidas = [coluna.reset_index(drop=True).explode() for coluna in colunas]
+    codigos, _ = pd.factorize(pd.concat(explodidas, ignore_index=True))
+    palavras = max(1, -(-(codigos.max() + 1) // 64)) if len(codigos) else 1
+    
+    mascaras, tamanhos = [], []
+    inicio = 0
+    for explodida in explodidas:
+        codigos_coluna = codigos[inicio:inicio + len(explodida)]
+        inicio += len(explodida)
+        validos = codigos_coluna >= 0
+        linhas = explodida.index.to_numpy()[validos]
+        codigos_coluna = codigos_coluna[validos].astype(np.uint64)
+        mascara = np.zeros((len(colunas[0]), palavras), dtype=np.uint64)
+        np.bitwise_or.at(
+            mascara, (linhas, (codigos_coluna // 64).astype(np.int64)), np.uint64(1) << (codigos_coluna % np.uint64(64))
+        )
+        mascaras.append(mascara)
+        tamanhos.append(np.bincount(linhas, minlength=len(colunas[0])))
+    return mascaras, tamanhos
+
+def _pares_no_mesmo_grupo(grupos):
+    """
+    Gera, em lotes, todos os pares ordenados (i, j), i != j, de linhas do mesmo grupo.
+    
+    Args:
+        grupos (numpy.ndarray): Código do grupo de cada linha.
+        
+    Yields:
+        tuple: (array i, array j) com até MAXIMO_PARES_POR_LOTE pares.
+    """
+    ordem = np.argsort(grupos, kind='stable')
+    _, inicios, tamanhos = np.unique(grupos[ordem], return_index=True, return_counts=True)
+    multiplos = tamanhos > 1
+    inicios, tamanhos = inicios[multiplos], tamanhos[multiplos]
+    pares_por_grupo = tamanhos * tamanhos
+    
+    primeiro = 0
+    while primeiro < len(tamanhos):
+        # Junta grupos até o limite de pares (um grupo maior que o limite forma um lote sozinho)
+        acumulado = np.cumsum(pares_por_grupo[primeiro:])
+        ultimo = primeiro + max(1, np.searchsorted(acumulado, MAXIMO_PARES_POR_LOTE, side='right'))
+        tamanhos_lote = tamanhos[primeiro:ultimo]
+        inicios_lote = inicios[primeiro:ultimo]
+        
+        # Para cada linha, todas as linhas do seu grupo (incluindo ela mesma)
+        linhas = np.repeat(inicios_lote - np.cumsum(tamanhos_lote) + tamanhos_lote, tamanhos_lote) + np.arange(tamanhos_lote.sum())
+        repeticoes = np.repeat(tamanhos_lote, tamanhos_lote)
+        i = np.repeat(linhas, repeticoes)
+        deslocamentos = np.arange(len(i)) - np.repeat(np.cumsum(repeticoes) - repeticoes, repeticoes)
+        j = np.repeat(np.repeat(inicios_lote, tamanhos_lote), repeticoes) + deslocamentos
+        diferentes = i != j
+        yield ordem[i[diferentes]], ordem[j[diferentes]]
+        primeiro = ultimo
+
+def _contido_propriamente(mascaras, tamanhos, i, j):
+    """Indica, para cada par, se o conjunto da linha j está contido propriamente no da linha i."""
+    return ((mascaras[j] & ~mascaras[i]) == 0).all(axis=1) & (tamanhos[j] < tamanhos[i])
+
+def podar_regras(rules, min_lift=None, min_leverage=None, min_conviction=None, max_len=None,
+                 remover_redundantes=REMOVER_REGRAS_REDUNDANTES):
+    """
+    Remove as regras redundantes e filtra as regras por lift, leverage, conviction e tamanho.
+    
+    Uma regra X → Y é removida como redundante se:
+    - existe uma regra X' → Y com X' contido propriamente em X e lift maior
+      ou igual (o antecedente maior não traz ganho de lift); ou
+    - existe uma regra X → Y' com Y contido propriamente em Y' e o mesmo
+      suporte (X ∪ Y não é fechado: a regra mais completa tem o mesmo suporte
+      e a mesma confiança).
+    
+    Os conjuntos de produtos são codificados como máscaras de bits, e as
+    comparações entre regras com o mesmo consequente (ou antecedente) são
+    feitas em arrays, sem percorrer os frozensets em Python.
+    
+    Args:
+        rules (pandas.DataFrame): Regras de `association_rules`.
+        min_lift (float): Lift mínimo.
+        min_leverage (float): Leverage mínimo.
+        min_conviction (float): Conviction mínima.
+        max_len (int): Número máximo de produtos na regra (antecedente + consequente).
+        remover_redundantes (bool): Remove as regras redundantes e não fechadas.
+        
+    Returns:
+        pandas.DataFrame: Regras mantidas, na ordem e com o índice originais. O
+        número de regras removidas por cada critério fica em
+        `attrs['regras_removidas']`.
+    """
+    if rules is None or len(rules) == 0:
+        return rules
+    
+    removidas = {}
+    mantidas = np.ones(len(rules), dtype=bool)
+    for coluna, minimo in (('lift', min_lift), ('leverage', min_leverage), ('conviction', min_conviction)):
+        if minimo is not None:
+            abaixo = mantidas & ~(rules[coluna].to_numpy() >= minimo)
+            removidas[coluna] = int(abaixo.sum())
+            mantidas &= ~abaixo
+    
+    (antecedentes, consequentes), (tamanho_antecedentes, tamanho_consequentes) = _codificar_conjuntos(
+        [rules['antecedents'], rules['consequents']]
+    )
+    if max_len is not None:
+        longas = mantidas & (tamanho_antecedentes + tamanho_consequentes > max_len)
+        removidas['max_len'] = int(longas.sum())
+        mantidas &= ~longas
+    
+    if remover_redundantes:
+        # As comparações usam só as regras que passaram nos filtros
+        posicoes = np.flatnonzero(mantidas)
+        antecedentes, consequentes = antecedentes[posicoes], consequentes[posicoes]
+        tamanho_antecedentes, tamanho_consequentes = tamanho_antecedentes[posicoes], tamanho_consequentes[posicoes]
+        lift = rules['lift'].to_numpy()[posicoes]
+        suporte = rules['support'].to_numpy()[posicoes]
+        
+        redundantes = np.zeros(len(posicoes), dtype=bool)
+        grupos_consequente = np.unique(consequentes, axis=0, return_inverse=True)[1].ravel()
+        for i, j in _pares_no_mesmo_grupo(grupos_consequente):
+            sem_ganho = _contido_propriamente(antecedentes, tamanho_antecedentes, i, j) & (lift[j] >= lift[i])
+            redundantes[i[sem_ganho]] = True
+        
+        nao_fechadas = np.zeros(len(posicoes), dtype=bool)
+        grupos_antecedente = np.unique(antecedentes, axis=0, return_inverse=True)[1].ravel()
+        for i, j in _pares_no_mesmo_grupo(grupos_antecedente):
+            mesmo_suporte = _contido_propriamente(consequentes, tamanho_consequentes, j, i) & np.isclose(suporte[i], suporte[j])
+            nao_fechadas[i[mesmo_suporte]] = True
+        
+        removidas['redundantes'] = int(redundantes.sum())
+        removidas['nao_fechadas'] = int((nao_fechadas & ~redundantes).sum())
+        mantidas[posicoes[redundantes | nao_fechadas]] = False
+    
+    resultado = rules[mantidas]
+    resultado.attrs['regras_removidas'] = removidas
+    return resultado
+
+def analisar_regras_associacao(df, min_support=0.01, min_confidence=0.3, algoritmo='eclat', reticulado=None,
+                               caminho_csv="dadosLimpos/regras_associacao.csv", poda=None):
+    """
+    Analisa regras de associação entre produtos usando o algoritmo Eclat ou Apriori.
     
     Args:
         df (pandas.DataFrame): DataFrame contendo os dados limpos.
         min_support (float): Suporte mínimo para regras de associação (padrão: 0.01).
         min_confidence (float): Confiança mínima para regras de associação (padrão: 0.3).
+        algoritmo (str): Minerador de conjuntos frequentes, 'eclat' (padrão) ou
+            'apriori' (mlxtend). Os dois produzem os mesmos resultados.
+        reticulado (ReticuladoItemsets): Conjuntos já minerados sobre o mesmo df
+            (por exemplo, por `varrer_limiares`). Se None, as transações são
+            codificadas e mineradas aqui.
+        caminho_csv (str): CSV onde as regras são gravadas (None para não gravar).
+        poda (dict): Argumentos de `podar_regras` (min_lift, min_leverage,
+            min_conviction, max_len, remover_redundantes). Se None, remove
+            apenas as regras redundantes (`REMOVER_REGRAS_REDUNDANTES`).
         
     Returns:
         tuple: (DataFrame com conjuntos frequentes, DataFrame com regras de associação)
@@ -828,40 +2988,39 @@ def analisar_regras_associacao(df, min_support=0.01, min_confidence=0.3):
     """
     print("Preparando dados para análise de regras de associação...")
     
-    # Agrupar compras por ID da compra
-    compras_por_id = df.groupby('id_da_compra')['produto'].apply(list).reset_index()
-    
-    # Converter para o formato de transações
-    transacoes = compras_por_id['produto'].tolist()
+    if reticulado is None:
+        # Agrupar compras por ID da compra em uma matriz esparsa de transações × produtos
+        # (produtos repetidos na mesma compra contam uma única vez)
+        matriz_transacoes, produtos = codificar_transacoes(df)
+        reticulado = ReticuladoItemsets(matriz_transacoes, produtos, algoritmo)
     
-    # Remover duplicatas em cada transação (se o mesmo produto foi comprado múltiplas vezes)
-    transacoes = [list(set(transacao)) for transacao in transacoes]
+    print(f"Total de transações para análise: {reticulado.matriz.shape[0]}")
     
-    print(f"Total de transações para análise: {len(transacoes)}")
-    
-    # Aplicar algoritmo Apriori para encontrar conjuntos de itens frequentes
-    print(f"Aplicando algoritmo Apriori (min_support={min_support})...")
-    
-    # Converter transações para formato binário
-    te = TransactionEncoder()
-    te_ary = te.fit(transacoes).transform(transacoes)
-    df_transacoes = pd.DataFrame(te_ary, columns=te.columns_)
-    
-    # Encontrar conjuntos frequentes
-    frequent_itemsets = apriori(df_transacoes, min_support=min_support, use_colnames=True)
+    # Aplicar o algoritmo escolhido para encontrar conjuntos de itens frequentes
+    print(f"Aplicando algoritmo {reticulado.algoritmo.capitalize()} (min_support={min_support})...")
+    suporte_usado = min_support
+    frequent_itemsets = reticulado.conjuntos_frequentes(suporte_usado)
     
     # Se nenhum conjunto frequente for encontrado, ajustar o suporte mínimo
+    # (o reticulado reaproveita a matriz e o que já foi minerado)
     if len(frequent_itemsets) == 0:
-        novo_min_support = min_support / 2
-        print(f"Nenhum conjunto frequente encontrado. Reduzindo min_support para {novo_min_support}...")
-        frequent_itemsets = apriori(df_transacoes, min_support=novo_min_support, use_colnames=True)
+        suporte_usado = min_support / 2
+        print(f"Nenhum conjunto frequente encontrado. Reduzindo min_support para {suporte_usado}...")
+        frequent_itemsets = reticulado.conjuntos_frequentes(suporte_usado)
     
     print(f"Conjuntos frequentes encontrados: {len(frequent_itemsets)}")
     
     # Gerar regras de associação
     if len(frequent_itemsets) > 0:
         print(f"Gerando regras de associação (min_confidence={min_confidence})...")
-        rules = association_rules(frequent_itemsets, metric="confidence", min_threshold=min_confidence)
+        rules = reticulado.regras(suporte_usado, min_confidence)
+        
+        # Remover regras redundantes e aplicar os filtros de lift/leverage/conviction/tamanho
+        total_regras = len(rules)
+        rules = podar_regras(rules, **(poda or {}))
+        if len(rules) < total_regras:
+            criterios = ', '.join(f"{criterio}: {quantidade}" for criterio, quantidade in rules.attrs['regras_removidas'].items())
+            print(f"Regras mantidas após a poda: {len(rules)} de {total_regras} ({criterios})")
         
         # Adicionar métricas de lift e conviction
         rules["lift"] = rules["lift"].round(4)
@@ -878,43 +3037,285 @@ def analisar_regras_associacao(df, min_support=0.01, min_confidence=0.3):
             print(f"   Suporte: {row['support']:.4f}, Confiança: {row['confidence']:.4f}, Lift: {row['lift']:.4f}")
         
         # Salvar as regras em um arquivo CSV
-        rules.to_csv("dadosLimpos/regras_associacao.csv", index=False)
-        print("\nRegras de associação salvas em: dadosLimpos/regras_associacao.csv")
+        if caminho_csv is not None:
+            _criar_pasta_de(caminho_csv)
+            rules.to_csv(caminho_csv, index=False)
+            print(f"\nRegras de associação salvas em: {caminho_csv}")
         
         return frequent_itemsets, rules
     else:
         print("Não foi possível encontrar regras de associação com os parâmetros especificados.")
         return frequent_itemsets, None
 
-def gerar_relatorio_associacao(rules, file_path="relatorios/relatorio_associacao.md"):
+def gerar_regras_associacao(df, min_support=0.01, min_confidence=0.3, algoritmo='eclat',
+                            caminho_csv="dadosLimpos/regras_associacao.csv", poda=None):
     """
-    Gera um relatório detalhado sobre as regras de associação encontradas.
+    Executa `analisar_regras_associacao` e retorna apenas as regras.
+    
+    É a forma da etapa de associação usada pelo cache de etapas, que guarda
+    um único DataFrame por etapa.
+    
+    Returns:
+        pandas.DataFrame: Regras de associação, ou None se não houver.
+    """
+    _, rules = analisar_regras_associacao(df, min_support, min_confidence, algoritmo, caminho_csv=caminho_csv, poda=poda)
+    return rules
+
+def varrer_limiares(df, suportes, confiancas, algoritmo='eclat'):
+    """
+    Gera as regras de associação para várias combinações de suporte e confiança.
+    
+    As transações são codificadas e mineradas uma única vez, no menor suporte
+    da lista, e cada combinação é obtida filtrando o mesmo `ReticuladoItemsets`.
     
     Args:
-        rules (pandas.DataFrame): DataFrame contendo as regras de associação.
-        file_path (str): Caminho onde o relatório será salvo.
+        df (pandas.DataFrame): DataFrame contendo os dados limpos.
+        suportes (list): Valores de `min_support` a testar.
+        confiancas (list): Valores de `min_confidence` a testar.
+        algoritmo (str): Minerador de conjuntos frequentes, 'eclat' ou 'apriori'.
         
     Returns:
-        None
+        tuple: (DataFrame com o resumo de cada combinação, dict
+        {(min_support, min_confidence): regras}, ReticuladoItemsets minerado)
     """
-    if rules is None or len(rules) == 0:
-        print("Não há regras de associação para gerar relatório.")
-        return
+    matriz_transacoes, produtos = codificar_transacoes(df)
+    reticulado = ReticuladoItemsets(matriz_transacoes, produtos, algoritmo)
     
-    relatorio = []
-    relatorio.append("# Relatório de Regras de Associação - MegaSuper Vendas\n")
+    # Mineração e geração de regras únicas, nos menores limiares
+    reticulado.regras(min(suportes), min(confiancas))
     
-    # Estatísticas gerais
-    relatorio.append("## 1. Estatísticas Gerais")
-    relatorio.append(f"- Total de regras encontradas: {len(rules)}")
-    relatorio.append(f"- Lift médio: {rules['lift'].mean():.4f}")
-    relatorio.append(f"- Confiança média: {rules['confidence'].mean():.4f}\n")
+    resumo = []
+    regras_por_limiar = {}
+    for min_support in suportes:
+        n_conjuntos = len(reticulado.conjuntos_frequentes(min_support))
+        for min_confidence in confiancas:
+            regras = reticulado.regras(min_support, min_confidence)
+            regras_por_limiar[(min_support, min_confidence)] = regras
+            resumo.append({
+                'min_support': min_support,
+                'min_confidence': min_confidence,
+                'conjuntos_frequentes': n_conjuntos,
+                'regras': 0 if regras is None else len(regras),
+            })
+    return pd.DataFrame(resumo), regras_por_limiar, reticulado
+
+# Mineração particionada (`minerar_por_particao`): chaves aceitas ('mes' é o
+# mês AAAA-MM da coluna 'data') e número mínimo de transações de uma partição
+CHAVES_PARTICAO = ('estado', 'cidade', 'mes', 'pagamento')
+MIN_TRANSACOES_PARTICAO = 50
+
+def coluna_da_chave(chave):
+    """Coluna dos dados limpos de onde vem a chave de partição."""
+    return 'data' if chave == 'mes' else chave
+
+def codificar_particoes(df, chave):
+    """
+    Codifica de uma só vez as transações de todas as partições.
     
-    # Top regras por lift
-    relatorio.append("## 2. Top 10 Regras por Lift")
-    for i, row in rules.sort_values("lift", ascending=False).head(10).iterrows():
-        antecedentes = ', '.join(list(row['antecedents']))
-        consequentes = ', '.join(list(row['consequents']))
+    Cada item vendido é reduzido a códigos (partição, compra, produto); os
+    trios são ordenados e deduplicados uma única vez, e cada partição vira uma
+    faixa contígua, já no formato CSR (códigos dos produtos e início de cada
+    transação). Os produtos são codificados em ordem alfabética, em comum a
+    todas as partições. Uma compra cujos itens caem em partições diferentes
+    (ex.: datas diferentes) contribui com uma transação para cada partição.
+    
+    Args:
+        df (pandas.DataFrame): Dados limpos com 'id_da_compra', 'produto' e a
+            coluna da chave (ver `coluna_da_chave`).
+        chave (str): Chave de partição, uma de CHAVES_PARTICAO.
+        
+    Returns:
+        tuple: (lista de tuplas (valor da partição, códigos dos produtos,
+        início das transações), lista com o produto de cada código)
+    """
+    if chave not in CHAVES_PARTICAO:
+        raise ValueError(f"Chave de partição desconhecida: {chave!r}. Use uma de {CHAVES_PARTICAO}.")
+    valores = df[coluna_da_chave(chave)]
+    if chave == 'mes':
+        valores = valores.astype('string').str[:7]
+    validos = (df['id_da_compra'].notna() & df['produto'].notna() & valores.notna()).to_numpy()
+    
+    particoes = valores[validos].astype('category').cat.remove_unused_categories()
+    ids = df.loc[validos, 'id_da_compra'].astype('category').cat.codes.to_numpy(dtype=np.int64)
+    produtos = df.loc[validos, 'produto'].astype('category').cat.remove_unused_categories()
+    if not produtos.cat.categories.is_monotonic_increasing:
+        produtos = produtos.cat.reorder_categories(produtos.cat.categories.sort_values())
+    codigos_particao = particoes.cat.codes.to_numpy(dtype=np.int64)
+    codigos_produto = produtos.cat.codes.to_numpy(dtype=np.int64)
+    
+    # Ordena por (partição, compra, produto) e remove produtos repetidos na mesma compra
+    ordem = np.lexsort((codigos_produto, ids, codigos_particao))
+    codigos_particao, ids, codigos_produto = codigos_particao[ordem], ids[ordem], codigos_produto[ordem]
+    novos = np.ones(len(ordem), dtype=bool)
+    novos[1:] = (codigos_particao[1:] != codigos_particao[:-1]) | (ids[1:] != ids[:-1]) | (codigos_produto[1:] != codigos_produto[:-1])
+    codigos_particao, ids, codigos_produto = codigos_particao[novos], ids[novos], codigos_produto[novos]
+    
+    # Numeração contínua das transações; cada partição recomeça do zero abaixo
+    nova_transacao = np.ones(len(ids), dtype=bool)
+    nova_transacao[1:] = (codigos_particao[1:] != codigos_particao[:-1]) | (ids[1:] != ids[:-1])
+    transacoes = np.cumsum(nova_transacao) - 1
+    
+    limites = np.searchsorted(codigos_particao, np.arange(len(particoes.cat.categories) + 1))
+    resultado = []
+    for valor, inicio, fim in zip(particoes.cat.categories, limites[:-1], limites[1:]):
+        transacoes_particao = transacoes[inicio:fim] - transacoes[inicio]
+        inicio_linhas = np.zeros(transacoes_particao[-1] + 2, dtype=np.int64)
+        np.cumsum(np.bincount(transacoes_particao), out=inicio_linhas[1:])
+        resultado.append((valor, codigos_produto[inicio:fim].astype(np.int32), inicio_linhas))
+    return resultado, produtos.cat.categories.tolist()
+
+# Produtos das partições, enviados uma vez a cada processo por `_iniciar_processo_mineracao`
+_produtos_mineracao = None
+
+def _iniciar_processo_mineracao(produtos):
+    global _produtos_mineracao
+    _produtos_mineracao = produtos
+
+def _minerar_particao(tarefa, produtos=None):
+    """
+    Minera as regras de uma partição de `codificar_particoes`.
+    
+    Args:
+        tarefa (tuple): (códigos dos produtos, início das transações, min_support,
+            min_confidence, algoritmo, poda).
+        produtos (list): Produto de cada código (nos processos auxiliares, o
+            enviado a `_iniciar_processo_mineracao`).
+        
+    Returns:
+        pandas.DataFrame: Regras podadas da partição, ou None se não houver.
+    """
+    from scipy.sparse import csr_matrix
+    indices, inicio_linhas, min_support, min_confidence, algoritmo, poda = tarefa
+    produtos = _produtos_mineracao if produtos is None else produtos
+    matriz = csr_matrix(
+        (np.ones(len(indices), dtype=bool), indices, inicio_linhas),
+        shape=(len(inicio_linhas) - 1, len(produtos)),
+    )
+    rules = ReticuladoItemsets(matriz, produtos, algoritmo).regras(min_support, min_confidence)
+    if rules is None or len(rules) == 0:
+        return None
+    rules = podar_regras(rules, **(poda or {}))
+    # Mesma precisão do lift global de `analisar_regras_associacao`, para que
+    # 'variacao_lift' em `comparar_com_globais` seja zero quando nada muda
+    rules["lift"] = rules["lift"].round(4)
+    return rules
+
+def minerar_por_particao(df, chave, min_support=0.01, min_confidence=0.3, algoritmo='eclat', poda=None,
+                         processos=NUMERO_PROCESSOS, min_transacoes=MIN_TRANSACOES_PARTICAO):
+    """
+    Minera as regras de associação separadamente em cada partição dos dados.
+    
+    As transações são codificadas uma única vez (`codificar_particoes`) e cada
+    partição é enviada aos processos como dois arrays de inteiros; a lista de
+    produtos segue uma vez por processo. As partições são mineradas e podadas
+    (`podar_regras`) em paralelo, e as regras voltam em uma única tabela.
+    
+    Args:
+        df (pandas.DataFrame): Dados limpos com 'id_da_compra', 'produto' e a
+            coluna da chave.
+        chave (str): Chave de partição, uma de CHAVES_PARTICAO.
+        min_support (float): Suporte mínimo, relativo às transações de cada partição.
+        min_confidence (float): Confiança mínima.
+        algoritmo (str): Minerador de conjuntos frequentes, 'eclat' ou 'apriori'.
+        poda (dict): Argumentos de `podar_regras`.
+        processos (int): Número de processos; com 1, as partições são mineradas
+            no processo principal.
+        min_transacoes (int): Partições com menos transações são ignoradas.
+        
+    Returns:
+        pandas.DataFrame: Regras de todas as partições, com a coluna 'particao'
+        (valor da chave) e a coluna 'transacoes' (transações da partição),
+        ordenadas por partição e lift.
+    """
+    particoes, produtos = codificar_particoes(df, chave)
+    particoes = [particao for particao in particoes if len(particao[2]) - 1 >= min_transacoes]
+    tarefas = [
+        (indices, inicio_linhas, min_support, min_confidence, algoritmo, poda)
+        for _, indices, inicio_linhas in particoes
+    ]
+    print(f"Minerando {len(tarefas)} partições por '{chave}' ({processos} processo(s))...")
+    
+    if processos > 1 and len(tarefas) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo_mineracao,
+                                 initargs=(produtos,)) as executor:
+            resultados = list(executor.map(_minerar_particao, tarefas))
+    else:
+        resultados = [_minerar_particao(tarefa, produtos) for tarefa in tarefas]
+    
+    tabelas = []
+    for (valor, _, inicio_linhas), rules in zip(particoes, resultados):
+        if rules is not None and len(rules) > 0:
+            rules = rules.sort_values('lift', ascending=False)
+            rules.insert(0, 'transacoes', len(inicio_linhas) - 1)
+            rules.insert(0, 'particao', valor)
+            tabelas.append(rules)
+    if not tabelas:
+        return None
+    return pd.concat(tabelas, ignore_index=True)
+
+def comparar_com_globais(regras_particoes, rules):
+    """
+    Compara as regras de cada partição com as regras globais.
+    
+    Args:
+        regras_particoes (pandas.DataFrame): Regras de `minerar_por_particao`.
+        rules (pandas.DataFrame): Regras globais de `analisar_regras_associacao`.
+        
+    Returns:
+        tuple: (regras das partições com as colunas 'support_global',
+        'confidence_global', 'lift_global', 'variacao_lift' e
+        'apenas_na_particao', e DataFrame com o resumo de cada partição)
+    """
+    colunas = ['antecedents', 'consequents', 'support', 'confidence', 'lift']
+    if rules is None:
+        globais = pd.DataFrame(columns=colunas)
+    else:
+        globais = rules[colunas]
+    globais = globais.rename(columns={coluna: f"{coluna}_global" for coluna in colunas[2:]})
+    comparadas = regras_particoes.merge(globais, on=['antecedents', 'consequents'], how='left')
+    comparadas['variacao_lift'] = comparadas['lift'] - comparadas['lift_global']
+    comparadas['apenas_na_particao'] = comparadas['lift_global'].isna()
+    
+    resumo = comparadas.groupby('particao', sort=True).agg(
+        transacoes=('transacoes', 'first'),
+        regras=('lift', 'size'),
+        apenas_na_particao=('apenas_na_particao', 'sum'),
+        lift_medio=('lift', 'mean'),
+        variacao_lift_media=('variacao_lift', 'mean'),
+    )
+    resumo['globais_ausentes'] = len(globais) - (resumo['regras'] - resumo['apenas_na_particao'])
+    return comparadas, resumo.reset_index()
+
+def gerar_relatorio_associacao(rules, file_path="relatorios/relatorio_associacao.md"):
+    """
+    Gera um relatório detalhado sobre as regras de associação encontradas.
+    
+    Args:
+        rules (pandas.DataFrame): DataFrame contendo as regras de associação.
+        file_path (str): Caminho onde o relatório será salvo.
+        
+    Returns:
+        None
+    """
+    if rules is None or len(rules) == 0:
+        print("Não há regras de associação para gerar relatório.")
+        return
+    
+    relatorio = []
+    relatorio.append("# Relatório de Regras de Associação - MegaSuper Vendas\n")
+    
+    # Estatísticas gerais
+    relatorio.append("## 1. Estatísticas Gerais")
+    relatorio.append(f"- Total de regras encontradas: {len(rules)}")
+    relatorio.append(f"- Lift médio: {rules['lift'].mean():.4f}")
+    relatorio.append(f"- Confiança média: {rules['confidence'].mean():.4f}\n")
+    
+    # Top regras por lift
+    relatorio.append("## 2. Top 10 Regras por Lift")
+    for i, row in rules.sort_values("lift", ascending=False).head(10).iterrows():
+        antecedentes = ', '.join(list(row['antecedents']))
+        consequentes = ', '.join(list(row['consequents']))
         relatorio.append(f"### Regra {i+1}: {antecedentes} → {consequentes}")
         relatorio.append(f"- Suporte: {row['support']:.4f}")
         relatorio.append(f"- Confiança: {row['confidence']:.4f}")
@@ -941,133 +3342,1916 @@ def gerar_relatorio_associacao(rules, file_path="relatorios/relatorio_associacao
     relatorio.append("- **Pacotes de produtos**: Criar pacotes combinando itens com forte associação.")
     
     # Salvar o relatório
+    _criar_pasta_de(file_path)
     with open(file_path, "w", encoding="utf-8") as f:
         f.write("\n".join(relatorio))
     
     print(f"Relatório de associação gerado com sucesso! Arquivo salvo como: {file_path}")
 
-# 1. Carregamento dos Dados
-print("\n=== 1. Carregamento e Inspeção Inicial dos Dados ===")
-# Carrega o arquivo CSV para um DataFrame do Pandas e exibe informações sobre
-# tipos de dados, contagem de valores não nulos, e uso de memória
-df = carregar_dados("dadosSujos/vendas_modificado (2).csv")
-print("\nInformações do DataFrame:")
-print(df.info())
-
-# 2. Funções de Limpeza e Validação
-print("\n=== 2. Funções de Limpeza e Validação ===")
-# Nesta etapa, todas as funções de limpeza e validação foram definidas anteriormente
-# incluindo padronização de produtos, validação de valores monetários, etc.
-
-# 3. Aplicação das Funções de Limpeza
-print("\n=== 3. Aplicação das Funções de Limpeza ===")
-# Aplicação de funções de limpeza e padronização nos campos de texto
-# e validação de campos numéricos para garantir consistência dos dados
-df['cliente'] = df['cliente'].apply(limpar_texto)  # Remove espaços extra e converte para minúsculas
-df['produto'] = df['produto'].apply(padronizar_produto)  # Padroniza nomes de produtos
-df['data'] = df['data'].apply(padronizar_data)  # Converte para formato YYYY-MM-DD
-df['hora'] = df['hora'].apply(padronizar_hora)  # Converte para formato HH:MM:SS
-df = validar_valores_numericos(df)  # Trata todos os campos numéricos
-df['valor'] = df['valor'].apply(validar_valor)  # Valida valores monetários entre 0 e 10.000
-df['quantidade'] = df['quantidade'].apply(validar_quantidade)  # Valida quantidades entre 1 e 100
-df['frete'] = df['frete'].apply(validar_frete)  # Valida fretes entre 0 e 1.000
-
-# 3.1. Tratamento de CEPs
-print("\n=== 3.1. Tratamento de CEPs ===")
-# Preenche CEPs ausentes usando uma hierarquia de estratégias:
-# 1. CEP mais comum da cidade
-# 2. CEP mais comum do estado
-# 3. CEP mais comum geral
-# 4. CEP sintético baseado no estado
-# Em seguida, formata todos os CEPs para o padrão XXXXX-XXX
-df = tratar_ceps_ausentes(df)
-df['cep'] = df['cep'].apply(validar_cep)
-
-# 4. Tratamento de Duplicatas
-print("\n=== 4. Tratamento de Duplicatas ===")
-# Identifica e remove registros duplicados com base em colunas-chave:
-# id_da_compra, data, hora, cliente e produto
-# Mantém o primeiro registro quando encontra duplicatas
-df = tratar_duplicatas(df)
-
-# 5. Tratamento de Valores Ausentes
-print("\n=== 5. Tratamento de Valores Ausentes ===")
-# Trata valores ausentes usando estratégias específicas para cada coluna:
-# - valor: preenche com a média
-# - quantidade: preenche com 1
-# - frete: preenche com 0
-# - vendedor/marca: preenche com "Não Especificado"
-# - total: recalcula baseado em valor * quantidade + frete
-df = tratar_valores_ausentes(df)
-
-# 6. Verificação de Cálculos
-print("\n=== 6. Verificação de Cálculos ===")
-# Verifica se a coluna 'total' está correta de acordo com a fórmula:
-# total = valor * quantidade + frete
-# Corrige valores que diferem do cálculo em mais de 0.01
-df = verificar_calculos(df)
-
-# 7. Análise de Padrões de Compra
-print("\n=== 7. Análise de Padrões de Compra ===")
-# Analisa os produtos mais vendidos após a padronização
-# para identificar padrões de compra nos dados limpos
-print("\nTop 10 produtos mais vendidos:")
-print(df['produto'].value_counts().head(10))
-
-# 7.1. Validação da Padronização de Produtos
-print("\n=== 7.1. Validação da Padronização de Produtos ===")
-# Verifica a eficácia do processo de padronização de produtos
-# Identifica possíveis produtos similares que poderiam ser padronizados
-# e produtos com poucas ocorrências que podem representar anomalias
-df = validar_padronizacao_produtos(df)
-
-# 7.2. Verificação final de CEPs nulos
-print("\n=== 7.2 Verificação final de CEPs nulos ===")
-# Verifica se ainda há CEPs nulos após todos os tratamentos
-# e aplica uma estratégia final (preenchimento com '00000-000')
-# para garantir completude dos dados
-ceps_nulos = df['cep'].isnull().sum()
-if ceps_nulos > 0:
-    print(f"Ainda existem {ceps_nulos} CEPs nulos. Aplicando tratamento final...")
-    # Aplicar uma estratégia mais agressiva para garantir que não haja nulos
-    df['cep'] = df['cep'].fillna('00000-000')
-
-# 8. Geração do Relatório
-print("\n=== 8. Geração do Relatório de Limpeza ===")
-# Gera um relatório detalhado em formato markdown com estatísticas sobre:
-# - Total de registros
-# - Registros duplicados removidos
-# - Valores ausentes por coluna
-# - Tipos de dados por coluna
-# - Problemas corrigidos
-# - Top 5 produtos mais vendidos
-relatorio = gerar_relatorio(df, df)
-with open("relatorios/relatorio_limpeza.md", "w", encoding="utf-8") as f:
-    f.write(relatorio)
-print("\nRelatório de limpeza gerado com sucesso!")
-print("Arquivo salvo como: relatorios/relatorio_limpeza.md")
-
-# 9. Salvando Dados Limpos
-print("\n=== 9. Salvando Dados Limpos ===")
-# Salva o DataFrame limpo e processado em um arquivo CSV
-# para uso posterior em análises ou sistemas
-df.to_csv("dadosLimpos/dados_limpos.csv", index=False)
-print("Dados limpos salvos com sucesso!")
-print("Arquivo salvo como: dadosLimpos/dados_limpos.csv")
-
-# 10. Análise de Regras de Associação
-print("\n=== 10. Análise de Regras de Associação ===")
-# Aplica o algoritmo Apriori para encontrar padrões de compra
-# e identifica regras de associação entre produtos
-_, rules = analisar_regras_associacao(df, min_support=0.01, min_confidence=0.3)
-# Salvar as regras em um arquivo CSV
-rules.to_csv("dadosLimpos/regras_associacao.csv", index=False)
-print("Regras de associação salvas em: dadosLimpos/regras_associacao.csv")
-
-# 11. Geração de Relatório de Associação
-print("\n=== 11. Geração de Relatório de Associação ===")
-# Cria um relatório detalhado com as regras de associação encontradas
-# incluindo métricas de avaliação e recomendações de marketing
-gerar_relatorio_associacao(rules, "relatorios/relatorio_associacao.md")
-
-print("\nProcesso de análise de dados concluído com sucesso!")
\ No newline at end of file
+RECOMENDACOES_POR_CESTA = 5
+
+class IndiceRecomendacao:
+    """
+    Índice de recomendação de produtos construído a partir das regras de associação.
+    
+    Cada antecedente das regras (um produto ou conjunto de produtos) aponta
+    para os produtos consequentes, já ordenados por lift e confiança. Para uma
+    cesta, o índice é consultado com os subconjuntos da cesta formados por
+    produtos que aparecem em algum antecedente, em vez de percorrer o DataFrame
+    de regras. Cada produto recomendado recebe a melhor regra que o indica
+    (maior lift, depois maior confiança); produtos já na cesta não são
+    recomendados.
+    
+    O índice pode ser gravado em um arquivo .npz compacto (`salvar`) e lido
+    de volta com `IndiceRecomendacao.carregar`.
+    """
+    
+    def __init__(self, rules=None):
+        """
+        Args:
+            rules (pandas.DataFrame): Regras de `analisar_regras_associacao`, com
+                antecedentes e consequentes como conjuntos ou listas de produtos
+                (ver `carregar_saida`). Se None, o índice fica vazio.
+        """
+        melhores = {}
+        if rules is not None:
+            colunas = ['antecedents', 'consequents', 'lift', 'confidence']
+            for antecedentes, consequentes, lift, confianca in rules[colunas].itertuples(index=False):
+                por_produto = melhores.setdefault(tuple(sorted(antecedentes)), {})
+                for produto in consequentes:
+                    if (lift, confianca) > por_produto.get(produto, (-np.inf, -np.inf)):
+                        por_produto[produto] = (lift, confianca)
+        self._montar({
+            chave: [(produto, lift, confianca) for produto, (lift, confianca) in por_produto.items()]
+            for chave, por_produto in melhores.items()
+        })
+    
+    def _montar(self, indice):
+        """Ordena as recomendações de cada antecedente e prepara as consultas."""
+        self._indice = {
+            chave: sorted(recomendacoes, key=lambda item: (-item[1], -item[2], item[0]))
+            for chave, recomendacoes in indice.items()
+        }
+        self._produtos_antecedentes = {produto for chave in self._indice for produto in chave}
+        self._tamanho_maximo = max((len(chave) for chave in self._indice), default=0)
+        self._arrays = None
+    
+    def __len__(self):
+        return len(self._indice)
+    
+    def recomendar(self, cesta, k=RECOMENDACOES_POR_CESTA):
+        """
+        Recomenda até `k` produtos para uma cesta.
+        
+        Args:
+            cesta (iterable): Produtos da cesta.
+            k (int): Número máximo de recomendações.
+            
+        Returns:
+            list: Tuplas (produto, lift, confiança), da melhor para a pior.
+        """
+        cesta = set(cesta)
+        # Só produtos presentes em algum antecedente podem formar uma chave do índice
+        itens = sorted(cesta & self._produtos_antecedentes)
+        candidatos = {}
+        for tamanho in range(1, min(len(itens), self._tamanho_maximo) + 1):
+            for chave in combinations(itens, tamanho):
+                for produto, lift, confianca in self._indice.get(chave, ()):
+                    if produto not in cesta and (lift, confianca) > candidatos.get(produto, (-np.inf, -np.inf)):
+                        candidatos[produto] = (lift, confianca)
+        ordenados = sorted(candidatos.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+        return [(produto, lift, confianca) for produto, (lift, confianca) in ordenados[:k]]
+    
+    def _como_arrays(self):
+        """
+        Representação do índice em arrays (usada por `salvar` e `recomendar_lote`).
+        
+        Os produtos são codificados pela ordem alfabética; antecedentes e
+        recomendações ficam em formato CSR (inícios + códigos).
+        """
+        if self._arrays is None:
+            produtos = sorted(
+                self._produtos_antecedentes
+                | {produto for recomendacoes in self._indice.values() for produto, _, _ in recomendacoes}
+            )
+            codigos = {produto: codigo for codigo, produto in enumerate(produtos)}
+            chaves = sorted(self._indice)
+            recomendacoes = [self._indice[chave] for chave in chaves]
+            self._arrays = {
+                'produtos': np.array(produtos, dtype=str),
+                'antecedentes_inicio': np.cumsum([0] + [len(chave) for chave in chaves]),
+                'antecedentes': np.array([codigos[p] for chave in chaves for p in chave], dtype=np.int32),
+                'recomendacoes_inicio': np.cumsum([0] + [len(lista) for lista in recomendacoes]),
+                'recomendacoes': np.array([codigos[p] for lista in recomendacoes for p, _, _ in lista], dtype=np.int32),
+                'lift': np.array([lift for lista in recomendacoes for _, lift, _ in lista], dtype=float),
+                'confianca': np.array([confianca for lista in recomendacoes for _, _, confianca in lista], dtype=float),
+            }
+        return self._arrays
+    
+    def recomendar_lote(self, cestas, k=RECOMENDACOES_POR_CESTA):
+        """
+        Recomenda até `k` produtos para cada cesta de uma lista, de uma só vez.
+        
+        As cestas e os antecedentes viram matrizes esparsas cesta × produto e
+        antecedente × produto; um antecedente está contido em uma cesta quando
+        o produto das duas matrizes iguala o tamanho do antecedente. A escolha
+        da melhor regra por produto e das `k` melhores por cesta é vetorizada.
+        O resultado é o mesmo de chamar `recomendar` para cada cesta.
+        
+        Args:
+            cestas (list): Cestas (cada uma, um iterável de produtos).
+            k (int): Número máximo de recomendações por cesta.
+            
+        Returns:
+            pandas.DataFrame: Colunas 'cesta' (posição em `cestas`), 'produto',
+            'lift' e 'confianca', ordenadas por cesta e da melhor para a pior.
+        """
+        from scipy.sparse import csr_matrix
+        arrays = self._como_arrays()
+        produtos = arrays['produtos']
+        codigos = {produto: codigo for codigo, produto in enumerate(produtos)}
+        
+        # Produtos fora do índice não formam antecedentes nem são recomendados: podem ser ignorados
+        linhas, colunas = [], []
+        for numero, cesta in enumerate(cestas):
+            for codigo in {codigos[produto] for produto in cesta if produto in codigos}:
+                linhas.append(numero)
+                colunas.append(codigo)
+        linhas = np.array(linhas, dtype=np.int64)
+        colunas = np.array(colunas, dtype=np.int64)
+        n_cestas, n_produtos = len(cestas), len(produtos)
+        matriz_cestas = csr_matrix((np.ones(len(linhas), dtype=np.int32), (linhas, colunas)), shape=(n_cestas, n_produtos))
+        inicio_antecedentes = arrays['antecedentes_inicio']
+        matriz_antecedentes = csr_matrix(
+            (np.ones(len(arrays['antecedentes']), dtype=np.int32), arrays['antecedentes'], inicio_antecedentes),
+            shape=(len(inicio_antecedentes) - 1, n_produtos),
+        )
+        
+        # Pares (cesta, antecedente contido na cesta)
+        contidos = (matriz_cestas @ matriz_antecedentes.T).tocoo()
+        completos = contidos.data == np.diff(inicio_antecedentes)[contidos.col]
+        cesta_par, antecedente_par = contidos.row[completos], contidos.col[completos]
+        
+        # Expande cada par para as recomendações do antecedente
+        inicio_recomendacoes = arrays['recomendacoes_inicio']
+        quantidades = np.diff(inicio_recomendacoes)[antecedente_par]
+        cesta = np.repeat(cesta_par, quantidades)
+        posicoes = (
+            np.repeat(inicio_recomendacoes[antecedente_par] - np.cumsum(quantidades) + quantidades, quantidades)
+            + np.arange(quantidades.sum())
+        )
+        produto = arrays['recomendacoes'][posicoes].astype(np.int64)
+        lift, confianca = arrays['lift'][posicoes], arrays['confianca'][posicoes]
+        
+        # Remove os produtos que já estão na cesta
+        fora_da_cesta = ~np.isin(cesta * n_produtos + produto, linhas * n_produtos + colunas)
+        cesta, produto, lift, confianca = (
+            cesta[fora_da_cesta], produto[fora_da_cesta], lift[fora_da_cesta], confianca[fora_da_cesta]
+        )
+        
+        # Melhor regra por (cesta, produto) e, depois, as k melhores de cada cesta
+        ordem = np.lexsort((-confianca, -lift, produto, cesta))
+        cesta, produto, lift, confianca = cesta[ordem], produto[ordem], lift[ordem], confianca[ordem]
+        primeiras = np.ones(len(cesta), dtype=bool)
+        primeiras[1:] = (cesta[1:] != cesta[:-1]) | (produto[1:] != produto[:-1])
+        cesta, produto, lift, confianca = cesta[primeiras], produto[primeiras], lift[primeiras], confianca[primeiras]
+        ordem = np.lexsort((produto, -confianca, -lift, cesta))
+        cesta, produto, lift, confianca = cesta[ordem], produto[ordem], lift[ordem], confianca[ordem]
+        inicio_cesta = np.searchsorted(cesta, cesta)
+        melhores = np.arange(len(cesta)) - inicio_cesta < k
+        
+        return pd.DataFrame({
+            'cesta': cesta[melhores],
+            'produto': produtos[produto[melhores]].astype(object),
+            'lift': lift[melhores],
+            'confianca': confianca[melhores],
+        })
+    
+    def salvar(self, caminho):
+        """
+        Grava o índice em um arquivo .npz compactado.
+        
+        Args:
+            caminho (str): Caminho do arquivo.
+        """
+        _criar_pasta_de(caminho)
+        np.savez_compressed(caminho, **self._como_arrays())
+    
+    @classmethod
+    def carregar(cls, caminho):
+        """
+        Lê um índice gravado por `salvar`.
+        
+        Args:
+            caminho (str): Caminho do arquivo .npz.
+            
+        Returns:
+            IndiceRecomendacao: Índice lido.
+        """
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            arrays = {nome: arquivo[nome] for nome in arquivo.files}
+        produtos = arrays['produtos'].tolist()
+        inicio_antecedentes = arrays['antecedentes_inicio']
+        inicio_recomendacoes = arrays['recomendacoes_inicio']
+        recomendacoes = list(zip(
+            [produtos[codigo] for codigo in arrays['recomendacoes']],
+            arrays['lift'].tolist(),
+            arrays['confianca'].tolist(),
+        ))
+        indice = {}
+        for numero in range(len(inicio_antecedentes) - 1):
+            chave = tuple(produtos[codigo] for codigo in arrays['antecedentes'][inicio_antecedentes[numero]:inicio_antecedentes[numero + 1]])
+            indice[chave] = recomendacoes[inicio_recomendacoes[numero]:inicio_recomendacoes[numero + 1]]
+        
+        instancia = cls()
+        instancia._montar(indice)
+        instancia._arrays = arrays
+        return instancia
+
+# Cubo de agregação (`CuboVendas`): dimensões, medidas somadas e níveis
+# pré-calculados. 'dia' vem de 'data' e 'hora' é a hora cheia ("14") de 'hora';
+# 'mes' (AAAA-MM) é derivado de 'dia' nas consultas. O primeiro nível, com
+# todas as dimensões, responde a qualquer consulta.
+DIMENSOES_CUBO = ('dia', 'hora', 'produto', 'estado', 'cidade', 'vendedor', 'marca', 'pagamento')
+DIMENSOES_DERIVADAS_CUBO = {'mes': 'dia'}
+MEDIDAS_CUBO = ('total', 'quantidade', 'frete')
+COLUNAS_CUBO = ['data', 'hora', 'produto', 'estado', 'cidade', 'vendedor', 'marca', 'pagamento', 'total', 'quantidade', 'frete']
+NIVEIS_CUBO = (
+    DIMENSOES_CUBO,
+    ('dia', 'produto', 'estado', 'cidade'),
+    ('dia', 'vendedor', 'marca'),
+    ('dia', 'hora'),
+    ('dia', 'pagamento'),
+    ('dia', 'produto'),
+    ('produto', 'estado', 'cidade'),
+    ('produto', 'vendedor', 'marca', 'pagamento'),
+    ('dia',),
+    ('produto',),
+    ('estado', 'cidade'),
+    ('vendedor', 'marca'),
+    ('pagamento',),
+    (),
+)
+
+class CuboVendas:
+    """
+    Cubo de agregação das vendas limpas, com níveis de agregação pré-calculados.
+    
+    Cada nível guarda, para cada combinação das suas dimensões, as somas de
+    `MEDIDAS_CUBO` e o número de registros. O nível com todas as dimensões é
+    agregado dos dados; os demais, do nível já calculado com menos linhas que
+    contenha as suas dimensões. As dimensões ficam categóricas, e os valores
+    ausentes formam um grupo próprio, como em `groupby(dropna=False)`.
+    
+    `consultar` responde a um agrupamento com filtros usando o menor nível que
+    contenha as dimensões pedidas, sem reler os registros.
+    """
+    
+    def __init__(self, df=None, niveis=NIVEIS_CUBO):
+        """
+        Args:
+            df (pandas.DataFrame): Dados limpos (colunas de COLUNAS_CUBO). Se
+                None, o cubo fica vazio (ver `carregar`).
+            niveis (tuple): Dimensões de cada nível; o nível com todas as
+                dimensões é sempre incluído.
+        """
+        self.niveis = {}
+        if df is None:
+            return
+        
+        base = pd.DataFrame({
+            'dia': df['data'].astype('category'),
+            'hora': df['hora'].astype('string').str[:2].astype('category'),
+            **{dimensao: df[dimensao].astype('category') for dimensao in DIMENSOES_CUBO[2:]},
+            **{
+                medida: df[medida].astype('int64' if pd.api.types.is_integer_dtype(df[medida]) else 'float64')
+                for medida in MEDIDAS_CUBO
+            },
+            'registros': np.ones(len(df), dtype=np.int64),
+        })
+        
+        # Do nível com mais dimensões para o com menos: cada um é agregado do menor nível já pronto que o contém
+        pendentes = sorted({tuple(nivel) for nivel in niveis} | {DIMENSOES_CUBO}, key=len, reverse=True)
+        for dimensoes in pendentes:
+            origem = min(
+                (tabela for nivel, tabela in self.niveis.items() if set(dimensoes) <= set(nivel)),
+                key=len, default=base,
+            )
+            self.niveis[dimensoes] = self._agregar(origem, list(dimensoes))
+    
+    @staticmethod
+    def _agregar(tabela, dimensoes, medidas=MEDIDAS_CUBO + ('registros',)):
+        medidas = list(medidas)
+        if not dimensoes:
+            return tabela[medidas].sum().to_frame().T.astype(tabela[medidas].dtypes)
+        return tabela.groupby(dimensoes, observed=True, dropna=False, sort=True)[medidas].sum().reset_index()
+    
+    @staticmethod
+    def _dimensao(tabela, dimensao):
+        """Coluna de uma dimensão do nível, derivando 'mes' dos códigos de 'dia'."""
+        if dimensao not in DIMENSOES_DERIVADAS_CUBO:
+            return tabela[dimensao]
+        dias = tabela[DIMENSOES_DERIVADAS_CUBO[dimensao]]
+        meses, codigos_mes = np.unique(dias.cat.categories.astype(str).str[:7], return_inverse=True)
+        codigos = dias.cat.codes.to_numpy()
+        return pd.Series(
+            pd.Categorical.from_codes(np.where(codigos >= 0, codigos_mes[codigos], -1), meses),
+            index=tabela.index,
+        )
+    
+    def nivel_para(self, dimensoes):
+        """
+        Escolhe o menor nível que responde a uma consulta sobre `dimensoes`.
+        
+        Args:
+            dimensoes (iterable): Dimensões agrupadas ou filtradas.
+            
+        Returns:
+            tuple: Dimensões do nível escolhido.
+        """
+        necessarias = {DIMENSOES_DERIVADAS_CUBO.get(dimensao, dimensao) for dimensao in dimensoes}
+        desconhecidas = necessarias - set(DIMENSOES_CUBO)
+        if desconhecidas:
+            validas = DIMENSOES_CUBO + tuple(DIMENSOES_DERIVADAS_CUBO)
+            raise ValueError(f"Dimensões desconhecidas: {sorted(desconhecidas)}. Use {validas}.")
+        candidatos = [nivel for nivel in self.niveis if necessarias <= set(nivel)]
+        if not candidatos:
+            raise ValueError("O cubo está vazio.")
+        return min(candidatos, key=lambda nivel: len(self.niveis[nivel]))
+    
+    def consultar(self, por=(), filtros=None, medidas=MEDIDAS_CUBO + ('registros',)):
+        """
+        Soma as medidas agrupando por `por`, apenas nas linhas que passam em `filtros`.
+        
+        Exemplo:
+            cubo.consultar(['mes', 'estado'], filtros={'produto': ['arroz', 'feijão']})
+        
+        Args:
+            por (list): Dimensões do agrupamento (de DIMENSOES_CUBO ou 'mes').
+            filtros (dict): {dimensão: valor ou lista de valores aceitos}.
+            medidas (tuple): Medidas somadas (de MEDIDAS_CUBO e 'registros').
+            
+        Returns:
+            pandas.DataFrame: Uma linha por combinação de `por`, ordenadas, com
+            as medidas somadas (uma única linha se `por` for vazio).
+        """
+        por = list(por)
+        filtros = filtros or {}
+        tabela = self.niveis[self.nivel_para(por + list(filtros))]
+        
+        for dimensao, valores in filtros.items():
+            if isinstance(valores, str) or not np.iterable(valores):
+                valores = [valores]
+            tabela = tabela[self._dimensao(tabela, dimensao).isin(valores).to_numpy()]
+        derivadas = {dimensao: self._dimensao(tabela, dimensao) for dimensao in por if dimensao in DIMENSOES_DERIVADAS_CUBO}
+        if derivadas:
+            tabela = tabela.assign(**derivadas)
+        return self._agregar(tabela, por, medidas)
+    
+    def salvar(self, pasta):
+        """
+        Grava cada nível em um arquivo Parquet e a lista de níveis em `niveis.json`.
+        
+        Args:
+            pasta (str): Pasta do cubo.
+        """
+        os.makedirs(pasta, exist_ok=True)
+        indice = []
+        for dimensoes, tabela in self.niveis.items():
+            arquivo = ('-'.join(dimensoes) or 'total') + ".parquet"
+            tabela.to_parquet(os.path.join(pasta, arquivo), index=False)
+            indice.append({'dimensoes': list(dimensoes), 'arquivo': arquivo, 'linhas': len(tabela)})
+        with open(os.path.join(pasta, "niveis.json"), "w", encoding="utf-8") as f:
+            json.dump(indice, f, ensure_ascii=False, indent=2)
+    
+    @classmethod
+    def carregar(cls, pasta):
+        """
+        Lê um cubo gravado por `salvar`.
+        
+        Args:
+            pasta (str): Pasta do cubo.
+            
+        Returns:
+            CuboVendas: Cubo lido.
+        """
+        with open(os.path.join(pasta, "niveis.json"), encoding="utf-8") as f:
+            indice = json.load(f)
+        cubo = cls()
+        for nivel in indice:
+            cubo.niveis[tuple(nivel['dimensoes'])] = carregar_saida(os.path.join(pasta, nivel['arquivo']))
+        return cubo
+
+def contar_ceps(df):
+    """
+    Conta as ocorrências de cada CEP por cidade, por estado e no geral.
+    
+    As linhas são agrupadas uma única vez por (cidade, estado, cep); as
+    contagens por cidade, por estado e geral são somas desse resultado, que
+    tem apenas uma linha por combinação distinta.
+    
+    As contagens de blocos diferentes podem ser somadas com `somar_contagens_cep`
+    e convertidas nas modas usadas por `tratar_ceps_ausentes` com
+    `modas_cep_de_contagens`.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame (ou bloco) com as colunas cidade, estado e cep.
+        
+    Returns:
+        dict: Contagens com as chaves 'cidade', 'estado' e 'geral'.
+    """
+    colunas = df.loc[df['cep'].notna(), ['cidade', 'estado', 'cep']]
+    combinacoes = colunas.groupby(['cidade', 'estado', 'cep'], dropna=False, observed=True).size()
+    return {
+        'cidade': combinacoes.groupby(level=['cidade', 'cep']).sum(),
+        'estado': combinacoes.groupby(level=['estado', 'cep']).sum(),
+        'geral': combinacoes.groupby(level='cep').sum(),
+    }
+
+def somar_contagens_cep(acumulado, contagens):
+    """
+    Soma as contagens de CEP de um novo bloco às contagens acumuladas.
+    
+    Args:
+        acumulado (dict): Contagens acumuladas (ou None no primeiro bloco).
+        contagens (dict): Contagens do novo bloco, geradas por `contar_ceps`.
+        
+    Returns:
+        dict: Contagens acumuladas atualizadas.
+    """
+    if acumulado is None:
+        return contagens
+    return {
+        chave: acumulado[chave].add(contagens[chave], fill_value=0)
+        for chave in acumulado
+    }
+
+def _moda_de_contagens(contagens):
+    """Retorna o valor mais frequente, desempatando pelo menor, como `Series.mode()[0]`."""
+    contagens = contagens[contagens > 0]
+    if contagens.empty:
+        return None
+    maximo = contagens.max()
+    return min(contagens.index[contagens == maximo])
+
+def _modas_por_grupo(contagens):
+    """Retorna a moda de cada grupo (primeiro nível do índice), com o mesmo desempate de `_moda_de_contagens`."""
+    contagens = contagens[contagens > 0]
+    grupo, cep = contagens.index.names
+    ordenadas = contagens.rename('contagem').reset_index().sort_values(
+        ['contagem', cep], ascending=[False, True], kind='mergesort'
+    )
+    modas = ordenadas.drop_duplicates(grupo)
+    return pd.Series(modas[cep].to_numpy(), index=pd.Index(modas[grupo], name=grupo), name=cep)
+
+def modas_cep_de_contagens(contagens):
+    """
+    Calcula as modas de CEP por cidade, por estado e geral a partir das contagens.
+    
+    Args:
+        contagens (dict): Contagens geradas por `contar_ceps`/`somar_contagens_cep`.
+        
+    Returns:
+        tuple: (CEP por cidade, CEP por estado, CEP geral), no formato aceito
+        pelo parâmetro `modas` de `tratar_ceps_ausentes`.
+    """
+    return (
+        _modas_por_grupo(contagens['cidade']),
+        _modas_por_grupo(contagens['estado']),
+        _moda_de_contagens(contagens['geral']),
+    )
+
+def _impressoes_chave(df, colunas):
+    """Calcula um hash de 64 bits das colunas-chave de cada linha."""
+    # Garante o mesmo hash para 1 e 1.0 quando o tipo muda entre blocos
+    chaves = df[colunas].astype({
+        coluna: 'float64' for coluna in colunas if pd.api.types.is_numeric_dtype(df[coluna])
+    })
+    return pd.util.hash_pandas_object(chaves, index=False).to_numpy()
+
+def remover_duplicatas_entre_blocos(df, vistos):
+    """
+    Remove duplicatas de um bloco considerando também os blocos anteriores.
+    
+    Usa as mesmas colunas-chave de `tratar_duplicatas` e mantém a primeira
+    ocorrência na ordem do arquivo. As chaves já vistas são guardadas como
+    hashes de 64 bits, ocupando 8 bytes por registro único.
+    
+    Args:
+        df (pandas.DataFrame): Bloco de dados.
+        vistos (numpy.ndarray): Hashes ordenados das chaves dos blocos anteriores.
+        
+    Returns:
+        tuple: (bloco sem duplicatas, hashes vistos atualizados)
+    """
+    colunas_disponiveis = [col for col in COLUNAS_CHAVE_DUPLICATAS if col in df.columns]
+    
+    impressoes = _impressoes_chave(df, colunas_disponiveis)
+    duplicadas = pd.Series(impressoes).duplicated().to_numpy() | np.isin(impressoes, vistos)
+    vistos = np.union1d(vistos, impressoes[~duplicadas])
+    return df[~duplicadas], vistos
+
+class DeduplicadorParticionado:
+    """
+    Encontra registros duplicados sem manter todas as impressões na memória.
+    
+    As impressões de 64 bits (`_impressoes_chave`) de cada bloco são gravadas
+    em disco, com a posição global de cada linha, em 2**bits_particao
+    arquivos escolhidos pelos bits mais altos da impressão: linhas iguais
+    caem sempre no mesmo arquivo. Depois, cada partição é lida sozinha e, em
+    cada grupo de impressões iguais, toda linha além da primeira (na ordem do
+    arquivo de entrada) é uma duplicata. O pico de memória é o de uma
+    partição, 16 bytes por linha.
+    """
+    
+    _TIPO_REGISTRO = np.dtype([('impressao', '<u8'), ('posicao', '<i8')])
+    
+    def __init__(self, pasta, bits_particao=BITS_PARTICAO_DUPLICATAS):
+        """
+        Args:
+            pasta (str): Pasta dos arquivos de partição.
+            bits_particao (int): Bits mais altos da impressão usados na partição.
+        """
+        self.bits_particao = bits_particao
+        self.total = 0
+        self._caminhos = [
+            os.path.join(pasta, f"impressoes_{particao:04x}.bin") for particao in range(2 ** bits_particao)
+        ]
+    
+    def adicionar(self, impressoes):
+        """
+        Grava as impressões do próximo bloco, na ordem do arquivo de entrada.
+        
+        Args:
+            impressoes (numpy.ndarray): Impressões de 64 bits das linhas do bloco.
+        """
+        registros = np.empty(len(impressoes), dtype=self._TIPO_REGISTRO)
+        registros['impressao'] = impressoes
+        registros['posicao'] = np.arange(self.total, self.total + len(impressoes))
+        self.total += len(impressoes)
+        
+        particoes = (registros['impressao'] >> np.uint64(64 - self.bits_particao)).astype(np.int64)
+        ordem = np.argsort(particoes, kind='stable')
+        registros, particoes = registros[ordem], particoes[ordem]
+        limites = np.searchsorted(particoes, np.arange(len(self._caminhos) + 1))
+        for particao, caminho in enumerate(self._caminhos):
+            if limites[particao] < limites[particao + 1]:
+                with open(caminho, 'ab') as arquivo:
+                    registros[limites[particao]:limites[particao + 1]].tofile(arquivo)
+    
+    def posicoes_duplicadas(self):
+        """
+        Processa as partições (removendo seus arquivos) e retorna as duplicatas.
+        
+        Returns:
+            numpy.ndarray: Posições globais ordenadas das linhas que repetem
+            uma linha anterior.
+        """
+        duplicadas = [np.empty(0, dtype=np.int64)]
+        for caminho in self._caminhos:
+            if not os.path.exists(caminho):
+                continue
+            registros = np.fromfile(caminho, dtype=self._TIPO_REGISTRO)
+            os.remove(caminho)
+            # As posições já estão em ordem crescente: a ordenação estável mantém a primeira ocorrência à frente
+            ordem = np.argsort(registros['impressao'], kind='stable')
+            impressoes = registros['impressao'][ordem]
+            repetidas = np.zeros(len(impressoes), dtype=bool)
+            repetidas[1:] = impressoes[1:] == impressoes[:-1]
+            duplicadas.append(registros['posicao'][ordem][repetidas])
+        return np.sort(np.concatenate(duplicadas))
+
+def _mascara_unicas(duplicadas, inicio, tamanho):
+    """Máscara das linhas [inicio, inicio + tamanho) que não estão em `duplicadas` (ordenado)."""
+    esquerda, direita = np.searchsorted(duplicadas, [inicio, inicio + tamanho])
+    mascara = np.ones(tamanho, dtype=bool)
+    mascara[duplicadas[esquerda:direita] - inicio] = False
+    return mascara
+
+def carregar_estado_incremental(caminho_estado, caminho_saida):
+    """
+    Lê o estado do modo incremental de `executar_pipeline_streaming`.
+    
+    O estado guarda os agregados necessários para limpar um novo lote sem
+    reler o histórico: os hashes ordenados das chaves de `tratar_duplicatas`
+    ('vistos'), as contagens de CEP de `contar_ceps` ('contagens_cep'), a soma
+    e a contagem de 'valor' ('soma_valor', 'contagem_valor'), o número de
+    registros gravados ('registros') e de lotes processados ('lotes'), o
+    tamanho do CSV acumulado ao fim do último lote ('tamanho_saida') e as
+    contagens aproximadas de todos os lotes ('esbocos', `EsbocosVendas`).
+    
+    Se um lote foi interrompido depois de acrescentar linhas ao CSV e antes
+    de atualizar o estado, o CSV é truncado de volta a 'tamanho_saida'.
+    
+    Args:
+        caminho_estado (str): Arquivo do estado.
+        caminho_saida (str): CSV com os dados limpos acumulados.
+        
+    Returns:
+        dict: Estado salvo, ou None se ainda não há estado nem dados limpos
+        (primeiro lote).
+        
+    Raises:
+        ValueError: Se só um dos dois arquivos existe, pois o histórico e o
+            estado deixariam de corresponder.
+    """
+    existe_estado = os.path.exists(caminho_estado)
+    existe_saida = os.path.exists(caminho_saida)
+    if not existe_estado and not existe_saida:
+        return None
+    if not existe_estado:
+        raise ValueError(
+            f"{caminho_saida} existe, mas não há estado incremental em {caminho_estado}. "
+            f"Remova {caminho_saida} e processe o histórico completo como primeiro lote."
+        )
+    if not existe_saida:
+        raise ValueError(f"O estado {caminho_estado} existe, mas os dados limpos {caminho_saida} não foram encontrados.")
+    
+    estado = pd.read_pickle(caminho_estado)
+    tamanho = os.path.getsize(caminho_saida)
+    if tamanho < estado['tamanho_saida']:
+        raise ValueError(f"{caminho_saida} é menor que o registrado no estado incremental; o histórico foi alterado.")
+    if tamanho > estado['tamanho_saida']:
+        print(f"Descartando linhas de um lote interrompido em {caminho_saida}")
+        with open(caminho_saida, 'r+b') as arquivo:
+            arquivo.truncate(estado['tamanho_saida'])
+    return estado
+
+def salvar_estado_incremental(caminho_estado, estado):
+    """
+    Grava o estado do modo incremental (ver `carregar_estado_incremental`).
+    
+    O arquivo é substituído de uma vez, para que uma execução interrompida não
+    deixe um estado parcial.
+    
+    Args:
+        caminho_estado (str): Arquivo do estado.
+        estado (dict): Agregados a gravar.
+    """
+    _criar_pasta_de(caminho_estado)
+    temporario = caminho_estado + '.tmp'
+    pd.to_pickle(estado, temporario)
+    os.replace(temporario, caminho_estado)
+
+def executar_pipeline_streaming(caminho_entrada, caminho_saida="dadosLimpos/dados_limpos.csv",
+                                caminho_relatorio="relatorios/relatorio_limpeza.md",
+                                tamanho_chunk=TAMANHO_CHUNK_PADRAO, processos=NUMERO_PROCESSOS,
+                                caminho_estado=None, duplicatas_em_disco=DUPLICATAS_EM_DISCO, formato='csv'):
+    """
+    Executa a limpeza lendo o CSV em blocos, sem carregar o arquivo inteiro na memória.
+    
+    Primeira passada: aplica as etapas por linha (`aplicar_limpeza_por_linha`)
+    em cada bloco, acumula as contagens de CEP, remove duplicatas entre blocos
+    e acumula soma/contagem de 'valor' para a média. Os blocos tratados são
+    gravados em uma pasta temporária.
+    
+    Segunda passada: relê cada bloco, preenche CEPs com as modas globais,
+    preenche valores ausentes com a média global, verifica os totais e
+    acrescenta o bloco ao arquivo de saída.
+    
+    O pico de memória depende do tamanho do bloco e das estatísticas globais
+    (hashes de chaves únicas e contagens de CEP), não do tamanho do arquivo.
+    
+    Modo incremental (`caminho_estado`): as estatísticas globais das execuções
+    anteriores (hashes das chaves, contagens de CEP, soma e contagem de
+    'valor') são lidas do estado salvo. Assim, o novo lote é deduplicado contra
+    todo o histórico, imputado com as modas e a média acumuladas, e apenas as
+    linhas novas são acrescentadas a `caminho_saida`, sem reler o histórico.
+    Ao final, o estado é atualizado. O relatório descreve apenas o lote; as
+    contagens aproximadas do lote (`EsbocosVendas`) são mescladas às do
+    histórico, guardadas no estado, e o relatório traz as duas.
+    
+    Deduplicação em disco (`duplicatas_em_disco`): em vez dos hashes vistos na
+    memória, a primeira passada grava as impressões das chaves em partições
+    (`DeduplicadorParticionado`); as duplicatas são resolvidas partição a
+    partição entre as passadas e removidas de cada bloco na segunda passada.
+    A média de 'valor' é acumulada a partir dos valores de cada bloco, também
+    gravados na pasta temporária.
+    
+    Args:
+        caminho_entrada (str): Caminho do CSV com os dados brutos.
+        caminho_saida (str): Caminho do CSV com os dados limpos.
+        caminho_relatorio (str): Caminho do relatório de limpeza.
+        tamanho_chunk (int): Número de linhas lidas por bloco.
+        processos (int): Número de processos usados nas etapas por linha de cada bloco.
+        caminho_estado (str): Arquivo do estado incremental (ver
+            `carregar_estado_incremental`). Se None, `caminho_saida` é reescrito
+            apenas com o conteúdo de `caminho_entrada`.
+        duplicatas_em_disco (bool): Resolve as duplicatas com partições em disco.
+            Não pode ser combinado com o modo incremental.
+        formato (str): Formato dos dados limpos. Os blocos são sempre
+            acrescentados a `caminho_saida` em CSV; em 'parquet' ou 'feather' o
+            CSV é convertido ao final (`converter_csv_em_blocos`) e removido.
+            O modo incremental exige 'csv', pois os lotes seguintes são
+            acrescentados ao CSV.
+        
+    Returns:
+        dict: Estatísticas da execução (registros lidos, gravados, duplicatas removidas,
+        pares de produtos similares, registros acumulados no modo incremental e
+        caminho dos dados limpos gravados).
+    """
+    if duplicatas_em_disco and caminho_estado:
+        raise ValueError("A deduplicação em disco não pode ser combinada com o modo incremental.")
+    if formato != 'csv' and caminho_estado:
+        raise ValueError("O modo incremental grava os dados limpos apenas em CSV.")
+    normalizador_produtos = NormalizadorProdutos()
+    estado = carregar_estado_incremental(caminho_estado, caminho_saida) if caminho_estado else None
+    if estado is None:
+        contagens_cep = None
+        vistos = np.empty(0, dtype=np.uint64)
+        soma_valor = 0.0
+        contagem_valor = 0
+        esbocos_acumulados = None
+    else:
+        contagens_cep = estado['contagens_cep']
+        vistos = estado['vistos']
+        soma_valor = estado['soma_valor']
+        contagem_valor = estado['contagem_valor']
+        # Estados gravados antes dos esboços começam um histórico aproximado vazio
+        esbocos_acumulados = estado.get('esbocos', EsbocosVendas())
+        print(f"Estado incremental: {estado['registros']} registros já limpos em {estado['lotes']} lote(s)")
+    registros_lidos = 0
+    duplicatas_removidas = 0
+    _criar_pasta_de(caminho_saida)
+    
+    with tempfile.TemporaryDirectory(prefix="limpeza_") as pasta_temporaria:
+        # 1ª passada: etapas por linha e agregados globais
+        print(f"\n=== Streaming: 1ª passada (blocos de {tamanho_chunk} linhas) ===")
+        caminhos_blocos = []
+        deduplicador = DeduplicadorParticionado(pasta_temporaria) if duplicatas_em_disco else None
+        leitor = pd.read_csv(caminho_entrada, chunksize=tamanho_chunk, dtype=TIPOS_TEXTO_STREAMING)
+        for numero, bloco in enumerate(leitor):
+            registros_lidos += len(bloco)
+            bloco = aplicar_limpeza_por_linha(bloco, normalizador_produtos, processos)
+            
+            # As modas de CEP consideram todos os registros, antes da remoção de duplicatas
+            contagens_cep = somar_contagens_cep(contagens_cep, contar_ceps(bloco))
+            
+            caminho_bloco = os.path.join(pasta_temporaria, f"bloco_{numero:06d}.pkl")
+            if deduplicador is not None:
+                # As duplicatas só são conhecidas ao final da passada
+                colunas_disponiveis = [col for col in COLUNAS_CHAVE_DUPLICATAS if col in bloco.columns]
+                deduplicador.adicionar(_impressoes_chave(bloco, colunas_disponiveis))
+                np.save(caminho_bloco[:-len('.pkl')] + "_valor.npy", bloco['valor'].to_numpy(dtype=float))
+            else:
+                tamanho_antes = len(bloco)
+                bloco, vistos = remover_duplicatas_entre_blocos(bloco, vistos)
+                duplicatas_removidas += tamanho_antes - len(bloco)
+                
+                # A média de 'valor' é calculada após a remoção de duplicatas
+                soma_valor += bloco['valor'].sum()
+                contagem_valor += bloco['valor'].count()
+            
+            bloco.to_pickle(caminho_bloco)
+            caminhos_blocos.append(caminho_bloco)
+            print(f"Bloco {numero + 1}: {registros_lidos} registros lidos")
+        
+        if deduplicador is not None:
+            duplicadas = deduplicador.posicoes_duplicadas()
+            duplicatas_removidas = len(duplicadas)
+            inicio = 0
+            for caminho_bloco in caminhos_blocos:
+                caminho_valor = caminho_bloco[:-len('.pkl')] + "_valor.npy"
+                valores = np.load(caminho_valor)
+                os.remove(caminho_valor)
+                unicas = valores[_mascara_unicas(duplicadas, inicio, len(valores))]
+                inicio += len(valores)
+                # A média de 'valor' é calculada após a remoção de duplicatas
+                soma_valor += np.nansum(unicas)
+                contagem_valor += np.count_nonzero(~np.isnan(unicas))
+        
+        modas_cep = modas_cep_de_contagens(contagens_cep) if contagens_cep else None
+        media_valor = soma_valor / contagem_valor if contagem_valor else np.nan
+        print(f"Duplicatas removidas: {duplicatas_removidas}")
+        
+        # 2ª passada: etapas que dependem de estatísticas globais
+        print("\n=== Streaming: 2ª passada (CEPs, valores ausentes e cálculos) ===")
+        registros_gravados = 0
+        ceps_nulos = 0
+        nulos = None
+        tipos = None
+        contagem_produtos = {}
+        esbocos = EsbocosVendas()
+        totais_preenchidos = 0
+        totais_corrigidos = 0
+        inicio = 0
+        for numero, caminho_bloco in enumerate(caminhos_blocos):
+            bloco = pd.read_pickle(caminho_bloco)
+            os.remove(caminho_bloco)
+            if deduplicador is not None:
+                tamanho_bloco = len(bloco)
+                bloco = bloco[_mascara_unicas(duplicadas, inicio, tamanho_bloco)]
+                inicio += tamanho_bloco
+            
+            bloco = tratar_ceps(bloco, modas_cep, semente=[SEMENTE_CEP_SINTETICO, numero])
+            bloco = tratar_valores_ausentes(bloco, media_valor)
+            totais_preenchidos += bloco.attrs['totais_preenchidos']
+            totais_corrigidos += bloco.attrs['totais_corrigidos']
+            
+            # Verificação final de CEPs nulos
+            ceps_nulos += bloco['cep'].isnull().sum()
+            bloco['cep'] = bloco['cep'].fillna('00000-000')
+            
+            # Estatísticas para o relatório
+            nulos_bloco = bloco.isnull().sum()
+            nulos = nulos_bloco if nulos is None else nulos.add(nulos_bloco, fill_value=0)
+            if tipos is None:
+                tipos = bloco.dtypes
+            esbocos.atualizar(bloco)
+            # Contagens exatas apenas para a validação da padronização (poucos produtos distintos)
+            for produto, contagem in bloco['produto'].value_counts(sort=False).items():
+                contagem_produtos[produto] = contagem_produtos.get(produto, 0) + contagem
+            
+            # No modo incremental o lote é acrescentado ao histórico já gravado
+            novo_arquivo = numero == 0 and estado is None
+            bloco.to_csv(caminho_saida, mode='w' if novo_arquivo else 'a', header=novo_arquivo, index=False)
+            registros_gravados += len(bloco)
+    
+    if ceps_nulos > 0:
+        print(f"{ceps_nulos} CEPs nulos preenchidos com '00000-000'.")
+    if formato != 'csv':
+        caminho_csv = caminho_saida
+        caminho_saida = converter_csv_em_blocos(caminho_csv, os.path.splitext(caminho_csv)[0], formato, tamanho_chunk)
+        os.remove(caminho_csv)
+    print(f"Dados limpos salvos em: {caminho_saida} ({registros_gravados} registros)")
+    
+    registros_acumulados = registros_gravados + (estado['registros'] if estado is not None else 0)
+    if caminho_estado:
+        esbocos_acumulados = (esbocos_acumulados or EsbocosVendas()).mesclar(esbocos)
+        salvar_estado_incremental(caminho_estado, {
+            'vistos': vistos,
+            'contagens_cep': contagens_cep,
+            'soma_valor': soma_valor,
+            'contagem_valor': contagem_valor,
+            'registros': registros_acumulados,
+            'lotes': (estado['lotes'] if estado is not None else 0) + 1,
+            'tamanho_saida': os.path.getsize(caminho_saida),
+            'esbocos': esbocos_acumulados,
+        })
+        print(f"Estado incremental salvo em: {caminho_estado} ({registros_acumulados} registros acumulados)")
+    
+    # Análise de padrões de compra e validação da padronização
+    contagem_produtos = pd.Series(contagem_produtos, dtype='int64')
+    print("\nTop 10 produtos mais vendidos:")
+    print(esbocos.top('produto', 10)['contagem'])
+    produtos_similares = relatar_padronizacao_produtos(
+        list(contagem_produtos.index), contagem_produtos.sort_values(ascending=False)
+    )
+    
+    relatorio = montar_relatorio_limpeza(
+        total_registros=registros_gravados,
+        duplicatas_removidas=duplicatas_removidas,
+        nulos=(nulos if nulos is not None else pd.Series(dtype='int64')).astype('int64'),
+        tipos=tipos if tipos is not None else pd.Series(dtype=object),
+        top_produtos=esbocos.top('produto', 5)['contagem'],
+        totais_preenchidos=totais_preenchidos,
+        totais_corrigidos=totais_corrigidos,
+        esbocos=esbocos,
+        esbocos_acumulados=esbocos_acumulados if caminho_estado else None,
+    )
+    _criar_pasta_de(caminho_relatorio)
+    with open(caminho_relatorio, "w", encoding="utf-8") as f:
+        f.write(relatorio)
+    print(f"Relatório de limpeza salvo em: {caminho_relatorio}")
+    
+    return {
+        'registros_lidos': registros_lidos,
+        'registros_gravados': registros_gravados,
+        'duplicatas_removidas': duplicatas_removidas,
+        'produtos_similares': produtos_similares,
+        'registros_acumulados': registros_acumulados,
+        'caminho_saida': caminho_saida,
+    }
+
+# Colunas com conjuntos de produtos (frozenset) nos resultados da associação
+COLUNAS_CONJUNTOS = ('antecedents', 'consequents', 'itemsets')
+
+def _conjuntos_para_listas(df):
+    """Converte as colunas de frozensets em listas ordenadas, para formatos colunares."""
+    colunas = [coluna for coluna in COLUNAS_CONJUNTOS if coluna in df.columns]
+    if not colunas:
+        return df
+    return df.assign(**{coluna: df[coluna].map(sorted) for coluna in colunas})
+
+def _listas_para_conjuntos(df):
+    """Converte de volta em frozensets as colunas gravadas por `_conjuntos_para_listas`."""
+    colunas = [coluna for coluna in COLUNAS_CONJUNTOS if coluna in df.columns]
+    if not colunas:
+        return df
+    return df.assign(**{coluna: df[coluna].map(frozenset) for coluna in colunas})
+
+def _criar_pasta_de(caminho):
+    """Cria, se não existir, a pasta onde o arquivo `caminho` será gravado."""
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+def _caminho_saida(caminho_base, formato):
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de saída desconhecido: {formato!r}. Use um de {FORMATOS_SAIDA}.")
+    return f"{caminho_base}.{formato}"
+
+def _gravar_colunar(df, caminho, formato):
+    """Grava em Parquet (compressão snappy) ou Feather sem compressão, que pode ser mapeado em memória."""
+    if formato == 'parquet':
+        df.to_parquet(caminho, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(caminho, compression='uncompressed')
+
+def salvar_dados_limpos(df, caminho_base="dadosLimpos/dados_limpos", formato=FORMATO_SAIDA):
+    """
+    Salva o DataFrame limpo no formato escolhido.
+    
+    Nos formatos binários, as colunas de `COLUNAS_CATEGORICAS` ainda em texto
+    são gravadas como categóricas, e os demais tipos são preservados.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame limpo.
+        caminho_base (str): Caminho do arquivo sem a extensão.
+        formato (str): 'csv', 'parquet' ou 'feather'.
+        
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    caminho = _caminho_saida(caminho_base, formato)
+    _criar_pasta_de(caminho)
+    if formato == 'csv':
+        df.to_csv(caminho, index=False)
+        return caminho
+    
+    categoricas = [
+        coluna for coluna in COLUNAS_CATEGORICAS
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype)
+    ]
+    _gravar_colunar(df.astype({coluna: 'category' for coluna in categoricas}), caminho, formato)
+    return caminho
+
+def converter_csv_em_blocos(caminho_csv, caminho_base, formato, tamanho_chunk=TAMANHO_CHUNK_PADRAO):
+    """
+    Converte os dados limpos gravados em CSV para Parquet ou Feather, bloco a bloco.
+    
+    Usado pelo modo streaming, que grava os dados limpos em CSV: o arquivo é
+    relido em blocos e cada bloco é acrescentado ao arquivo colunar, sem
+    carregar o CSV inteiro. O resultado tem os mesmos tipos de
+    `salvar_dados_limpos`: as colunas de `COLUNAS_CATEGORICAS` ficam
+    categóricas (com as categorias acumuladas entre os blocos, para que o
+    dicionário de cada coluna só cresça) e as demais seguem o primeiro bloco.
+    
+    Args:
+        caminho_csv (str): CSV com os dados limpos.
+        caminho_base (str): Caminho do arquivo de destino sem a extensão.
+        formato (str): 'parquet' ou 'feather'.
+        tamanho_chunk (int): Número de linhas lidas por bloco.
+    
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    import pyarrow as pa
+    
+    caminho = _caminho_saida(caminho_base, formato)
+    _criar_pasta_de(caminho)
+    escritor = None
+    esquema = None
+    categorias = {}
+    try:
+        for bloco in pd.read_csv(caminho_csv, chunksize=tamanho_chunk, dtype=TIPOS_TEXTO_STREAMING):
+            for coluna in [col for col in COLUNAS_CATEGORICAS if col in bloco.columns]:
+                valores = bloco[coluna].astype(object)
+                novas = pd.Index(valores.dropna().unique()).difference(categorias.get(coluna, []), sort=False)
+                categorias[coluna] = list(categorias.get(coluna, [])) + list(novas)
+                bloco[coluna] = pd.Categorical(valores, categories=categorias[coluna])
+            if esquema is None:
+                campos = []
+                for coluna, tipo in bloco.dtypes.items():
+                    if isinstance(tipo, pd.CategoricalDtype):
+                        campos.append(pa.field(coluna, pa.dictionary(pa.int32(), pa.string())))
+                    elif tipo == object:
+                        campos.append(pa.field(coluna, pa.string()))
+                    else:
+                        campos.append(pa.field(coluna, pa.from_numpy_dtype(tipo)))
+                esquema = pa.schema(campos)
+                if formato == 'parquet':
+                    from pyarrow import parquet
+                    escritor = parquet.ParquetWriter(caminho, esquema)
+                else:
+                    # Feather sem compressão; cada bloco só acrescenta categorias ao dicionário
+                    escritor = pa.ipc.new_file(caminho, esquema, options=pa.ipc.IpcWriteOptions(
+                        compression=None, emit_dictionary_deltas=True,
+                    ))
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+    finally:
+        if escritor is not None:
+            escritor.close()
+    if escritor is None:
+        # CSV sem registros: grava apenas as colunas
+        return salvar_dados_limpos(pd.read_csv(caminho_csv, dtype=TIPOS_TEXTO_STREAMING), caminho_base, formato)
+    return caminho
+
+def salvar_regras(rules, caminho_base="dadosLimpos/regras_associacao", formato=FORMATO_SAIDA):
+    """
+    Salva as regras de associação no formato escolhido.
+    
+    Em CSV os conjuntos de produtos ficam como texto (repr do frozenset); em
+    Parquet e Feather viram colunas de listas de produtos.
+    
+    Args:
+        rules (pandas.DataFrame): Regras de associação.
+        caminho_base (str): Caminho do arquivo sem a extensão.
+        formato (str): 'csv', 'parquet' ou 'feather'.
+        
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    caminho = _caminho_saida(caminho_base, formato)
+    _criar_pasta_de(caminho)
+    if formato == 'csv':
+        rules.to_csv(caminho, index=False)
+    else:
+        _gravar_colunar(_conjuntos_para_listas(rules), caminho, formato)
+    return caminho
+
+def carregar_saida(caminho, colunas=None, como_conjuntos=False):
+    """
+    Lê um arquivo gravado por `salvar_dados_limpos` ou `salvar_regras`.
+    
+    Arquivos Feather e Parquet são lidos com mapeamento em memória; no Feather
+    sem compressão as colunas numéricas sem nulos são usadas sem cópia.
+    
+    Args:
+        caminho (str): Caminho do arquivo (.csv, .parquet ou .feather).
+        colunas (list): Colunas a ler (None para todas).
+        como_conjuntos (bool): Se True, converte as colunas de listas de
+            produtos das regras de volta em frozensets.
+            
+    Returns:
+        pandas.DataFrame: Dados lidos.
+    """
+    formato = os.path.splitext(caminho)[1].lstrip('.')
+    if formato == 'csv':
+        return pd.read_csv(caminho, usecols=colunas)
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de arquivo desconhecido: {caminho!r}")
+    
+    if formato == 'feather':
+        from pyarrow import feather
+        tabela = feather.read_table(caminho, columns=colunas, memory_map=True)
+    else:
+        from pyarrow import parquet
+        tabela = parquet.read_table(caminho, columns=colunas, memory_map=True)
+    df = tabela.to_pandas(split_blocks=True)
+    return _listas_para_conjuntos(df) if como_conjuntos else df
+
+def _impressao_arquivo(caminho):
+    """Calcula o hash SHA-256 do conteúdo de um arquivo."""
+    hash_arquivo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+            hash_arquivo.update(bloco)
+    return hash_arquivo.hexdigest()
+
+def _impressao_dados(df):
+    """Calcula o hash SHA-256 de um DataFrame (colunas, tipos, índice e valores)."""
+    hash_dados = hashlib.sha256()
+    hash_dados.update(repr(list(df.columns)).encode())
+    hash_dados.update(repr([str(tipo) for tipo in df.dtypes]).encode())
+    hash_dados.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return hash_dados.hexdigest()
+
+@lru_cache(maxsize=None)
+def _versao_codigo(funcao):
+    """
+    Identifica a versão do código de uma etapa.
+    
+    Junta o código-fonte da função, das funções e classes deste módulo que ela
+    usa (recursivamente) e o valor das constantes do módulo referenciadas
+    (ex.: MAPEAMENTO_PRODUTOS). Alterar qualquer um deles muda a versão.
+    
+    Args:
+        funcao (callable): Função da etapa.
+        
+    Returns:
+        str: Hash SHA-256 do código.
+    """
+    modulo = globals()
+    hash_codigo = hashlib.sha256()
+    pendentes = [funcao]
+    vistos = set()
+    while pendentes:
+        objeto = pendentes.pop()
+        if id(objeto) in vistos:
+            continue
+        vistos.add(id(objeto))
+        hash_codigo.update(inspect.getsource(objeto).encode())
+        
+        if inspect.isclass(objeto):
+            codigos = [membro.__code__ for membro in vars(objeto).values() if inspect.isfunction(membro)]
+        else:
+            codigos = [objeto.__code__]
+        nomes = []
+        while codigos:
+            codigo = codigos.pop()
+            nomes.extend(codigo.co_names)
+            codigos.extend(constante for constante in codigo.co_consts if inspect.iscode(constante))
+        
+        for nome in sorted(set(nomes)):
+            valor = modulo.get(nome)
+            if (inspect.isfunction(valor) or inspect.isclass(valor)) and valor.__module__ == __name__:
+                pendentes.append(valor)
+            elif nome.isupper() and nome in modulo:
+                hash_codigo.update(f"{nome}={valor!r}".encode())
+    return hash_codigo.hexdigest()
+
+def _contar_linhas(dados):
+    return len(dados) if isinstance(dados, (pd.DataFrame, pd.Series)) else None
+
+def _pico_rss_mb():
+    """Maior memória residente (RSS) do processo até agora, em MB (None sem o módulo `resource`)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KB no Linux
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+def _tempo_cpu():
+    """Tempo de CPU do processo e dos processos filhos já encerrados (ex.: `executar_em_paralelo`)."""
+    tempos = os.times()
+    return tempos.user + tempos.system + tempos.children_user + tempos.children_system
+
+class PerfilExecucao:
+    """
+    Instrumentação das etapas do pipeline.
+    
+    Cada etapa é medida com `etapa(nome, entrada)`, um gerenciador de contexto
+    que entrega um dicionário de registro; atribua o resultado da etapa a
+    `registro['saida']` para que as linhas e a memória de saída sejam medidas.
+    `CacheEtapas` faz isso automaticamente quando recebe um perfil.
+    
+    Exemplo:
+        perfil = PerfilExecucao()
+        with perfil.etapa('validacao', df) as registro:
+            registro['saida'] = validar(df)
+        perfil.salvar_json("relatorios/perfil_execucao.json")
+    """
+    
+    def __init__(self, rastrear_memoria=PERFIL_RASTREAR_MEMORIA, cprofile=PERFIL_CPROFILE, ativo=True):
+        """
+        Args:
+            rastrear_memoria (bool): Mede o pico alocado de cada etapa com
+                tracemalloc (deixa a execução várias vezes mais lenta).
+            cprofile (bool): Executa as etapas sob o cProfile.
+            ativo (bool): Se False, as etapas não são medidas.
+        """
+        self.ativo = ativo
+        self.rastrear_memoria = rastrear_memoria
+        self.etapas = []
+        self.inicio = datetime.now()
+        self._inicio_relogio = time.perf_counter()
+        self._inicio_cpu = _tempo_cpu()
+        self._iniciou_tracemalloc = False
+        if cprofile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+        else:
+            self._profiler = None
+    
+    @contextmanager
+    def etapa(self, nome, entrada=None):
+        """
+        Mede uma etapa.
+        
+        Args:
+            nome (str): Nome da etapa.
+            entrada: Dados de entrada (as linhas são contadas se for um DataFrame).
+            
+        Yields:
+            dict: Registro da etapa; a chave 'saida' recebe o resultado (ou
+            'linhas_entrada'/'linhas_saida' recebem as contagens, quando a
+            etapa não trabalha com DataFrames).
+        """
+        registro = {'etapa': nome, 'linhas_entrada': _contar_linhas(entrada)}
+        if not self.ativo:
+            yield registro
+            return
+        if self.rastrear_memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._iniciou_tracemalloc = True
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        if self._profiler is not None:
+            self._profiler.enable()
+        inicio, inicio_cpu, inicio_rss = time.perf_counter(), _tempo_cpu(), _pico_rss_mb()
+        try:
+            yield registro
+        finally:
+            registro['tempo_s'] = time.perf_counter() - inicio
+            registro['tempo_cpu_s'] = _tempo_cpu() - inicio_cpu
+            if self._profiler is not None:
+                self._profiler.disable()
+            if self.rastrear_memoria:
+                atual, pico = tracemalloc.get_traced_memory()
+                registro['pico_alocado_mb'] = (pico - memoria_inicial) / 1024 ** 2
+                registro['variacao_alocada_mb'] = (atual - memoria_inicial) / 1024 ** 2
+            registro['pico_rss_mb'] = _pico_rss_mb()
+            # Quanto a etapa elevou o maior RSS do processo (0 se ficou abaixo do pico anterior)
+            registro['aumento_pico_rss_mb'] = (
+                registro['pico_rss_mb'] - inicio_rss if inicio_rss is not None else None
+            )
+            saida = registro.pop('saida', None)
+            if 'linhas_saida' not in registro:
+                registro['linhas_saida'] = _contar_linhas(saida)
+            registro['memoria_dataframe_mb'] = (
+                saida.memory_usage(deep=True).sum() / 1024 ** 2 if isinstance(saida, pd.DataFrame) else None
+            )
+            self.etapas.append(registro)
+    
+    def finalizar(self):
+        """Encerra o tracemalloc iniciado pelo perfil (chamado por `salvar_json`)."""
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+    
+    def funcoes_mais_custosas(self, quantidade=FUNCOES_CPROFILE_EXIBIDAS):
+        """
+        Funções deste módulo com maior tempo acumulado no cProfile.
+        
+        Args:
+            quantidade (int): Número de funções.
+            
+        Returns:
+            list: Dicionários com 'funcao', 'chamadas', 'tempo_proprio_s' e
+            'tempo_acumulado_s' (vazia se o cProfile não foi usado).
+        """
+        if self._profiler is None:
+            return []
+        import pstats
+        estatisticas = pstats.Stats(self._profiler).stats
+        arquivo = os.path.abspath(__file__)
+        funcoes = [
+            {
+                'funcao': f"{nome}:{linha}",
+                'chamadas': chamadas,
+                'tempo_proprio_s': tempo_proprio,
+                'tempo_acumulado_s': tempo_acumulado,
+            }
+            for (caminho, linha, nome), (_, chamadas, tempo_proprio, tempo_acumulado, _) in estatisticas.items()
+            if os.path.abspath(caminho) == arquivo
+        ]
+        return sorted(funcoes, key=lambda funcao: funcao['tempo_acumulado_s'], reverse=True)[:quantidade]
+    
+    def para_dict(self):
+        """
+        Returns:
+            dict: Perfil da execução (início, totais e registros das etapas).
+        """
+        return {
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'tempo_total_s': time.perf_counter() - self._inicio_relogio,
+            'tempo_cpu_total_s': _tempo_cpu() - self._inicio_cpu,
+            'pico_rss_mb': _pico_rss_mb(),
+            'etapas': self.etapas,
+            'funcoes_mais_custosas': self.funcoes_mais_custosas(),
+        }
+    
+    def salvar_json(self, caminho=CAMINHO_PERFIL, caminho_cprofile=CAMINHO_CPROFILE):
+        """
+        Grava o perfil em JSON e, se o cProfile foi usado, o dump do cProfile.
+        
+        Args:
+            caminho (str): Arquivo JSON do perfil.
+            caminho_cprofile (str): Arquivo do dump do cProfile.
+            
+        Returns:
+            dict: Perfil gravado.
+        """
+        self.finalizar()
+        perfil = self.para_dict()
+        _criar_pasta_de(caminho)
+        if self._profiler is not None:
+            _criar_pasta_de(caminho_cprofile)
+            self._profiler.dump_stats(caminho_cprofile)
+            perfil['cprofile'] = caminho_cprofile
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(perfil, f, ensure_ascii=False, indent=2)
+        return perfil
+    
+    def secao_relatorio(self):
+        """
+        Returns:
+            str: Seção em markdown com o perfil das etapas, para o relatório de limpeza.
+        """
+        def formatar(numero, casas=2):
+            return '-' if numero is None else f"{numero:.{casas}f}"
+        
+        def linhas(numero):
+            return '-' if numero is None else str(numero)
+        
+        secao = ["## 5. Perfil de Execução"]
+        secao.append(
+            "| Etapa | Tempo (s) | CPU (s) | Linhas (entrada → saída) | Pico de RSS (MB) "
+            "| Pico alocado (MB) | DataFrame (MB) | Cache |"
+        )
+        secao.append("|---|---|---|---|---|---|---|---|")
+        for registro in self.etapas:
+            cache = {True: 'sim', False: 'não'}.get(registro.get('cache'), '-')
+            secao.append(
+                f"| {registro['etapa']} | {formatar(registro['tempo_s'])} | {formatar(registro['tempo_cpu_s'])} "
+                f"| {linhas(registro['linhas_entrada'])} → {linhas(registro['linhas_saida'])} "
+                f"| {formatar(registro['pico_rss_mb'], 1)} | {formatar(registro.get('pico_alocado_mb'), 1)} "
+                f"| {formatar(registro['memoria_dataframe_mb'], 1)} | {cache} |"
+            )
+        secao.append(
+            f"\nTempo total: {time.perf_counter() - self._inicio_relogio:.2f}s | "
+            f"Pico de RSS: {formatar(_pico_rss_mb(), 1)} MB"
+        )
+        funcoes = self.funcoes_mais_custosas()
+        if funcoes:
+            secao.append("\n### Funções mais custosas (cProfile)")
+            secao.extend(
+                f"- {funcao['funcao']}: {funcao['tempo_acumulado_s']:.2f}s acumulados em {funcao['chamadas']} chamadas"
+                for funcao in funcoes
+            )
+        return "\n".join(secao)
+
+# Metadado do Parquet com os atributos (`df.attrs`) da saída de uma etapa
+_CHAVE_ATRIBUTOS = b'atributos_etapa'
+
+class CacheEtapas:
+    """
+    Cache em disco das saídas das etapas do pipeline.
+    
+    Cada saída é gravada em Parquet com uma chave que combina o nome da etapa,
+    o hash dos dados de entrada (ou do arquivo lido), os parâmetros (exceto os
+    de `PARAMETROS_SEM_EFEITO_NO_CACHE`) e a versão do código da etapa
+    (`_versao_codigo`). Uma execução seguinte com a mesma
+    chave lê o arquivo em vez de refazer a etapa.
+    
+    Quando o total ultrapassa o limite de tamanho, as entradas usadas há mais
+    tempo são removidas (LRU, pela data de modificação, atualizada a cada uso).
+    """
+    
+    def __init__(self, pasta=PASTA_CACHE, tamanho_maximo_mb=TAMANHO_MAXIMO_CACHE_MB, ativo=True, perfil=None):
+        """
+        Args:
+            pasta (str): Pasta dos arquivos do cache (criada na primeira gravação).
+            tamanho_maximo_mb (float): Tamanho máximo total do cache, em MB.
+            ativo (bool): Se False, as etapas sempre são executadas e nada é gravado.
+            perfil (PerfilExecucao): Se informado, cada etapa executada é medida
+                (com a indicação de leitura do cache).
+        """
+        self.pasta = pasta
+        self.tamanho_maximo = tamanho_maximo_mb * 1024 ** 2
+        self.ativo = ativo
+        self.perfil = perfil
+    
+    def _caminho(self, etapa, chave):
+        return os.path.join(self.pasta, f"{etapa}-{chave[:32]}.parquet")
+    
+    def _entradas(self, etapa=None):
+        if not os.path.isdir(self.pasta):
+            return []
+        prefixo = f"{etapa}-" if etapa else ''
+        return [
+            os.path.join(self.pasta, nome) for nome in os.listdir(self.pasta)
+            if nome.startswith(prefixo) and nome.endswith('.parquet')
+        ]
+    
+    def chave(self, etapa, funcao, entrada, parametros=None):
+        """
+        Calcula a chave de uma etapa.
+        
+        Args:
+            etapa (str): Nome da etapa.
+            funcao (callable): Função que executa a etapa.
+            entrada: DataFrame de entrada ou caminho do arquivo lido pela etapa.
+            parametros (dict): Parâmetros da etapa.
+            
+        Returns:
+            str: Hash SHA-256 que identifica a execução.
+        """
+        impressao = _impressao_arquivo(entrada) if isinstance(entrada, str) else _impressao_dados(entrada)
+        # O número de processos, por exemplo, não altera a saída da etapa
+        parametros = {
+            nome: valor for nome, valor in (parametros or {}).items() if nome not in PARAMETROS_SEM_EFEITO_NO_CACHE
+        }
+        partes = [etapa, impressao, repr(sorted(parametros.items())), _versao_codigo(funcao)]
+        return hashlib.sha256('\n'.join(partes).encode()).hexdigest()
+    
+    def executar(self, etapa, funcao, entrada, parametros=None):
+        """
+        Executa uma etapa ou lê seu resultado do cache.
+        
+        Args:
+            etapa (str): Nome da etapa.
+            funcao (callable): Função da etapa, chamada como `funcao(entrada, **parametros)`.
+            entrada: DataFrame de entrada ou caminho do arquivo lido pela etapa.
+            parametros (dict): Parâmetros da etapa.
+            
+        Returns:
+            pandas.DataFrame: Saída da etapa.
+        """
+        with self.perfil.etapa(etapa, entrada) if self.perfil is not None else nullcontext({}) as registro:
+            resultado, registro['cache'] = self._executar(etapa, funcao, entrada, parametros or {})
+            registro['saida'] = resultado
+        return resultado
+    
+    def _executar(self, etapa, funcao, entrada, parametros):
+        """Retorna (saída da etapa, True se foi lida do cache)."""
+        if not self.ativo:
+            return funcao(entrada, **parametros), False
+        
+        caminho = self._caminho(etapa, self.chave(etapa, funcao, entrada, parametros))
+        if os.path.exists(caminho):
+            os.utime(caminho)  # Marca o uso para a política LRU
+            print(f"[cache] Etapa '{etapa}' lida de {caminho}")
+            return self._ler(caminho), True
+        
+        resultado = funcao(entrada, **parametros)
+        if isinstance(resultado, pd.DataFrame):
+            self._gravar(caminho, resultado)
+        return resultado, False
+    
+    def _ler(self, caminho):
+        from pyarrow import parquet
+        tabela = parquet.read_table(caminho)
+        df = _listas_para_conjuntos(tabela.to_pandas())
+        atributos = (tabela.schema.metadata or {}).get(_CHAVE_ATRIBUTOS)
+        if atributos:
+            df.attrs.update(json.loads(atributos))
+        return df
+    
+    def _gravar(self, caminho, df):
+        os.makedirs(self.pasta, exist_ok=True)
+        temporario = caminho + '.tmp'
+        try:
+            import pyarrow as pa
+            from pyarrow import parquet
+            tabela = pa.Table.from_pandas(_conjuntos_para_listas(df))
+            if df.attrs:
+                # Atributos do DataFrame (ex.: contagens para o relatório) vão nos metadados do arquivo
+                metadados = {**(tabela.schema.metadata or {}), _CHAVE_ATRIBUTOS: json.dumps(df.attrs).encode()}
+                tabela = tabela.replace_schema_metadata(metadados)
+            parquet.write_table(tabela, temporario)
+        except (ImportError, ValueError, TypeError) as erro:
+            # Sem pyarrow ou com colunas que o Parquet não representa: a etapa só não é guardada
+            print(f"[cache] Não foi possível gravar {caminho}: {erro}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return
+        os.replace(temporario, caminho)
+        self.remover_excedente()
+    
+    def remover_excedente(self):
+        """Remove as entradas usadas há mais tempo até o cache caber no tamanho máximo."""
+        entradas = sorted(self._entradas(), key=os.path.getmtime)
+        tamanho_total = sum(os.path.getsize(caminho) for caminho in entradas)
+        while entradas and tamanho_total > self.tamanho_maximo:
+            caminho = entradas.pop(0)
+            tamanho_total -= os.path.getsize(caminho)
+            os.remove(caminho)
+    
+    def invalidar(self, etapa=None):
+        """
+        Remove do cache as entradas de uma etapa (ou de todas, se etapa for None).
+        
+        Args:
+            etapa (str): Nome da etapa.
+            
+        Returns:
+            int: Número de arquivos removidos.
+        """
+        entradas = self._entradas(etapa)
+        for caminho in entradas:
+            os.remove(caminho)
+        return len(entradas)
+
+def criar_parser():
+    """
+    Cria o parser da linha de comando de `main`.
+    
+    Os valores padrão vêm das configurações do início do módulo.
+    
+    Returns:
+        argparse.ArgumentParser: Parser dos argumentos.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Limpeza de dados e análise de associação - MegaSuper Vendas",
+    )
+    parser.add_argument('--entrada', default=CAMINHO_ENTRADA, help="CSV com os dados brutos")
+    parser.add_argument('--pasta-dados', default=PASTA_DADOS_LIMPOS,
+                        help="pasta dos dados limpos e das regras de associação")
+    parser.add_argument('--pasta-relatorios', default=PASTA_RELATORIOS,
+                        help="pasta dos relatórios e do perfil de execução")
+    parser.add_argument('--formato', choices=FORMATOS_SAIDA, default=FORMATO_SAIDA,
+                        help="formato dos dados limpos e das regras (no modo streaming, o CSV gravado "
+                             "bloco a bloco é convertido ao final; o modo incremental exige CSV)")
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS_PIPELINE, default=list(ETAPAS_PIPELINE),
+                        help="etapas a executar: 'limpeza' (1 a 9), 'associacao' (10 e 11) e/ou "
+                             "'cubo' (12, cubo de agregação das vendas)")
+    parser.add_argument('--dados-limpos',
+                        help="dados limpos usados pela associação e pelo cubo quando a limpeza não é executada "
+                             "(padrão: dados_limpos.<formato> em --pasta-dados)")
+    parser.add_argument('--tamanho-chunk', type=int, default=TAMANHO_CHUNK,
+                        help="linhas por bloco; ativa o modo streaming")
+    parser.add_argument('--incremental', action='store_true',
+                        help="limpa --entrada como um novo lote e acrescenta apenas as linhas novas aos "
+                             "dados limpos (CSV), usando o estado salvo das execuções anteriores")
+    parser.add_argument('--estado-incremental',
+                        help="arquivo do estado incremental (padrão: estado_incremental.pkl em --pasta-dados)")
+    parser.add_argument('--duplicatas-em-disco', action='store_true', default=DUPLICATAS_EM_DISCO,
+                        help="no modo streaming, resolve as duplicatas com partições em disco em vez de "
+                             "manter os hashes das chaves na memória")
+    parser.add_argument('--processos', type=int, default=NUMERO_PROCESSOS,
+                        help="processos usados nas etapas por linha")
+    parser.add_argument('--min-suporte', type=float, default=MIN_SUPORTE, help="suporte mínimo da mineração")
+    parser.add_argument('--min-confianca', type=float, default=MIN_CONFIANCA, help="confiança mínima das regras")
+    parser.add_argument('--min-lift', type=float, help="lift mínimo das regras")
+    parser.add_argument('--min-leverage', type=float, help="leverage mínimo das regras")
+    parser.add_argument('--min-conviccao', type=float, help="conviction mínima das regras")
+    parser.add_argument('--max-tamanho-regra', type=int, help="número máximo de produtos por regra")
+    parser.add_argument('--manter-redundantes', action='store_true', default=not REMOVER_REGRAS_REDUNDANTES,
+                        help="não remove as regras redundantes e não fechadas")
+    parser.add_argument('--particionar-por', nargs='+', default=[], choices=CHAVES_PARTICAO, metavar='CHAVE',
+                        help="minera também as regras de cada partição dos dados, em paralelo com --processos "
+                             f"(chaves: {', '.join(CHAVES_PARTICAO)})")
+    parser.add_argument('--algoritmo', choices=ALGORITMOS_MINERACAO, default=ALGORITMOS_MINERACAO[0],
+                        help="minerador de conjuntos frequentes")
+    parser.add_argument('--sem-cache', action='store_true', help="não lê nem grava o cache de etapas")
+    parser.add_argument('--invalidar', nargs='+', default=list(ETAPAS_INVALIDADAS), metavar='ETAPA',
+                        help="etapas do cache a refazer (ex.: ceps associacao)")
+    parser.add_argument('--sem-perfil', action='store_true', help="não mede as etapas")
+    parser.add_argument('--rastrear-memoria', action='store_true', default=PERFIL_RASTREAR_MEMORIA,
+                        help="mede o pico alocado por etapa com tracemalloc (mais lento)")
+    parser.add_argument('--cprofile', action='store_true', default=PERFIL_CPROFILE,
+                        help="grava um dump do cProfile das etapas")
+    return parser
+
+def executar_limpeza(argumentos, cache, perfil):
+    """
+    Executa as etapas 1 a 9: carregamento, limpeza, relatório e dados limpos.
+    
+    Args:
+        argumentos (argparse.Namespace): Argumentos de `criar_parser`.
+        cache (CacheEtapas): Cache das etapas.
+        perfil (PerfilExecucao): Perfil de execução.
+        
+    Returns:
+        pandas.DataFrame: Dados limpos, ou None no modo streaming (os dados
+        ficam apenas no arquivo gravado).
+    """
+    caminho_base = os.path.join(argumentos.pasta_dados, "dados_limpos")
+    caminho_dados = caminho_base + ".csv"
+    caminho_relatorio = os.path.join(argumentos.pasta_relatorios, "relatorio_limpeza.md")
+    
+    if argumentos.tamanho_chunk or argumentos.incremental:
+        # Modo streaming: etapas 1 a 9 executadas bloco a bloco
+        # (no modo incremental, o lote é acrescentado aos dados limpos anteriores)
+        caminho_estado = None
+        if argumentos.incremental:
+            caminho_estado = argumentos.estado_incremental or os.path.join(
+                argumentos.pasta_dados, "estado_incremental.pkl"
+            )
+        with perfil.etapa('incremental' if argumentos.incremental else 'streaming') as registro:
+            estatisticas = executar_pipeline_streaming(
+                argumentos.entrada, caminho_dados, caminho_relatorio,
+                tamanho_chunk=argumentos.tamanho_chunk or TAMANHO_CHUNK_PADRAO,
+                processos=argumentos.processos, caminho_estado=caminho_estado,
+                duplicatas_em_disco=argumentos.duplicatas_em_disco, formato=argumentos.formato,
+            )
+            registro['linhas_entrada'] = estatisticas['registros_lidos']
+            registro['linhas_saida'] = estatisticas['registros_gravados']
+        
+        # A associação lê depois apenas as colunas da transação do arquivo gravado
+        return None
+    else:
+        # 1. Carregamento dos Dados
+        print("\n=== 1. Carregamento e Inspeção Inicial dos Dados ===")
+        # Carrega o arquivo CSV para um DataFrame do Pandas e exibe informações sobre
+        # tipos de dados, contagem de valores não nulos, e uso de memória
+        df = cache.executar('carregamento', carregar_dados, argumentos.entrada)
+        print("\nInformações do DataFrame:")
+        print(df.info())
+
+        # 2. Funções de Limpeza e Validação
+        print("\n=== 2. Funções de Limpeza e Validação ===")
+        # Nesta etapa, todas as funções de limpeza e validação foram definidas anteriormente
+        # incluindo padronização de produtos, validação de valores monetários, etc.
+
+        # 3. Aplicação das Funções de Limpeza
+        print("\n=== 3. Aplicação das Funções de Limpeza ===")
+        # Aplicação de funções de limpeza e padronização nos campos de texto
+        # e validação de campos numéricos para garantir consistência dos dados
+        # Com --processos > 1 as linhas são divididas entre vários processos
+        df = cache.executar('textos', padronizar_textos, df, {'processos': argumentos.processos})  # Cliente, produto, data e hora
+        df = cache.executar('numericos', limpar_colunas_numericas, df, {'processos': argumentos.processos})  # Valor, quantidade, total e frete
+
+        # 3.1. Tratamento de CEPs
+        print("\n=== 3.1. Tratamento de CEPs ===")
+        # Preenche CEPs ausentes usando uma hierarquia de estratégias:
+        # 1. CEP mais comum da cidade
+        # 2. CEP mais comum do estado
+        # 3. CEP mais comum geral
+        # 4. CEP sintético baseado no estado
+        # Em seguida, formata todos os CEPs para o padrão XXXXX-XXX
+        df = cache.executar('ceps', tratar_ceps, df)
+
+        # 4. Tratamento de Duplicatas
+        print("\n=== 4. Tratamento de Duplicatas ===")
+        # Identifica e remove registros duplicados com base em colunas-chave:
+        # id_da_compra, data, hora, cliente e produto
+        # Mantém o primeiro registro quando encontra duplicatas
+        df = cache.executar('duplicatas', tratar_duplicatas, df)
+
+        # 5. Tratamento de Valores Ausentes
+        print("\n=== 5. Tratamento de Valores Ausentes ===")
+        # Trata valores ausentes usando estratégias específicas para cada coluna:
+        # - valor: preenche com a média
+        # - quantidade: preenche com 1
+        # - frete: preenche com 0
+        # - vendedor/marca: preenche com "Não Especificado"
+        # - total: recalcula baseado em valor * quantidade + frete
+        # Na mesma etapa, os totais são verificados (etapa 6)
+        df = cache.executar('ausentes', tratar_valores_ausentes, df)
+
+        # 6. Verificação de Cálculos
+        print("\n=== 6. Verificação de Cálculos ===")
+        # Verifica se a coluna 'total' está correta de acordo com a fórmula:
+        # total = valor * quantidade + frete
+        # Corrige valores que diferem do cálculo em mais de 0.01
+        print(f"Totais preenchidos: {df.attrs.get('totais_preenchidos', 0)}")
+        print(f"Totais corrigidos (diferença maior que {TOLERANCIA_TOTAL}): {df.attrs.get('totais_corrigidos', 0)}")
+
+        # 7. Análise de Padrões de Compra
+        print("\n=== 7. Análise de Padrões de Compra ===")
+        # Analisa os produtos mais vendidos após a padronização
+        # para identificar padrões de compra nos dados limpos
+        # As contagens vêm dos esboços de `EsbocosVendas`, reaproveitados no relatório
+        with perfil.etapa('padroes_compra', df):
+            esbocos = EsbocosVendas().atualizar(df)
+            print("\nTop 10 produtos mais vendidos:")
+            print(esbocos.top('produto', 10)['contagem'])
+
+        # 7.1. Validação da Padronização de Produtos
+        print("\n=== 7.1. Validação da Padronização de Produtos ===")
+        # Verifica a eficácia do processo de padronização de produtos
+        # Identifica possíveis produtos similares que poderiam ser padronizados
+        # e produtos com poucas ocorrências que podem representar anomalias
+        with perfil.etapa('validacao_produtos', df) as registro:
+            produtos_similares = registro['saida'] = validar_padronizacao_produtos(df)
+
+        # 7.2. Verificação final de CEPs nulos
+        print("\n=== 7.2 Verificação final de CEPs nulos ===")
+        # Verifica se ainda há CEPs nulos após todos os tratamentos
+        # e aplica uma estratégia final (preenchimento com '00000-000')
+        # para garantir completude dos dados
+        ceps_nulos = df['cep'].isnull().sum()
+        if ceps_nulos > 0:
+            print(f"Ainda existem {ceps_nulos} CEPs nulos. Aplicando tratamento final...")
+            # Aplicar uma estratégia mais agressiva para garantir que não haja nulos
+            df['cep'] = df['cep'].fillna('00000-000')
+
+        # 8. Geração do Relatório
+        print("\n=== 8. Geração do Relatório de Limpeza ===")
+        # Gera um relatório detalhado em formato markdown com estatísticas sobre:
+        # - Total de registros
+        # - Registros duplicados removidos
+        # - Valores ausentes por coluna
+        # - Tipos de dados por coluna
+        # - Problemas corrigidos
+        # - Top 5 produtos mais vendidos
+        # - Contagens aproximadas (clientes, cidades e vendedores mais frequentes e distintos)
+        with perfil.etapa('relatorio_limpeza', df):
+            relatorio = gerar_relatorio(df, esbocos=esbocos)
+            with open(caminho_relatorio, "w", encoding="utf-8") as f:
+                f.write(relatorio)
+        print("\nRelatório de limpeza gerado com sucesso!")
+        print(f"Arquivo salvo como: {caminho_relatorio}")
+
+        # 9. Salvando Dados Limpos
+        print("\n=== 9. Salvando Dados Limpos ===")
+        # Salva o DataFrame limpo e processado no formato escolhido (--formato)
+        # (CSV, Parquet ou Feather) para uso posterior em análises ou sistemas
+        with perfil.etapa('salvar_dados', df):
+            caminho_dados = salvar_dados_limpos(df, caminho_base, argumentos.formato)
+        print("Dados limpos salvos com sucesso!")
+        print(f"Arquivo salvo como: {caminho_dados}")
+        return df
+
+def executar_associacao(df, argumentos, cache, perfil):
+    """
+    Executa as etapas 10 e 11: regras de associação e relatório de associação.
+    
+    Args:
+        df (pandas.DataFrame): Dados limpos (bastam as colunas de COLUNAS_TRANSACAO
+            e as das chaves de --particionar-por).
+        argumentos (argparse.Namespace): Argumentos de `criar_parser`.
+        cache (CacheEtapas): Cache das etapas.
+        perfil (PerfilExecucao): Perfil de execução.
+        
+    Returns:
+        pandas.DataFrame: Regras de associação, ou None se não houver.
+    """
+    parametros_poda = {
+        'min_lift': argumentos.min_lift,
+        'min_leverage': argumentos.min_leverage,
+        'min_conviction': argumentos.min_conviccao,
+        'max_len': argumentos.max_tamanho_regra,
+        'remover_redundantes': not argumentos.manter_redundantes,
+    }
+    
+    # 10. Análise de Regras de Associação
+    print("\n=== 10. Análise de Regras de Associação ===")
+    # Aplica o algoritmo Apriori para encontrar padrões de compra
+    # e identifica regras de associação entre produtos
+    rules = cache.executar(
+        'associacao', gerar_regras_associacao, df[COLUNAS_TRANSACAO],
+        {
+            'min_support': argumentos.min_suporte,
+            'min_confidence': argumentos.min_confianca,
+            'algoritmo': argumentos.algoritmo,
+            'caminho_csv': None,  # As regras são gravadas abaixo, no formato escolhido
+            'poda': parametros_poda,
+        },
+    )
+    if rules is not None and len(rules) > 0:
+        # Salvar as regras no formato escolhido (--formato)
+        with perfil.etapa('salvar_regras', rules):
+            caminho_regras = salvar_regras(rules, os.path.join(argumentos.pasta_dados, "regras_associacao"), argumentos.formato)
+        print(f"Regras de associação salvas em: {caminho_regras}")
+        
+        # Índice de recomendação: consequentes ordenados por lift/confiança para cada antecedente
+        with perfil.etapa('indice_recomendacao', rules):
+            indice = IndiceRecomendacao(rules)
+            caminho_indice = os.path.join(argumentos.pasta_dados, "indice_recomendacao.npz")
+            indice.salvar(caminho_indice)
+        print(f"Índice de recomendação ({len(indice)} antecedentes) salvo em: {caminho_indice}")
+    else:
+        print("Nenhuma regra de associação encontrada; nada a salvar.")
+    
+    # Regras por partição (ex.: por estado ou por mês), comparadas com as globais
+    for chave in argumentos.particionar_por:
+        print(f"\n=== 10.{argumentos.particionar_por.index(chave) + 1}. Regras por '{chave}' ===")
+        regras_particoes = cache.executar(
+            'associacao_particionada', minerar_por_particao, df[COLUNAS_TRANSACAO + [coluna_da_chave(chave)]],
+            {
+                'chave': chave,
+                'min_support': argumentos.min_suporte,
+                'min_confidence': argumentos.min_confianca,
+                'algoritmo': argumentos.algoritmo,
+                'poda': parametros_poda,
+                'processos': argumentos.processos,
+            },
+        )
+        if regras_particoes is None:
+            print(f"Nenhuma regra encontrada nas partições por '{chave}'.")
+            continue
+        regras_particoes, resumo = comparar_com_globais(regras_particoes, rules)
+        with perfil.etapa('salvar_regras_particoes', regras_particoes):
+            caminho_particoes = salvar_regras(
+                regras_particoes, os.path.join(argumentos.pasta_dados, f"regras_por_{chave}"), argumentos.formato
+            )
+            caminho_resumo = os.path.join(argumentos.pasta_relatorios, f"resumo_regras_por_{chave}.csv")
+            resumo.to_csv(caminho_resumo, index=False)
+        print(resumo.to_string(index=False))
+        print(f"Regras por '{chave}' salvas em: {caminho_particoes} (resumo em {caminho_resumo})")
+
+    # 11. Geração de Relatório de Associação
+    print("\n=== 11. Geração de Relatório de Associação ===")
+    # Cria um relatório detalhado com as regras de associação encontradas
+    # incluindo métricas de avaliação e recomendações de marketing
+    with perfil.etapa('relatorio_associacao', rules):
+        gerar_relatorio_associacao(rules, os.path.join(argumentos.pasta_relatorios, "relatorio_associacao.md"))
+    return rules
+
+def executar_cubo(df, argumentos, perfil):
+    """
+    Executa a etapa 12: cubo de agregação das vendas.
+    
+    Args:
+        df (pandas.DataFrame): Dados limpos (bastam as colunas de COLUNAS_CUBO).
+        argumentos (argparse.Namespace): Argumentos de `criar_parser`.
+        perfil (PerfilExecucao): Perfil de execução.
+        
+    Returns:
+        CuboVendas: Cubo construído.
+    """
+    # 12. Cubo de Agregação
+    print("\n=== 12. Cubo de Agregação das Vendas ===")
+    # Pré-calcula faturamento, unidades e frete por dia/hora, produto, local,
+    # vendedor/marca e pagamento, em vários níveis de agregação
+    with perfil.etapa('cubo', df) as registro:
+        cubo = CuboVendas(df)
+        pasta_cubo = os.path.join(argumentos.pasta_dados, "cubo_vendas")
+        cubo.salvar(pasta_cubo)
+        registro['linhas_saida'] = sum(len(tabela) for tabela in cubo.niveis.values())
+    for dimensoes, tabela in cubo.niveis.items():
+        print(f"- {' × '.join(dimensoes) or 'total geral'}: {len(tabela)} linhas")
+    print(f"Cubo salvo em: {pasta_cubo}")
+    
+    print("\nFaturamento por mês (consultado no cubo):")
+    print(cubo.consultar(['mes'], medidas=('total', 'quantidade')).to_string(index=False))
+    return cubo
+
+def main(argv=None):
+    """
+    Executa o pipeline pela linha de comando.
+    
+    Os avisos (ex.: do pandas e do mlxtend) são silenciados apenas durante a
+    execução; importar o módulo não altera os filtros de avisos do processo.
+    
+    Exemplos:
+        python limpeza_dados.py
+        python limpeza_dados.py --entrada extrato.csv --etapas limpeza --tamanho-chunk 100000
+        python limpeza_dados.py --etapas associacao --min-suporte 0.02 --min-confianca 0.5
+    
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv[1:]).
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        _executar_main(argv)
+
+def _executar_main(argv):
+    """Corpo de `main`: interpreta os argumentos e executa as etapas pedidas."""
+    parser = criar_parser()
+    argumentos = parser.parse_args(argv)
+    if argumentos.tamanho_chunk is not None and argumentos.tamanho_chunk < 1:
+        parser.error("--tamanho-chunk deve ser um número positivo de linhas")
+    if argumentos.processos < 1:
+        parser.error("--processos deve ser pelo menos 1")
+    if not (0 < argumentos.min_suporte <= 1 and 0 <= argumentos.min_confianca <= 1):
+        parser.error("--min-suporte deve estar em (0, 1] e --min-confianca em [0, 1]")
+    if argumentos.max_tamanho_regra is not None and argumentos.max_tamanho_regra < 2:
+        parser.error("--max-tamanho-regra deve ser pelo menos 2")
+    if argumentos.incremental and argumentos.formato != 'csv':
+        parser.error("--incremental acrescenta os lotes ao CSV dos dados limpos; use --formato csv")
+    
+    caminho_relatorio = os.path.join(argumentos.pasta_relatorios, "relatorio_limpeza.md")
+    if 'limpeza' in argumentos.etapas:
+        if not os.path.exists(argumentos.entrada):
+            parser.error(f"arquivo de entrada não encontrado: {argumentos.entrada}")
+        caminho_limpos = None
+    else:
+        # Sem a limpeza, a associação e o cubo leem os dados limpos de uma execução anterior
+        caminho_limpos = argumentos.dados_limpos or os.path.join(
+            argumentos.pasta_dados, f"dados_limpos.{argumentos.formato}"
+        )
+        if not os.path.exists(caminho_limpos):
+            parser.error(f"dados limpos não encontrados: {caminho_limpos} (execute antes a etapa 'limpeza')")
+    
+    for pasta in (argumentos.pasta_dados, argumentos.pasta_relatorios):
+        os.makedirs(pasta, exist_ok=True)
+    
+    # Perfil de execução: tempo, CPU, linhas e memória de cada etapa
+    perfil = PerfilExecucao(
+        rastrear_memoria=argumentos.rastrear_memoria,
+        cprofile=argumentos.cprofile,
+        ativo=PERFIL_EXECUCAO and not argumentos.sem_perfil,
+    )
+    # Cache das etapas: refaz apenas o que mudou desde a última execução
+    cache = CacheEtapas(ativo=USAR_CACHE_ETAPAS and not argumentos.sem_cache, perfil=perfil)
+    for etapa in argumentos.invalidar:
+        print(f"[cache] Etapa '{etapa}' invalidada ({cache.invalidar(etapa)} arquivo(s) removido(s))")
+    
+    df = executar_limpeza(argumentos, cache, perfil) if 'limpeza' in argumentos.etapas else None
+    
+    if df is None and ('associacao' in argumentos.etapas or 'cubo' in argumentos.etapas):
+        # A associação precisa apenas das colunas da transação (e das chaves de partição);
+        # o cubo, das colunas de COLUNAS_CUBO
+        colunas = set()
+        if 'associacao' in argumentos.etapas:
+            colunas |= set(COLUNAS_TRANSACAO) | {coluna_da_chave(chave) for chave in argumentos.particionar_por}
+        if 'cubo' in argumentos.etapas:
+            colunas |= set(COLUNAS_CUBO)
+        caminho_limpos = caminho_limpos or os.path.join(argumentos.pasta_dados, f"dados_limpos.{argumentos.formato}")
+        print(f"\nLendo dados limpos de: {caminho_limpos}")
+        df = carregar_saida(caminho_limpos, colunas=sorted(colunas))
+    
+    if 'associacao' in argumentos.etapas:
+        executar_associacao(df, argumentos, cache, perfil)
+    
+    if 'cubo' in argumentos.etapas:
+        executar_cubo(df, argumentos, perfil)
+
+    # 13. Perfil de Execução
+    if perfil.ativo:
+        print("\n=== 13. Perfil de Execução ===")
+        # Grava o perfil das etapas em JSON e o anexa ao relatório de limpeza
+        caminho_perfil = os.path.join(argumentos.pasta_relatorios, os.path.basename(CAMINHO_PERFIL))
+        caminho_cprofile = os.path.join(argumentos.pasta_relatorios, os.path.basename(CAMINHO_CPROFILE))
+        perfil.salvar_json(caminho_perfil, caminho_cprofile)
+        if 'limpeza' in argumentos.etapas:
+            # Só anexa ao relatório de limpeza gerado nesta execução
+            with open(caminho_relatorio, "a", encoding="utf-8") as f:
+                f.write("\n\n" + perfil.secao_relatorio())
+        for registro in perfil.etapas:
+            print(f"{registro['etapa']:<22} {registro['tempo_s']:8.2f}s")
+        print(f"Perfil salvo em: {caminho_perfil}")
+        if argumentos.cprofile:
+            print(f"Dump do cProfile salvo em: {caminho_cprofile}")
+
+    print("\nProcesso de análise de dados concluído com sucesso!")
+
+if __name__ == "__main__":
+    main()